@@ -3,7 +3,7 @@ Flask API Server for Distress Detection & Alert System
 Connects frontend to backend Python scripts
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 import os
 import sys
@@ -11,24 +11,50 @@ import json
 from datetime import datetime
 from typing import Dict, List
 import base64
-import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import librosa
-import soundfile as sf
+
+try:
+    from flask_sock import Sock
+    HAS_FLASK_SOCK = True
+except ImportError:
+    HAS_FLASK_SOCK = False
 
 # Add scripts directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
 
+import metrics
+from alert_store import AlertStore, new_alert_id
+from analysis_cache import AnalysisCache, analysis_key, analyze_with_alert
+from scheduler import TimerScheduler
+from audio_io import CANONICAL_SAMPLE_RATE, decode_audio_bytes
+from audio_stream import StreamSessionManager
+from event_bus import CLOSED, EventBus, format_sse
+from pipeline_config import pipeline_config
+
 # Import backend modules
 try:
-    from detect_distress import analyze_distress
-    from alert_system import trigger_alert, send_email, load_config
+    from detect_distress import analyze_distress, model_manager as text_model_manager
+    from alert_system import (
+        trigger_alert, send_email, get_config, update_config,
+        warm_notification_pool, get_location_service,
+        preload_alarm, run_emergency_response
+    )
     from keyword_detection import detect_emotion_from_text
     from combined_pipeline import (
         analyze_audio_from_data,
         predict_emotion_combined,
         transcribe_audio,
-        detect_keywords as pipeline_detect_keywords
+        detect_keywords as pipeline_detect_keywords,
+        model_manager as pipeline_model_manager,
+        start_model_loading,
+        current_hf_batcher,
+        get_transcriber,
+        model_versions,
+        vad_counters,
+        cascade_counters
     )
     HAS_COMBINED_PIPELINE = True
 except ImportError as e:
@@ -37,10 +63,97 @@ except ImportError as e:
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend
-
-# Store active alerts (in production, use Redis or database)
-active_alerts = {}
-alert_history = []
+sock = Sock(app) if HAS_FLASK_SOCK else None
+
+# Persistent alert store shared by every worker process
+alert_store = AlertStore(
+    pipeline_config['alert_db_path'],
+    cache_size=pipeline_config.get('alert_cache_size', 256),
+    retention_days=pipeline_config.get('alert_retention_days', 90),
+    cache_ttl_seconds=pipeline_config.get('alert_cache_ttl_seconds', 2.0)
+)
+
+# One timer thread for all alert countdowns; emergency responses run on a bounded pool
+alert_scheduler = TimerScheduler(max_workers=2, name="alert-timers")
+response_executor = ThreadPoolExecutor(
+    max_workers=pipeline_config.get('alert_response_workers', 4),
+    thread_name_prefix="alert-response"
+)
+response_counts = {"submitted": 0, "in_flight": 0, "completed": 0}
+response_counts_lock = threading.Lock()
+
+# Alert lifecycle events pushed to dashboards over /api/alerts/stream
+alert_events = EventBus(
+    history_size=pipeline_config.get('alert_event_history', 1000),
+    max_queue_size=pipeline_config.get('alert_event_queue_size', 100)
+)
+SSE_HEARTBEAT_SECONDS = 15
+
+# Uploads are analysed once per content; client retries get the cached result and alert
+analysis_cache = AnalysisCache(
+    max_entries=pipeline_config.get('analysis_cache_size', 256),
+    ttl_seconds=pipeline_config.get('analysis_cache_ttl_seconds', 600)
+)
+# Alert id raised per audio content, kept even when the result itself is not cached
+pipeline_alert_ids = AnalysisCache(
+    max_entries=pipeline_config.get('analysis_cache_size', 256),
+    ttl_seconds=pipeline_config.get('alert_dedupe_ttl_seconds', 600)
+)
+
+# Open streaming ingestion sessions
+stream_sessions = StreamSessionManager(
+    idle_timeout_seconds=pipeline_config.get('stream_idle_timeout_seconds', 300)
+)
+STREAM_READ_CHUNK_BYTES = 8192
+
+# Request, alert and queue metrics exported at /api/metrics
+HTTP_REQUESTS = metrics.counter("http_requests_total", "HTTP requests by route and status", ["method", "route", "status"])
+HTTP_SECONDS = metrics.histogram("http_request_duration_seconds", "HTTP request latency by route", ["method", "route"])
+HTTP_IN_FLIGHT = metrics.gauge("http_requests_in_flight", "HTTP requests currently being handled")
+ALERT_EVENTS = metrics.counter("alert_events_total", "Alert lifecycle events", ["event"])
+ALERT_DETECTION_TO_NOTIFICATION = metrics.histogram(
+    "alert_detection_to_notification_seconds",
+    "Time from distress detection to the first delivered emergency email",
+    buckets=(0.5, 1, 2.5, 5, 10, 12.5, 15, 20, 30, 60)
+)
+ANALYSIS_CACHE_LOOKUPS = metrics.counter(
+    "analysis_cache_lookups_total", "Audio analysis cache lookups (hit, miss, coalesced)", ["result"])
+QUEUE_DEPTH = metrics.gauge("queue_depth", "Items waiting or running in internal queues", ["queue"])
+QUEUE_DEPTH.set_function(alert_scheduler.pending, queue="alert_timers")
+QUEUE_DEPTH.set_function(lambda: response_counts['in_flight'], queue="alert_responses")
+QUEUE_DEPTH.set_function(lambda: alert_events.stats()['max_queue_depth'], queue="alert_event_subscribers")
+metrics.gauge("alert_event_subscribers", "Connected alert stream clients").set_function(
+    lambda: alert_events.stats()['subscribers'])
+metrics.gauge("stream_sessions_open", "Open streaming ingestion sessions").set_function(
+    lambda: len(stream_sessions))
+if HAS_COMBINED_PIPELINE:
+    def _hf_batch_queue_depth() -> int:
+        # Never start the batcher from a scrape; 0 until the first request (or with batching disabled)
+        batcher = current_hf_batcher()
+        return batcher.queue_depth() if batcher else 0
+
+    QUEUE_DEPTH.set_function(_hf_batch_queue_depth, queue="wav2vec2_batch")
+
+
+@app.before_request
+def _start_request_metrics():
+    g.request_started = time.perf_counter()
+    HTTP_IN_FLIGHT.inc()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    # Label by route pattern, not the raw path, to keep alert ids out of the label set
+    route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    HTTP_REQUESTS.inc(method=request.method, route=route, status=str(response.status_code))
+    HTTP_SECONDS.observe(time.perf_counter() - g.request_started, method=request.method, route=route)
+    return response
+
+
+@app.teardown_request
+def _finish_request_metrics(exc):
+    if 'request_started' in g:
+        HTTP_IN_FLIGHT.dec()
 
 
 @app.route('/api/health', methods=['GET'])
@@ -49,6 +162,61 @@ def health():
     return jsonify({"status": "ok", "message": "API is running"})
 
 
+@app.route('/api/health/live', methods=['GET'])
+def health_live():
+    """Liveness probe: the process is up and serving requests"""
+    return jsonify({"status": "alive"})
+
+
+@app.route('/api/health/ready', methods=['GET'])
+def health_ready():
+    """Readiness probe: per-model load state and timings. 503 until the audio models are loaded."""
+    if not HAS_COMBINED_PIPELINE:
+        return jsonify({"ready": False, "error": "Combined pipeline not available"}), 503
+
+    pipeline_status = pipeline_model_manager.status()
+    text_status = text_model_manager.status()
+    ready = pipeline_status["ready"]
+    response = {
+        "ready": ready,
+        "models": {**pipeline_status["models"], **text_status["models"]},
+        "warmup": pipeline_status["warmup"],
+        "uptime_seconds": pipeline_status["uptime_seconds"],
+    }
+    return jsonify(response), (200 if ready else 503)
+
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Runtime statistics for the analysis pipeline"""
+    if not HAS_COMBINED_PIPELINE:
+        return jsonify({"error": "Combined pipeline not available"}), 500
+
+    batcher = current_hf_batcher()
+    try:
+        asr_stats = get_transcriber().stats()
+    except Exception as e:
+        asr_stats = {"error": str(e)}
+    return jsonify({
+        "hf_batcher": batcher.stats() if batcher else None,
+        "asr": asr_stats,
+        "vad": vad_counters.stats(),
+        "emotion_cascade": cascade_counters.stats(),
+        "alerts": alert_store.stats(),
+        "alert_scheduler": alert_scheduler.stats(),
+        "alert_responses": {**response_counts, "workers": pipeline_config.get('alert_response_workers', 4)},
+        "alert_events": alert_events.stats(),
+        "analysis_cache": analysis_cache.stats(),
+        "location": get_location_service().stats()
+    })
+
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus metrics (text exposition format)"""
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_text():
     """
@@ -80,7 +248,7 @@ def analyze_text():
         
         # If distress detected (by keyword or emotion), trigger alert
         if distress_detected:
-            alert_id = f"alert_{int(datetime.now().timestamp() * 1000)}"
+            alert_id = new_alert_id()
             confidence = result.get('confidence', 0.9)
             reason = result.get('reason', 'unknown')
             
@@ -90,24 +258,17 @@ def analyze_text():
             else:
                 source = reason.replace('keyword: ', '').strip("'")
             
-            # Store alert info
-            active_alerts[alert_id] = {
-                "id": alert_id,
-                "source": source,
-                "confidence": confidence,
-                "emotion": emotion,
-                "message": f"Distress detected: {transcript}",
-                "timestamp": datetime.now().isoformat(),
-                "status": "pending_confirmation",
-                "cancelled": False,
-                "expires_at": (datetime.now().timestamp() + 10)  # 10 second window
-            }
+            # Store alert info and start 10-second countdown - auto-trigger if not cancelled
+            create_pending_alert(
+                alert_id,
+                source=source,
+                confidence=confidence,
+                emotion=emotion,
+                message=f"Distress detected: {transcript}"
+            )
             
             response["alert_id"] = alert_id
             response["alert_triggered"] = True
-            
-            # Start 10-second countdown - auto-trigger if not cancelled
-            start_alert_countdown(alert_id)
         
         return jsonify(response)
         
@@ -134,21 +295,11 @@ def analyze_audio():
         if 'audio' in request.files:
             audio_file = request.files['audio']
             if audio_file.filename:
-                # Save uploaded file temporarily
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-                audio_file.save(temp_file.name)
-                
                 try:
-                    # Load audio file
-                    audio_data, sample_rate = librosa.load(temp_file.name, sr=None)
+                    # Decode straight from the upload stream (no temp file) to mono 16 kHz, once
+                    audio_data, sample_rate = decode_audio_bytes(audio_file.stream.read(), CANONICAL_SAMPLE_RATE)
                 except Exception as e:
                     return jsonify({"error": f"Failed to load audio file: {str(e)}"}), 400
-                finally:
-                    # Clean up temp file
-                    try:
-                        os.unlink(temp_file.name)
-                    except:
-                        pass
         
         # Check if audio is provided as base64 in JSON
         elif request.is_json:
@@ -158,27 +309,20 @@ def analyze_audio():
             
             if audio_base64:
                 try:
-                    # Decode base64 audio
-                    audio_bytes = base64.b64decode(audio_base64)
-                    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-                    temp_file.write(audio_bytes)
-                    temp_file.close()
-                    
-                    try:
-                        audio_data, sample_rate = librosa.load(temp_file.name, sr=None)
-                    finally:
-                        try:
-                            os.unlink(temp_file.name)
-                        except:
-                            pass
+                    # Decode base64 audio in memory
+                    audio_data, sample_rate = decode_audio_bytes(base64.b64decode(audio_base64), CANONICAL_SAMPLE_RATE)
                 except Exception as e:
                     return jsonify({"error": f"Failed to decode audio: {str(e)}"}), 400
         
         if audio_data is None:
             return jsonify({"error": "No audio data provided. Send 'audio' file or base64 'audio' in JSON."}), 400
         
-        # Use combined pipeline to analyze
-        result = analyze_audio_from_data(audio_data, sample_rate)
+        max_seconds = pipeline_config.get("max_audio_seconds", 300)
+        if max_seconds and len(audio_data) > max_seconds * sample_rate:
+            return jsonify({"error": f"Audio too long: {len(audio_data) / sample_rate:.1f}s (limit {max_seconds}s)"}), 413
+        
+        # Use combined pipeline to analyze (once per audio content, see analyze_audio_cached)
+        result, cache_status = analyze_audio_cached(audio_data, sample_rate)
         
         # Extract distress detection info
         distress_detected = result.get('distress_detected', False)
@@ -197,39 +341,21 @@ def analyze_audio():
                 "reason": reason,
                 **result.get('keywords', {})
             },
+            "timings_ms": result.get('timings_ms', {}),
+            "gated": result.get('gated', False),
+            "vad": result.get('vad'),
+            "hf_timeline": result.get('hf_timeline'),
+            "escalated": result.get('escalated'),
+            "transcription_error": result.get('transcription_error'),
             "distress_detected": distress_detected,
+            "cache": cache_status,
             "timestamp": datetime.now().isoformat()
         }
         
-        # If distress detected, trigger alert
+        # The alert was created with the analysis; a retried upload gets the same alert
         if distress_detected:
-            alert_id = f"alert_{int(datetime.now().timestamp() * 1000)}"
-            
-            # Determine source
-            if 'emotion' in reason.lower():
-                source = f"combined_pipeline ({emotion})"
-            else:
-                source = reason.replace('keyword: ', '').strip("'")
-            
-            # Store alert info
-            active_alerts[alert_id] = {
-                "id": alert_id,
-                "source": source,
-                "confidence": confidence,
-                "emotion": emotion,
-                "emotions": result.get('emotions', {}),
-                "message": f"Distress detected: {result.get('transcript', '')}",
-                "timestamp": datetime.now().isoformat(),
-                "status": "pending_confirmation",
-                "cancelled": False,
-                "expires_at": (datetime.now().timestamp() + 10)
-            }
-            
-            response["alert_id"] = alert_id
+            response["alert_id"] = result.get('alert_id')
             response["alert_triggered"] = True
-            
-            # Start 10-second countdown
-            start_alert_countdown(alert_id)
         
         return jsonify(response)
         
@@ -238,27 +364,209 @@ def analyze_audio():
         return jsonify({"error": str(e), "traceback": traceback.format_exc()}), 500
 
 
+def analyze_audio_cached(audio_data: np.ndarray, sample_rate: int):
+    """
+    Analyze an upload and create its alert, once per audio content. Identical audio
+    (e.g. a client retry) returns the cached result, and concurrent identical
+    uploads wait for the one analysis in progress. Results that are not cached
+    (see _is_complete_analysis) are analysed again, but reuse the alert already
+    raised for the same audio instead of creating another.
+    Returns (result, cache status: "hit", "miss", "coalesced" or None if disabled).
+    """
+    key = analysis_key(audio_data, sample_rate, model_versions())
+    results = analysis_cache if pipeline_config.get('analysis_cache_enabled', True) else None
+    result, status = analyze_with_alert(
+        key,
+        lambda: analyze_audio_from_data(audio_data, sample_rate, include_features=True),
+        trigger_pipeline_alert,
+        alert_ids=pipeline_alert_ids,
+        results=results,
+        cacheable=_is_complete_analysis
+    )
+    if status is not None:
+        ANALYSIS_CACHE_LOOKUPS.inc(result=status)
+    return result, status
+
+
+def _is_complete_analysis(result: Dict) -> bool:
+    """
+    Whether an analysis may be cached: not if transcription failed (a retry should
+    get another ASR attempt) or if it was short-circuited with models still pending.
+    """
+    if result.get('transcription_error'):
+        return False
+    return 'pending' not in result.get('emotions', {}).values()
+
+
+def trigger_pipeline_alert(result: Dict) -> str:
+    """Create a pending alert from a combined pipeline result and return its id"""
+    alert_id = new_alert_id()
+    emotion = result.get('emotions', {}).get('final', 'neutral')
+    reason = result.get('reason', 'unknown')
+    
+    # Determine source
+    if 'emotion' in reason.lower():
+        source = f"combined_pipeline ({emotion})"
+    else:
+        source = reason.replace('keyword: ', '').strip("'")
+    
+    create_pending_alert(
+        alert_id,
+        source=source,
+        confidence=result.get('confidence', 0.2),
+        emotion=emotion,
+        emotions=result.get('emotions', {}),
+        message=f"Distress detected: {result.get('transcript', '')}"
+    )
+    return alert_id
+
+
+def _analyze_stream_window(window: np.ndarray, sample_rate: int) -> Dict:
+    """Analyzer for streaming sessions: run the combined pipeline on one window (alerts are raised by the session)"""
+    result = analyze_audio_from_data(window, sample_rate)
+    summary = {
+        "transcript": result.get('transcript', ''),
+        "emotion": result.get('emotions', {}).get('final', 'neutral'),
+        "emotions": result.get('emotions', {}),
+        "distress_detected": result.get('distress_detected', False),
+        "confidence": result.get('confidence', 0.2),
+        "reason": result.get('reason', 'unknown'),
+        "gated": result.get('gated', False),
+        "timestamp": datetime.now().isoformat()
+    }
+    return summary
+
+
+def _create_stream_session(options: Dict):
+    """Create a stream session from client options (raises ValueError on bad options)"""
+    return stream_sessions.create(
+        analyzer=_analyze_stream_window,
+        alerter=trigger_pipeline_alert,
+        sample_rate=int(options.get('sample_rate', 16000)),
+        sample_format=options.get('format', 'int16'),
+        window_seconds=float(options.get('window_seconds', pipeline_config.get('stream_window_seconds', 4.0))),
+        hop_seconds=float(options.get('hop_seconds', pipeline_config.get('stream_hop_seconds', 1.0))),
+        emit_all_windows=bool(options.get('emit_all_windows', False))
+    )
+
+
+@app.route('/api/stream/sessions', methods=['POST'])
+def create_stream_session():
+    """
+    Open a streaming session.
+    Expected JSON (all optional): {"sample_rate": 16000, "format": "int16" | "float32",
+                                   "window_seconds": 4.0, "hop_seconds": 1.0, "emit_all_windows": false}
+    """
+    if not HAS_COMBINED_PIPELINE:
+        return jsonify({"error": "Combined pipeline not available. Please install required dependencies."}), 500
+    try:
+        session = _create_stream_session(request.get_json(silent=True) or {})
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"success": True, **session.status()})
+
+
+@app.route('/api/stream/sessions/<session_id>/frames', methods=['POST'])
+def push_stream_frames(session_id):
+    """
+    Append raw little-endian mono PCM frames to a session (body may be chunked).
+    Responds with newline-delimited JSON events as windows complete, then an 'ack' with session status.
+    """
+    session = stream_sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Stream session not found"}), 404
+    
+    def generate():
+        while True:
+            chunk = request.stream.read(STREAM_READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            for event in session.push(chunk):
+                yield json.dumps(event) + "\n"
+        yield json.dumps({"type": "ack", **session.status()}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/api/stream/sessions/<session_id>', methods=['DELETE'])
+def close_stream_session(session_id):
+    """Close a streaming session"""
+    session = stream_sessions.close(session_id)
+    if session is None:
+        return jsonify({"error": "Stream session not found"}), 404
+    return jsonify({"success": True, **session.status()})
+
+
+def _parse_control_message(text: str) -> Dict:
+    """A WebSocket text message as a JSON object (raises ValueError otherwise)"""
+    message = json.loads(text or '{}')
+    if not isinstance(message, dict):
+        raise ValueError("Control messages must be JSON objects")
+    return message
+
+
+if HAS_FLASK_SOCK:
+    @sock.route('/api/stream/ws')
+    def stream_websocket(ws):
+        """
+        WebSocket streaming: first message is a JSON options object (same as
+        POST /api/stream/sessions), then binary PCM frames. Events are sent back as JSON text.
+        """
+        try:
+            session = _create_stream_session(_parse_control_message(ws.receive()))
+        except (TypeError, ValueError) as e:
+            ws.send(json.dumps({"type": "error", "error": str(e)}))
+            return
+        
+        ws.send(json.dumps({"type": "session", **session.status()}))
+        try:
+            while True:
+                data = ws.receive()
+                if data is None:
+                    break
+                if isinstance(data, str):
+                    # Text messages are control messages, e.g. {"type": "close"}
+                    try:
+                        message = _parse_control_message(data)
+                    except ValueError as e:
+                        ws.send(json.dumps({"type": "error", "error": f"Invalid control message: {e}"}))
+                        continue
+                    if message.get('type') == 'close':
+                        break
+                    continue
+                for event in session.push(data):
+                    ws.send(json.dumps(event))
+        finally:
+            stream_sessions.close(session.session_id)
+
+
 @app.route('/api/alert/cancel/<alert_id>', methods=['POST'])
 def cancel_alert(alert_id):
     """Cancel an active alert (false positive)"""
     try:
-        if alert_id in active_alerts:
-            active_alerts[alert_id]['cancelled'] = True
-            active_alerts[alert_id]['status'] = 'cancelled'
-            
-            # Add to history
-            alert_history.append({
-                **active_alerts[alert_id],
-                "resolved_at": datetime.now().isoformat()
-            })
-            
+        alert = alert_store.transition(
+            alert_id, ('pending', 'pending_confirmation', 'confirmed'),
+            cancelled=True,
+            status='cancelled',
+            resolved_at=datetime.now().isoformat()
+        )
+        if alert:
+            alert_scheduler.cancel(alert_id)
+            publish_alert_event('cancelled', alert)
             return jsonify({
                 "success": True,
                 "message": "Alert cancelled",
                 "alert_id": alert_id
             })
-        else:
-            return jsonify({"error": "Alert not found"}), 404
+
+        existing = alert_store.get(alert_id, fresh=True)
+        if existing:
+            return jsonify({
+                "success": True,
+                "message": f"Alert already {existing.get('status')}",
+                "alert_id": alert_id
+            })
+        return jsonify({"error": "Alert not found"}), 404
             
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -268,30 +576,32 @@ def cancel_alert(alert_id):
 def confirm_alert(alert_id):
     """Confirm an alert (proceed with emergency response)"""
     try:
-        if alert_id in active_alerts:
-            alert = active_alerts[alert_id]
-            
-            # Prevent duplicate triggers
-            if alert.get('status') == 'confirmed' or alert.get('status') == 'responded':
-                return jsonify({
-                    "success": True,
-                    "message": "Alert already confirmed",
-                    "alert_id": alert_id
-                })
-            
-            alert['status'] = 'confirmed'
-            alert['confirmed_at'] = datetime.now().isoformat()
-            
+        # Atomic status change prevents duplicate triggers, even across workers
+        alert = alert_store.transition(
+            alert_id, ('pending', 'pending_confirmation'),
+            status='confirmed',
+            confirmed_at=datetime.now().isoformat()
+        )
+        if alert:
+            alert_scheduler.cancel(alert_id)
+            publish_alert_event('confirmed', alert)
             # Trigger actual emergency response (alarm + location + emails)
             trigger_emergency_response(alert_id, alert)
-            
+
             return jsonify({
                 "success": True,
                 "message": "Emergency response triggered",
                 "alert_id": alert_id
             })
-        else:
-            return jsonify({"error": "Alert not found"}), 404
+
+        existing = alert_store.get(alert_id, fresh=True)
+        if existing:
+            return jsonify({
+                "success": True,
+                "message": f"Alert already {existing.get('status')}",
+                "alert_id": alert_id
+            })
+        return jsonify({"error": "Alert not found"}), 404
             
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -300,24 +610,78 @@ def confirm_alert(alert_id):
 @app.route('/api/alerts/active', methods=['GET'])
 def get_active_alerts():
     """Get all active alerts"""
-    active = {k: v for k, v in active_alerts.items() if v['status'] == 'pending'}
-    return jsonify({"alerts": list(active.values())})
+    return jsonify({"alerts": alert_store.list_active()})
 
 
 @app.route('/api/alerts/history', methods=['GET'])
 def get_alert_history():
-    """Get alert history"""
+    """Get alert history (pass next_cursor back as ?cursor= for older pages)"""
     limit = request.args.get('limit', 50, type=int)
-    history = alert_history[-limit:]
-    return jsonify({"alerts": history, "total": len(alert_history)})
+    cursor = request.args.get('cursor')
+    try:
+        return jsonify(alert_store.history(limit=limit, cursor=cursor))
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+
+@app.route('/api/alerts/stream', methods=['GET'])
+def stream_alert_events():
+    """
+    Server-Sent Events stream of alert lifecycle events. Browsers reconnect with
+    the Last-Event-ID header and get the events they missed; a "resync" event
+    means the gap is too old and the client should reload its alert lists.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    subscription = alert_events.subscribe(last_event_id)
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            for event in subscription.replay:
+                yield format_sse(event)
+            while True:
+                event = subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                if event is CLOSED:
+                    break
+                # Comment line keeps proxies from closing an idle connection
+                yield format_sse(event) if event is not None else ": heartbeat\n\n"
+        finally:
+            alert_events.unsubscribe(subscription)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+@app.route('/api/location', methods=['POST'])
+def update_location():
+    """Accept the device location from the client (browser geolocation)"""
+    data = request.get_json(silent=True) or {}
+    try:
+        latitude = float(data['latitude'])
+        longitude = float(data['longitude'])
+        accuracy = float(data['accuracy']) if data.get('accuracy') is not None else None
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "latitude and longitude required"}), 400
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return jsonify({"error": "Coordinates out of range"}), 400
+
+    location = get_location_service().set_client_location(
+        latitude, longitude, accuracy=accuracy, address=data.get('address')
+    )
+    return jsonify({"success": True, "location": location})
 
 
 @app.route('/api/config/contacts', methods=['GET'])
 def get_contacts():
     """Get emergency contacts from config"""
     try:
-        config = load_config()
-        contacts = config.get('emergency_contacts', [])
+        contacts = get_config().get('emergency_contacts', [])
         return jsonify({"contacts": contacts})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -334,84 +698,111 @@ def add_contact():
         if not name or not email:
             return jsonify({"error": "Name and email required"}), 400
         
-        config = load_config()
-        contacts = config.get('emergency_contacts', [])
-        contacts.append({"name": name, "email": email})
-        
-        # Save config
-        config['emergency_contacts'] = contacts
-        config_path = os.path.join(os.path.dirname(__file__), 'scripts', 'alert_config.json')
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        # Read-modify-write under the config lock; notifications use the new list immediately
+        config = update_config(lambda current: {
+            'emergency_contacts': current.get('emergency_contacts', []) + [{"name": name, "email": email}]
+        })
         
-        return jsonify({"success": True, "contacts": contacts})
+        return jsonify({"success": True, "contacts": config['emergency_contacts']})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def create_pending_alert(alert_id: str, source: str, confidence: float, emotion: str, message: str, **extra):
+    """Store a new alert awaiting confirmation and start its countdown"""
+    alert = alert_store.create({
+        "id": alert_id,
+        "source": source,
+        "confidence": confidence,
+        "emotion": emotion,
+        **extra,
+        "message": message,
+        "timestamp": datetime.now().isoformat(),
+        "status": "pending_confirmation",
+        "cancelled": False,
+        "expires_at": (datetime.now().timestamp() + 10)  # 10 second window
+    })
+    
+    # Start 10-second countdown - auto-trigger if not cancelled
+    start_alert_countdown(alert_id)
+    # Connect to the SMTP server and make sure a location is cached during the countdown
+    warm_notification_pool()
+    get_location_service().get()
+    publish_alert_event('created', alert)
+    return alert
+
+
+def publish_alert_event(event_type: str, alert: Dict):
+    """Push an alert lifecycle event (created, cancelled, confirmed, responded, error) to subscribers"""
+    if alert:
+        ALERT_EVENTS.inc(event=event_type)
+        alert_events.publish(event_type, {"alert": alert})
+
+
 def start_alert_countdown(alert_id: str):
     """Start 10-second countdown. Auto-triggers emergency if not cancelled."""
-    import threading
-    import time
-    
-    def countdown():
-        try:
-            time.sleep(10)  # Wait 10 seconds
-            # Check if alert still exists and wasn't cancelled
-            if alert_id in active_alerts:
-                alert = active_alerts[alert_id]
-                if alert.get('status') == 'pending_confirmation' and not alert.get('cancelled', False):
-                    # Auto-confirm and trigger emergency
-                    print(f"⏱️  Alert {alert_id}: 10-second window expired. Auto-triggering emergency...")
-                    alert['status'] = 'confirmed'
-                    alert['confirmed_at'] = datetime.now().isoformat()
-                    trigger_emergency_response(alert_id, alert)
-        except Exception as e:
-            print(f"Error in alert countdown: {e}")
-    
-    thread = threading.Thread(target=countdown, daemon=True)
-    thread.start()
+    alert_scheduler.schedule(10, alert_countdown_expired, alert_id, key=alert_id)
+
+
+def alert_countdown_expired(alert_id: str):
+    """Countdown callback: auto-confirm only if the alert is still awaiting confirmation"""
+    alert = alert_store.transition(
+        alert_id, ('pending_confirmation',),
+        status='confirmed',
+        confirmed_at=datetime.now().isoformat()
+    )
+    if alert:
+        print(f"⏱️  Alert {alert_id}: 10-second window expired. Auto-triggering emergency...")
+        publish_alert_event('confirmed', alert)
+        trigger_emergency_response(alert_id, alert)
 
 
 def trigger_emergency_response(alert_id: str, alert: Dict):
-    """Trigger actual emergency response (alarm + email)"""
-    import threading
-    
+    """Trigger actual emergency response (alarm + location + email) on the bounded response pool"""
+    confirmed_at = time.perf_counter()
+    confirmed_wall = datetime.now()
+
     def run_response():
         try:
-            from alert_system import send_notifications_to_contacts, get_location, play_alarm_sound
-            import time
-            
-            # Get location
-            location = get_location()
-            
-            # Play alarm sound
-            play_alarm_sound()
-            
-            # Send emails
-            timestamp = alert.get('timestamp', datetime.now().isoformat())
-            send_notifications_to_contacts(
-                location=location,
-                timestamp=timestamp,
+            # Alarm, location and notifications run concurrently
+            response = run_emergency_response(
                 source=alert.get('source', 'unknown'),
                 confidence=alert.get('confidence', 0.9),
-                message=alert.get('message', '')
+                message=alert.get('message', ''),
+                timestamp=alert.get('timestamp', datetime.now().isoformat()),
+                confirmed_at=confirmed_at
             )
+            timings = response['timings_ms']
+            if timings.get('first_notification') is not None:
+                print(f"📧 Alert {alert_id}: first notification {timings['first_notification']:.0f} ms after confirmation")
+                detected_at = datetime.fromisoformat(alert.get('timestamp', confirmed_wall.isoformat()))
+                ALERT_DETECTION_TO_NOTIFICATION.observe(
+                    (confirmed_wall - detected_at).total_seconds() + timings['first_notification'] / 1000)
             
-            # Update alert status
-            alert['status'] = 'responded'
-            alert['response_sent_at'] = datetime.now().isoformat()
-            
-            # Move to history
-            alert_history.append(alert.copy())
+            # Update alert status (resolved alerts make up the history); a cancel
+            # that landed during the response keeps the alert cancelled
+            publish_alert_event('responded', alert_store.transition(
+                alert_id, ('confirmed',),
+                status='responded',
+                response_sent_at=datetime.now().isoformat(),
+                location=response['location'],
+                notifications=[report.to_dict() for report in response['deliveries']],
+                response_timings_ms=timings
+            ))
             
         except Exception as e:
             print(f"Error in emergency response: {e}")
-            alert['status'] = 'error'
-            alert['error'] = str(e)
+            publish_alert_event('error', alert_store.transition(
+                alert_id, ('confirmed',), status='error', error=str(e)))
+        finally:
+            with response_counts_lock:
+                response_counts['in_flight'] -= 1
+                response_counts['completed'] += 1
     
-    thread = threading.Thread(target=run_response, daemon=True)
-    thread.start()
+    with response_counts_lock:
+        response_counts['in_flight'] += 1
+        response_counts['submitted'] += 1
+    response_executor.submit(run_response)
 
 
 # Serve frontend static files in production
@@ -427,6 +818,23 @@ def serve_frontend(path):
     return jsonify({"message": "Frontend not built. Run 'npm run build' in frontend directory"})
 
 
+def start_background_model_loading():
+    """Load the heavy models, location cache and alarm audio off the request path so the API is up immediately."""
+    if not HAS_COMBINED_PIPELINE:
+        return
+    start_model_loading()
+    text_model_manager.start_background()
+    if get_config().get('use_location', True):
+        get_location_service().start_background()
+    threading.Thread(target=preload_alarm, name="alarm-preload", daemon=True).start()
+
+
+# In debug mode the reloader parent only watches files; only the serving
+# process (WERKZEUG_RUN_MAIN) or an imported app (e.g. gunicorn) loads models.
+if __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    start_background_model_loading()
+
+
 if __name__ == '__main__':
     print("=" * 60)
     print("🚀 Starting Distress Detection API Server")
@@ -22,6 +22,13 @@ export interface Alert {
   cancelled?: boolean;
 }
 
+export type AlertEventType = 'created' | 'cancelled' | 'confirmed' | 'responded' | 'error' | 'resync';
+
+export interface AlertEvent {
+  type: AlertEventType;
+  alert?: Alert;
+}
+
 export interface AnalyzeResponse {
   success: boolean;
   result: DistressAnalysis;
@@ -102,6 +109,35 @@ export const api = {
     return data.alerts || [];
   },
 
+  /**
+   * Subscribe to alert lifecycle events (Server-Sent Events).
+   * The browser reconnects on its own and resumes from the last event it saw.
+   * Returns a function that closes the stream.
+   */
+  subscribeAlerts(onEvent: (event: AlertEvent) => void): () => void {
+    const source = new EventSource(`${API_BASE}/alerts/stream`);
+    source.onmessage = (message) => {
+      try {
+        onEvent(JSON.parse(message.data));
+      } catch (error) {
+        console.error('Invalid alert event:', error);
+      }
+    };
+    return () => source.close();
+  },
+
+  /**
+   * Report the device location (browser geolocation) for emergency notifications
+   */
+  async updateLocation(latitude: number, longitude: number, accuracy?: number): Promise<void> {
+    const response = await fetch(`${API_BASE}/location`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ latitude, longitude, accuracy }),
+    });
+    if (!response.ok) throw new Error('Failed to update location');
+  },
+
   /**
    * Get emergency contacts
    */
@@ -83,8 +83,13 @@ export default function AlertHistory() {
     };
 
     fetchHistory();
-    const interval = setInterval(fetchHistory, 5000);
-    return () => clearInterval(interval);
+    // Reload only when an alert is resolved instead of polling
+    const unsubscribe = api.subscribeAlerts((event) => {
+      if (["cancelled", "responded", "error", "resync"].includes(event.type)) {
+        fetchHistory();
+      }
+    });
+    return unsubscribe;
   }, []);
 
   const getSeverityColor = (confidence: number) => {
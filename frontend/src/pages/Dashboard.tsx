@@ -29,18 +29,58 @@ export default function Dashboard() {
     }
   }, []);
 
+  // While location is enabled, share the browser position with the backend
+  // (at most once a minute) so alerts carry a precise location
   useEffect(() => {
-    // Poll for active alerts
-    const interval = setInterval(async () => {
+    if (!locationEnabled || !('geolocation' in navigator)) return;
+    let lastSent = 0;
+    const watchId = navigator.geolocation.watchPosition(
+      (position) => {
+        const now = Date.now();
+        if (now - lastSent < 60000) return;
+        lastSent = now;
+        api
+          .updateLocation(position.coords.latitude, position.coords.longitude, position.coords.accuracy)
+          .catch((error) => console.error("Failed to update location:", error));
+      },
+      (error) => console.error("Geolocation error:", error),
+      { enableHighAccuracy: true, maximumAge: 60000 }
+    );
+    return () => navigator.geolocation.clearWatch(watchId);
+  }, [locationEnabled]);
+
+  useEffect(() => {
+    // Load active alerts once, then keep them current from the alert event stream
+    const activeIds = new Set<string>();
+    const updateStats = () => setAlertStats({ active: activeIds.size, total: activeIds.size });
+
+    const loadActiveAlerts = async () => {
       try {
         const alerts = await api.getActiveAlerts();
-        setAlertStats({ active: alerts.length, total: alerts.length });
+        activeIds.clear();
+        alerts.forEach((alert) => activeIds.add(alert.id));
+        updateStats();
       } catch (error) {
         console.error("Failed to fetch alerts:", error);
       }
-    }, 2000);
+    };
+
+    loadActiveAlerts();
+    const unsubscribe = api.subscribeAlerts((event) => {
+      if (event.type === "resync") {
+        loadActiveAlerts();
+        return;
+      }
+      if (!event.alert) return;
+      if (event.type === "created") {
+        activeIds.add(event.alert.id);
+      } else {
+        activeIds.delete(event.alert.id);
+      }
+      updateStats();
+    });
 
-    return () => clearInterval(interval);
+    return unsubscribe;
   }, []);
 
   const handleDistressDetected = (alert: {
@@ -0,0 +1,224 @@
+"""
+Persistent Alert Store
+SQLite (WAL mode) storage for alerts, shared by every worker process.
+Status changes are atomic compare-and-set transitions, history is paged with
+an opaque cursor, pending alerts are kept in a bounded in-memory cache
+(refreshed on every write in this process; changes made by other workers are
+seen after at most cache_ttl_seconds, or at once with get(fresh=True)), and
+old resolved alerts are removed by retention compaction.
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Statuses after which an alert is part of the history
+RESOLVED_STATUSES = ("cancelled", "responded", "error")
+ACTIVE_STATUSES = ("pending", "pending_confirmation")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    resolved_at REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_status_created ON alerts (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_alerts_resolved ON alerts (resolved_at, id);
+"""
+
+
+def new_alert_id() -> str:
+    """Unique alert id; unlike a timestamp, safe for alerts created in the same millisecond."""
+    return f"alert_{uuid.uuid4().hex}"
+
+
+def _encode_cursor(resolved_at: float, alert_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{resolved_at!r}|{alert_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, str]:
+    resolved_at, alert_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+    return float(resolved_at), alert_id
+
+
+class AlertStore:
+    """Alert storage backed by one SQLite database file."""
+
+    def __init__(self, path: str, cache_size: int = 256, retention_days: float = 90,
+                 compact_every: int = 500, cache_ttl_seconds: float = 2.0):
+        self.path = path
+        self.cache_size = cache_size
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.retention_days = retention_days
+        self.compact_every = compact_every
+        self._local = threading.local()
+        # id -> (cached at, alert) for pending alerts
+        self._cache: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._writes_since_compact = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+        self.compact()
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers run alongside a writer
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def _cache_put(self, alert: Dict):
+        with self._cache_lock:
+            if alert.get("status") in ACTIVE_STATUSES:
+                self._cache[alert["id"]] = (time.monotonic(), alert)
+                self._cache.move_to_end(alert["id"])
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.pop(alert["id"], None)
+
+    def create(self, alert: Dict) -> Dict:
+        now = time.time()
+        status = alert.get("status", "pending_confirmation")
+        alert = {**alert, "status": status}
+        self._conn().execute(
+            "INSERT INTO alerts (id, status, created_at, updated_at, resolved_at, data) VALUES (?, ?, ?, ?, ?, ?)",
+            (alert["id"], status, now, now, now if status in RESOLVED_STATUSES else None, json.dumps(alert)),
+        )
+        self._cache_put(alert)
+        self._maybe_compact()
+        return alert
+
+    def get(self, alert_id: str, fresh: bool = False) -> Optional[Dict]:
+        """
+        Alert by id. A pending alert cached less than cache_ttl_seconds ago is
+        returned from memory (another worker's change may not be visible yet);
+        otherwise, or with `fresh`, the row is read and decoded.
+        """
+        if not fresh:
+            with self._cache_lock:
+                cached = self._cache.get(alert_id)
+            if cached is not None and time.monotonic() - cached[0] < self.cache_ttl_seconds:
+                return dict(cached[1])
+        row = self._conn().execute("SELECT data FROM alerts WHERE id = ?", (alert_id,)).fetchone()
+        if row is None:
+            with self._cache_lock:
+                self._cache.pop(alert_id, None)
+            return None
+        alert = json.loads(row[0])
+        self._cache_put(alert)
+        return alert
+
+    def update(self, alert_id: str, **fields) -> Optional[Dict]:
+        """Merge fields other than status into an alert; status changes go through transition()."""
+        if "status" in fields:
+            raise ValueError("update() cannot change the status; use transition()")
+        return self.transition(alert_id, None, **fields)
+
+    def transition(self, alert_id: str, from_statuses: Optional[Iterable[str]], **fields) -> Optional[Dict]:
+        """
+        Atomically merge `fields` into the alert if its status is one of
+        `from_statuses` (any status if None). Returns the updated alert, or
+        None if it does not exist or was in another status.
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT status, resolved_at, data FROM alerts WHERE id = ?", (alert_id,)).fetchone()
+            if row is None or (from_statuses is not None and row[0] not in tuple(from_statuses)):
+                conn.execute("ROLLBACK")
+                return None
+            now = time.time()
+            alert = {**json.loads(row[2]), **fields}
+            status = alert.get("status", row[0])
+            resolved_at = row[1]
+            if status in RESOLVED_STATUSES and resolved_at is None:
+                resolved_at = now
+            # Conditional on the status just read: a concurrent change is never overwritten
+            updated = conn.execute(
+                "UPDATE alerts SET status = ?, updated_at = ?, resolved_at = ?, data = ? WHERE id = ? AND status = ?",
+                (status, now, resolved_at, json.dumps(alert), alert_id, row[0]),
+            ).rowcount
+            conn.execute("COMMIT" if updated else "ROLLBACK")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if not updated:
+            return None
+        self._cache_put(alert)
+        return alert
+
+    def list_by_status(self, statuses: Iterable[str], limit: int = 500) -> List[Dict]:
+        statuses = tuple(statuses)
+        placeholders = ",".join("?" * len(statuses))
+        rows = self._conn().execute(
+            f"SELECT data FROM alerts WHERE status IN ({placeholders}) ORDER BY created_at LIMIT ?",
+            (*statuses, limit),
+        ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def list_active(self) -> List[Dict]:
+        return self.list_by_status(ACTIVE_STATUSES)
+
+    def history(self, limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        """
+        One page of resolved alerts: the `limit` most recent before `cursor`,
+        in chronological order. `next_cursor` pages further back (None at the end).
+        """
+        limit = max(1, min(int(limit), 500))
+        query = "SELECT resolved_at, id, data FROM alerts WHERE resolved_at IS NOT NULL"
+        params: list = []
+        if cursor:
+            resolved_at, alert_id = _decode_cursor(cursor)
+            query += " AND (resolved_at < ? OR (resolved_at = ? AND id < ?))"
+            params += [resolved_at, resolved_at, alert_id]
+        query += " ORDER BY resolved_at DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        conn = self._conn()
+        rows = conn.execute(query, params).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1][0], rows[-1][1]) if has_more else None
+        total = conn.execute("SELECT COUNT(*) FROM alerts WHERE resolved_at IS NOT NULL").fetchone()[0]
+        alerts = [json.loads(r[2]) for r in reversed(rows)]
+        return {"alerts": alerts, "total": total, "next_cursor": next_cursor}
+
+    def _maybe_compact(self):
+        self._writes_since_compact += 1
+        if self._writes_since_compact >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> int:
+        """Delete resolved alerts older than the retention window and checkpoint the WAL."""
+        self._writes_since_compact = 0
+        if not self.retention_days:
+            return 0
+        cutoff = time.time() - self.retention_days * 86400
+        conn = self._conn()
+        deleted = conn.execute(
+            "DELETE FROM alerts WHERE resolved_at IS NOT NULL AND resolved_at < ?", (cutoff,)
+        ).rowcount
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted
+
+    def stats(self) -> Dict:
+        conn = self._conn()
+        counts = dict(conn.execute("SELECT status, COUNT(*) FROM alerts GROUP BY status").fetchall())
+        with self._cache_lock:
+            cached = len(self._cache)
+        return {"path": self.path, "counts": counts, "cached_pending": cached}
@@ -9,11 +9,13 @@ import time
 import sys
 from datetime import datetime
 from typing import Optional, Dict, List
-import json
 import os
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from config_service import ConfigService
+from location_service import LocationService, unknown_location
+from notification_dispatcher import DeliveryReport, NotificationDispatcher, SmtpSettings
 
 try:
     import playsound
@@ -27,13 +29,6 @@ try:
 except ImportError:
     HAS_PYGAME = False
 
-try:
-    import requests
-    HAS_REQUESTS = True
-except ImportError:
-    HAS_REQUESTS = False
-    print("Warning: requests not installed. Location services will be disabled.")
-
 
 # Configuration
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), "alert_config.json")
@@ -43,100 +38,83 @@ ALARM_SOUND_PATHS = [
     os.path.join(os.path.dirname(__file__), "..", "data", "alarm.wav"),
 ]
 
-# Load or create default config
+# Defaults for keys missing from alert_config.json
+DEFAULT_CONFIG = {
+    "email_smtp_server": "smtp.gmail.com",
+    "email_smtp_port": 587,
+    "email_username": "",
+    "email_password": "",  # For Gmail, use App Password
+    "email_from": "",
+    "email_use_tls": True,  # STARTTLS when the server offers it
+    "email_pool_size": 4,  # Warm SMTP connections / concurrent sends
+    "email_max_attempts": 3,
+    "email_retry_backoff_seconds": 0.5,
+    "emergency_contacts": [],
+    "alert_window_seconds": 10,
+    "use_location": True,
+    "location_ttl_seconds": 600,  # IP location cache lifetime (refreshed in the background)
+    "client_location_ttl_seconds": 300,  # How long a browser-reported location is preferred
+    "location_timeout_seconds": 3.0,
+    "location_max_wait_seconds": 1.0  # Longest an alert waits for an uncached location
+}
+
+# In-memory config, re-read only when the file changes
+_config_service = ConfigService(CONFIG_FILE, DEFAULT_CONFIG)
+
+
 def load_config() -> Dict:
-    """Load configuration from file or return defaults."""
-    default_config = {
-        "email_smtp_server": "smtp.gmail.com",
-        "email_smtp_port": 587,
-        "email_username": "",
-        "email_password": "",  # For Gmail, use App Password
-        "email_from": "",
-        "emergency_contacts": [],
-        "alert_window_seconds": 10,
-        "use_location": True
-    }
-    
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, "r") as f:
-                config = json.load(f)
-                return {**default_config, **config}
-        except Exception as e:
-            print(f"Error loading config: {e}")
-    
-    return default_config
+    """Current configuration (a private copy; served from memory, not re-read per call)."""
+    return _config_service.copy()
+
+
+def get_config() -> Dict:
+    """Shared snapshot of the current configuration. Do not modify it."""
+    return _config_service.snapshot()
+
+
+def update_config(changes) -> Dict:
+    """
+    Atomically merge changes into alert_config.json and return the new config.
+    `changes` is a dict, or a function of the current config returning one.
+    """
+    return _config_service.update(changes)
 
 # Global alert state
 _alert_cancelled = False
-_config = load_config()
 
 
-def get_location() -> Dict[str, str]:
+_location_service: Optional[LocationService] = None
+_location_lock = threading.Lock()
+
+
+def get_location_service() -> LocationService:
+    """Shared location cache (created on first use)."""
+    global _location_service
+    with _location_lock:
+        if _location_service is None:
+            config = get_config()
+            _location_service = LocationService(
+                ttl_seconds=config.get("location_ttl_seconds", 600),
+                client_ttl_seconds=config.get("client_location_ttl_seconds", 300),
+                timeout_seconds=config.get("location_timeout_seconds", 3.0)
+            )
+        return _location_service
+
+
+def get_location(max_wait: float = 3.0) -> Dict[str, str]:
     """
-    Get current location using IP geolocation.
-    Returns dict with 'latitude', 'longitude', and 'address'.
+    Get current location (client-reported or IP geolocation).
+    Returns dict with 'latitude', 'longitude', and 'address' from the cache
+    immediately; waits up to `max_wait` seconds only if nothing is cached yet.
     """
-    if not HAS_REQUESTS:
-        return {
-            "latitude": "Unknown",
-            "longitude": "Unknown",
-            "address": "Location service unavailable"
-        }
-    
-    # Try multiple geolocation services as fallbacks
-    services = [
-        "http://ip-api.com/json/",
-        "https://ipapi.co/json/",
-        "http://ipinfo.io/json"
-    ]
-    
-    for service_url in services:
-        try:
-            response = requests.get(service_url, timeout=3)
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Handle different response formats
-                if "ip-api.com" in service_url:
-                    return {
-                        "latitude": str(data.get("lat", "Unknown")),
-                        "longitude": str(data.get("lon", "Unknown")),
-                        "address": f"{data.get('city', '')}, {data.get('regionName', '')}, {data.get('country', '')}"
-                    }
-                elif "ipapi.co" in service_url:
-                    return {
-                        "latitude": str(data.get("latitude", "Unknown")),
-                        "longitude": str(data.get("longitude", "Unknown")),
-                        "address": f"{data.get('city', '')}, {data.get('region', '')}, {data.get('country_name', '')}"
-                    }
-                elif "ipinfo.io" in service_url:
-                    loc = data.get("loc", "").split(",")
-                    return {
-                        "latitude": loc[0] if len(loc) > 0 else "Unknown",
-                        "longitude": loc[1] if len(loc) > 1 else "Unknown",
-                        "address": data.get("city", "") + ", " + data.get("region", "") + ", " + data.get("country", "")
-                    }
-        except requests.exceptions.RequestException as e:
-            # Try next service
-            continue
-        except Exception as e:
-            # Unexpected error, try next service
-            continue
-    
-    # All services failed
-    print("⚠️  Could not fetch location from any service (network may be unavailable)")
-    return {
-        "latitude": "Unknown",
-        "longitude": "Unknown",
-        "address": "Location unavailable (network error)"
-    }
+    location = get_location_service().get(max_wait=max_wait)
+    if location["latitude"] == "Unknown":
+        print("⚠️  Could not fetch location from any service (network may be unavailable)")
+    return location
 
 
-def play_alarm_sound():
-    """Play alarm sound if available."""
-    # Try to find an available alarm sound file
-    alarm_file = None
+def find_alarm_file() -> Optional[str]:
+    """First existing alarm sound file, if any."""
     for path in ALARM_SOUND_PATHS:
         abs_path = os.path.abspath(path)
         # Also try relative to project root if running from scripts folder
@@ -149,20 +127,69 @@ def play_alarm_sound():
                 abs_path = os.path.abspath(rel_path)
         
         if os.path.exists(abs_path):
-            alarm_file = abs_path
-            print(f"🔊 Found alarm file: {alarm_file}")
-            break
+            return abs_path
+    return None
+
+
+# Alarm audio prepared once by preload_alarm(): the file path, plus the pygame
+# mixer and the alarm decoded into an in-memory Sound when pygame is available
+_alarm_file: Optional[str] = None
+_alarm_sound = None
+_alarm_music_loaded = False
+_alarm_preloaded = False
+_alarm_lock = threading.Lock()
+
+
+def preload_alarm():
+    """Initialize audio output and decode the alarm once, so playback starts immediately."""
+    global _alarm_file, _alarm_sound, _alarm_music_loaded, _alarm_preloaded
+    with _alarm_lock:
+        if _alarm_preloaded:
+            return
+        _alarm_preloaded = True
+        _alarm_file = find_alarm_file()
+        if not _alarm_file or not HAS_PYGAME:
+            return
+        try:
+            pygame.mixer.init()
+        except Exception as e:
+            print(f"⚠️  Could not initialize audio output: {e}")
+            return
+        try:
+            _alarm_sound = pygame.mixer.Sound(_alarm_file)
+            print(f"🔊 Alarm preloaded: {_alarm_file} ({_alarm_sound.get_length():.1f}s)")
+        except Exception as e:
+            # Older SDL_mixer builds can't decode MP3 into a Sound; stream it instead
+            try:
+                pygame.mixer.music.load(_alarm_file)
+                _alarm_music_loaded = True
+            except Exception as music_error:
+                print(f"⚠️  Could not preload alarm: {e}; {music_error}")
+
+
+def _beep_in_background(winsound):
+    """Three beeps (about 2 s of blocking calls) on their own thread."""
+    def beep():
+        for _ in range(3):
+            winsound.Beep(1000, 500)
+            time.sleep(0.2)
+    threading.Thread(target=beep, name="alarm-beep", daemon=True).start()
+
+
+def play_alarm_sound():
+    """Play alarm sound if available. Returns as soon as playback has started."""
+    preload_alarm()
+    alarm_file = _alarm_file
     
     if alarm_file:
-        # Try pygame first (most reliable, supports MP3/WAV)
-        if HAS_PYGAME:
+        # Preloaded pygame audio (most reliable, supports MP3/WAV)
+        if _alarm_sound is not None or _alarm_music_loaded:
             try:
-                pygame.mixer.init()
-                pygame.mixer.music.load(alarm_file)
-                pygame.mixer.music.play()
-                print(f"🔊 Playing alarm sound with pygame: {alarm_file}")
-                # Wait a bit for sound to start, then return (sound plays in background)
-                time.sleep(0.5)
+                if _alarm_sound is not None:
+                    _alarm_sound.play()
+                else:
+                    pygame.mixer.music.play()
+                print(f"🔊 Playing alarm sound: {alarm_file}")
                 return
             except Exception as e:
                 print(f"⚠️  Error playing with pygame: {e}")
@@ -170,18 +197,18 @@ def play_alarm_sound():
         # Try playsound (works on Windows, Mac, Linux)
         if HAS_PLAYSOUND:
             try:
-                # Use block=True in a thread to ensure sound plays
-                import threading
+                # Blocking playback on its own thread; the alarm thread returns at once
                 def play_in_thread():
                     try:
                         playsound.playsound(alarm_file, block=True)
-                    except:
-                        # Some versions need different call
-                        playsound.playsound(alarm_file)
-                thread = threading.Thread(target=play_in_thread, daemon=True)
-                thread.start()
+                    except Exception:
+                        try:
+                            # Some versions need different call
+                            playsound.playsound(alarm_file)
+                        except Exception as e:
+                            print(f"⚠️  Error playing with playsound: {e}")
+                threading.Thread(target=play_in_thread, name="alarm-playsound", daemon=True).start()
                 print(f"🔊 Playing alarm sound with playsound: {alarm_file}")
-                time.sleep(0.5)  # Give it time to start
                 return
             except Exception as e:
                 print(f"⚠️  Error playing with playsound: {e}")
@@ -196,9 +223,7 @@ def play_alarm_sound():
                 return
             else:
                 # For MP3, use beep as fallback
-                for _ in range(3):
-                    winsound.Beep(1000, 500)
-                    time.sleep(0.2)
+                _beep_in_background(winsound)
                 print("🔊 Playing alarm beep (MP3 format not supported by winsound)")
                 return
         except Exception as e:
@@ -207,9 +232,7 @@ def play_alarm_sound():
     # Final fallback: system beep
     try:
         import winsound  # Windows
-        for _ in range(3):
-            winsound.Beep(1000, 500)
-            time.sleep(0.2)
+        _beep_in_background(winsound)
         print("🔊 Playing system beep (fallback)")
     except:
         try:
@@ -220,75 +243,87 @@ def play_alarm_sound():
             print("🔊 [ALARM SOUND] (could not play audio - no audio file or library available)")
 
 
+_dispatcher: Optional[NotificationDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_notification_dispatcher() -> Optional[NotificationDispatcher]:
+    """
+    Shared dispatcher for the current SMTP settings (rebuilt if they change).
+    Returns None if email is not configured.
+    """
+    global _dispatcher
+    config = get_config()
+    settings = SmtpSettings.from_config(config)
+    with _dispatcher_lock:
+        if not settings.configured:
+            if _dispatcher is not None:
+                _dispatcher.close()
+                _dispatcher = None
+            return None
+        if _dispatcher is None or _dispatcher.settings != settings:
+            if _dispatcher is not None:
+                _dispatcher.close()
+            _dispatcher = NotificationDispatcher(
+                settings,
+                pool_size=config.get("email_pool_size", 4),
+                max_attempts=config.get("email_max_attempts", 3),
+                backoff_seconds=config.get("email_retry_backoff_seconds", 0.5)
+            )
+        return _dispatcher
+
+
+def _apply_config_change(config: Dict):
+    """Config subscriber: push new settings into the long-lived services."""
+    if _location_service is not None:
+        _location_service.ttl_seconds = config.get("location_ttl_seconds", 600)
+        _location_service.client_ttl_seconds = config.get("client_location_ttl_seconds", 300)
+        _location_service.timeout_seconds = config.get("location_timeout_seconds", 3.0)
+    # Rebuilds the SMTP pool (dropping old connections) if the email settings changed
+    if _dispatcher is not None:
+        get_notification_dispatcher()
+
+
+_config_service.subscribe(_apply_config_change)
+
+
+def warm_notification_pool():
+    """Open SMTP connections in the background so a following alert sends immediately."""
+    dispatcher = get_notification_dispatcher()
+    if dispatcher is not None:
+        dispatcher.warm_async()
+
+
 def send_email(to_email: str, subject: str, message: str) -> bool:
     """
     Send email notification using SMTP.
     Returns True if successful, False otherwise.
     """
-    smtp_server = _config.get("email_smtp_server", "").strip()
-    smtp_port = _config.get("email_smtp_port", 587)
-    email_username = _config.get("email_username", "").strip()
-    email_password = _config.get("email_password", "").strip()
-    email_from = _config.get("email_from", email_username).strip()
-    
-    if not all([smtp_server, email_username, email_password, email_from]):
+    if "@" not in to_email:
+        print(f"⚠️  Invalid email format: {to_email}")
+        return False
+
+    dispatcher = get_notification_dispatcher()
+    if dispatcher is None:
         print(f"📧 [Email] Email not configured. Would send to {to_email}: {subject}")
         return False
-    
-    try:
-        # Validate email format
-        if "@" not in to_email or "@" not in email_from:
-            print(f"⚠️  Invalid email format: {to_email}")
-            return False
-        
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = email_from
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        
-        # Add body to email
-        msg.attach(MIMEText(message, 'plain'))
-        
-        # Create SMTP connection
-        print(f"📧 Connecting to {smtp_server}:{smtp_port}...")
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()  # Enable encryption
-        server.login(email_username, email_password)
-        
-        # Send email
-        text = msg.as_string()
-        server.sendmail(email_from, to_email, text)
-        server.quit()
-        
+
+    report = dispatcher.send([to_email], subject, message)[0]
+    if report.success:
         print(f"✅ Email sent successfully to {to_email}")
-        return True
-        
-    except smtplib.SMTPAuthenticationError as e:
-        print(f"❌ Email authentication error: Invalid username or password")
-        print(f"   For Gmail: Use an App Password, not your regular password")
-        print(f"   Create one at: https://myaccount.google.com/apppasswords")
-        return False
-    except smtplib.SMTPRecipientsRefused as e:
-        print(f"❌ Email rejected: Invalid recipient address {to_email}")
-        return False
-    except smtplib.SMTPServerDisconnected as e:
-        print(f"❌ Email connection error: Server disconnected")
-        return False
-    except Exception as e:
-        error_msg = str(e)
-        print(f"❌ Email error to {to_email}: {error_msg}")
-        return False
+    else:
+        print(f"❌ Email error to {to_email}: {report.error}")
+    return report.success
 
 
 def send_notifications_to_contacts(location: Dict[str, str], timestamp: str, 
-                                   source: str, confidence: float, message: str):
-    """Send email notifications to all emergency contacts."""
-    contacts = _config.get("emergency_contacts", [])
+                                   source: str, confidence: float, message: str) -> List[DeliveryReport]:
+    """Send email notifications to all emergency contacts. Returns one delivery report per recipient."""
+    contacts = get_config().get("emergency_contacts", [])
     
     if not contacts:
         print("⚠️  No emergency contacts configured. Skipping email notifications.")
-        return
+        return []
     
     subject = "🚨 EMERGENCY ALERT - Distress Detected"
     
@@ -313,14 +348,83 @@ TIME:
 This is an automated alert from the distress detection system.
 """
     
-    print(f"\n📤 Sending email alerts to {len(contacts)} contact(s)...")
+    recipients = []
     for contact in contacts:
         email = contact.get("email", "")
-        if not email:
-            print(f"⚠️  Skipping contact '{contact.get('name', 'Unknown')}' - no email address")
+        if not email or "@" not in email:
+            print(f"⚠️  Skipping contact '{contact.get('name', 'Unknown')}' - no valid email address")
             continue
-        
-        send_email(email, subject, email_body)
+        recipients.append(email)
+
+    dispatcher = get_notification_dispatcher()
+    if dispatcher is None:
+        print(f"📧 [Email] Email not configured. Would send to {', '.join(recipients)}: {subject}")
+        return []
+
+    # All recipients in parallel over pooled connections
+    print(f"\n📤 Sending email alerts to {len(recipients)} contact(s)...")
+    reports = dispatcher.send(recipients, subject, email_body)
+    for report in reports:
+        if report.success:
+            print(f"✅ Email sent to {report.recipient} in {report.latency_ms:.0f} ms ({report.attempts} attempt(s))")
+        else:
+            print(f"❌ Email to {report.recipient} failed after {report.attempts} attempt(s): {report.error}")
+    return reports
+
+
+_response_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="emergency")
+
+RESPONSE_PHASE_SECONDS = metrics.histogram(
+    "alert_response_phase_seconds", "Time from alert confirmation to each emergency response phase", ["phase"])
+
+
+def run_emergency_response(source: str, confidence: float, message: str, timestamp: str,
+                           confirmed_at: Optional[float] = None) -> Dict:
+    """
+    Emergency response for a confirmed alert. The alarm starts on its own thread
+    while SMTP connections are warmed and the location is read (from cache, or a
+    lookup bounded by location_max_wait_seconds); notifications go out as soon as
+    the location is known, without waiting for the alarm.
+
+    `confirmed_at` is the time.perf_counter() value at confirmation; timings are
+    measured from it. Returns {"location", "deliveries", "timings_ms"}.
+    """
+    started = confirmed_at if confirmed_at is not None else time.perf_counter()
+    timings: Dict[str, Optional[float]] = {}
+
+    def elapsed_ms() -> float:
+        return round((time.perf_counter() - started) * 1000, 1)
+
+    def alarm():
+        play_alarm_sound()
+        timings["alarm_started"] = elapsed_ms()
+
+    alarm_future = _response_pool.submit(alarm)
+    warm_notification_pool()
+
+    config = get_config()
+    if config.get("use_location", True):
+        location = get_location(max_wait=config.get("location_max_wait_seconds", 1.0))
+    else:
+        location = unknown_location("Location sharing disabled")
+    timings["location"] = elapsed_ms()
+
+    dispatched = time.perf_counter()
+    deliveries = send_notifications_to_contacts(location, timestamp, source, confidence, message)
+    delivered = [report.latency_ms for report in deliveries if report.success]
+    timings["first_notification"] = (
+        round((dispatched - started) * 1000 + min(delivered), 1) if delivered else None
+    )
+    timings["notifications_done"] = elapsed_ms()
+
+    try:
+        alarm_future.result(timeout=5)
+    except Exception as e:
+        print(f"⚠️  Alarm error: {e}")
+    for phase, ms in timings.items():
+        if ms is not None:
+            RESPONSE_PHASE_SECONDS.observe(ms / 1000, phase=phase)
+    return {"location": location, "deliveries": deliveries, "timings_ms": timings}
 
 
 def wait_for_user_input(timeout: float) -> bool:
@@ -380,7 +484,7 @@ def trigger_alert(source: str, confidence: float, message: str = ""):
     print("\n> ", end="", flush=True)
     
     # Wait for user confirmation (10 second window)
-    alert_window = _config.get("alert_window_seconds", 10)
+    alert_window = get_config().get("alert_window_seconds", 10)
     is_false_positive = wait_for_user_input(alert_window)
     
     if is_false_positive:
@@ -391,21 +495,14 @@ def trigger_alert(source: str, confidence: float, message: str = ""):
     print(f"\n⏱️  {alert_window} seconds elapsed. Proceeding with emergency response...")
     print("="*60)
     
-    # Get location
-    location = {}
-    if _config.get("use_location", True):
-        print("\n📍 Getting location...")
-        location = get_location()
-        print(f"   Location: {location['address']}")
-        print(f"   Coordinates: {location['latitude']}, {location['longitude']}")
-    
-    # Play alarm sound
-    print("\n🔊 Playing alarm sound...")
-    play_alarm_sound()
-    
-    # Send email notifications
-    print("\n📧 Sending emergency email notifications...")
-    send_notifications_to_contacts(location, timestamp, source, confidence, message)
+    # Alarm, location and email notifications in parallel
+    response = run_emergency_response(source, confidence, message, timestamp)
+    location = response["location"]
+    print(f"\n📍 Location: {location['address']}")
+    print(f"   Coordinates: {location['latitude']}, {location['longitude']}")
+    first = response["timings_ms"]["first_notification"]
+    if first is not None:
+        print(f"📧 First notification delivered {first:.0f} ms after confirmation")
     
     print("\n" + "="*60)
     print("✅ Emergency alert response completed")
@@ -426,8 +523,6 @@ def configure_alert_system(email_smtp_server: str = "", email_smtp_port: int = 5
         email_from: From email address
         contacts: List of dicts with 'name' and 'email' keys
     """
-    global _config
-    
     config_updates = {}
     
     if email_smtp_server:
@@ -443,17 +538,14 @@ def configure_alert_system(email_smtp_server: str = "", email_smtp_port: int = 5
     if contacts:
         config_updates["emergency_contacts"] = contacts
     
-    _config.update(config_updates)
-    
-    # Save to file
+    # Save to file (atomic; every reader sees the new config immediately)
     try:
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(_config, f, indent=2)
+        update_config(config_updates)
         print("✅ Alert system configuration saved")
     except Exception as e:
         print(f"⚠️  Could not save config: {e}")
     
-    return _config
+    return load_config()
 
 
 # Example usage and integration
@@ -0,0 +1,149 @@
+"""
+Analysis Cache
+Content-addressed cache of audio analysis results with single-flight
+deduplication. Entries are keyed by a hash of the decoded PCM plus the
+versions of the models that produced them, and evicted by size (LRU) and age
+(TTL). Concurrent requests for the same key share one computation: the first
+caller runs it, the others wait for its result.
+
+`analyze_with_alert` adds the alert rule on top: results that may not be cached
+(e.g. a keyword short-circuit with models still pending) are re-analysed on
+retry, but the alert id raised for a key is remembered separately, so the same
+audio raises one alert per alert-id TTL.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from audio_io import audio_hash
+
+# How a lookup was served
+HIT = "hit"
+MISS = "miss"
+COALESCED = "coalesced"
+
+
+def analysis_key(y: np.ndarray, sample_rate: int, versions: Optional[Dict] = None) -> str:
+    """Hash of the mono float32 PCM, its sample rate and the model versions (audio_io.audio_hash)."""
+    return audio_hash(y, sample_rate, versions or {})
+
+
+class AnalysisCache:
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._counts = {HIT: 0, MISS: 0, COALESCED: 0, "errors": 0, "uncached": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._get_locked(key)
+
+    def _get_locked(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self._counts["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counts["evictions"] += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any],
+                       timeout: Optional[float] = None,
+                       cacheable: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, str]:
+        """
+        Cached value for `key`, or the result of `compute()` stored under it.
+        Returns (value, HIT | MISS | COALESCED). Errors are not cached; they are
+        raised to the caller that ran `compute` and to every coalesced waiter.
+        A value for which `cacheable(value)` is false (e.g. a degraded result) is
+        handed to the waiters of this computation but not stored.
+        """
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not None:
+                self._counts[HIT] += 1
+                return value, HIT
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._counts[COALESCED] += 1
+                leader = False
+            else:
+                future = self._in_flight[key] = Future()
+                self._counts[MISS] += 1
+                leader = True
+
+        if not leader:
+            return future.result(timeout=timeout), COALESCED
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                self._counts["errors"] += 1
+            future.set_exception(e)
+            raise
+        store = cacheable is None or cacheable(value)
+        if store:
+            self.put(key, value)
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if not store:
+                self._counts["uncached"] += 1
+        future.set_result(value)
+        return value, MISS
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._counts[HIT] + self._counts[MISS] + self._counts[COALESCED]
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "in_flight": len(self._in_flight),
+                **self._counts,
+                "hit_rate": round((self._counts[HIT] + self._counts[COALESCED]) / lookups, 4) if lookups else None,
+            }
+
+
+def analyze_with_alert(key: str, analyze: Callable[[], Dict], raise_alert: Callable[[Dict], str],
+                       alert_ids: AnalysisCache, results: Optional[AnalysisCache] = None,
+                       cacheable: Optional[Callable[[Dict], bool]] = None) -> Tuple[Dict, Optional[str]]:
+    """
+    Run `analyze()` for `key` through `results` (None: no result cache) and, if
+    the result has distress_detected, set its alert_id. The alert is raised with
+    `raise_alert(result)` only if `alert_ids` holds no id for `key`; concurrent
+    first alerts for one key share one call.
+    Returns (result, cache status or None without a result cache).
+    """
+    def compute():
+        result = analyze()
+        if result.get('distress_detected'):
+            result['alert_id'], _ = alert_ids.get_or_compute(key, lambda: raise_alert(result))
+        return result
+
+    if results is None:
+        return compute(), None
+    return results.get_or_compute(key, compute, cacheable=cacheable)
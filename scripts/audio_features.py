@@ -0,0 +1,70 @@
+"""
+Shared spectral front end for the emotion classifiers.
+Computes the STFT once per clip and derives every descriptor the CREMA and
+RAVDESS models use from it, returned as a keyed feature bundle.
+
+The descriptors match the standalone librosa calls the models were trained on:
+  librosa.feature.mfcc(y=y, sr=sr, n_mfcc=20)       -> "mfcc"
+  librosa.feature.delta(mfcc)                       -> "delta_mfcc"
+  librosa.feature.chroma_stft(S=|stft(y)|, sr=sr)   -> "chroma"
+  librosa.feature.rms(y=y)                          -> "rms"
+  librosa.feature.zero_crossing_rate(y)             -> "zcr"
+"""
+
+from typing import Dict
+
+import numpy as np
+import librosa
+
+N_MFCC = 20
+N_FFT = 2048
+HOP_LENGTH = 512
+
+
+def compute_feature_bundle(y: np.ndarray, sample_rate: int) -> Dict[str, np.ndarray]:
+    """
+    Compute all frame-level descriptors and their clip-level means for one clip.
+
+    Returns a dict with frame matrices ("mfcc", "delta_mfcc", "chroma_frames")
+    and the pooled vectors/scalars the classifiers read ("mfcc_mean",
+    "delta_mfcc_mean", "chroma", "rms", "zcr").
+    """
+    if isinstance(y, np.ndarray) and y.ndim > 1:
+        y = y.flatten()
+
+    # One STFT per clip: magnitude feeds chroma, power feeds the mel/MFCC path
+    magnitude = np.abs(librosa.stft(y, n_fft=N_FFT, hop_length=HOP_LENGTH))
+    power = magnitude ** 2
+
+    mel = librosa.feature.melspectrogram(S=power, sr=sample_rate, n_fft=N_FFT, hop_length=HOP_LENGTH)
+    mfcc = librosa.feature.mfcc(S=librosa.power_to_db(mel), sr=sample_rate, n_mfcc=N_MFCC)
+    delta_mfcc = librosa.feature.delta(mfcc)
+    chroma_frames = librosa.feature.chroma_stft(S=magnitude, sr=sample_rate, n_fft=N_FFT, hop_length=HOP_LENGTH)
+
+    # RMS and ZCR are time-domain descriptors in the training features;
+    # deriving them from the windowed spectrogram would not be numerically identical.
+    rms = librosa.feature.rms(y=y, frame_length=N_FFT, hop_length=HOP_LENGTH)
+    zcr = librosa.feature.zero_crossing_rate(y, frame_length=N_FFT, hop_length=HOP_LENGTH)
+
+    return {
+        "mfcc": mfcc,
+        "delta_mfcc": delta_mfcc,
+        "chroma_frames": chroma_frames,
+        "mfcc_mean": np.mean(mfcc, axis=1),
+        "delta_mfcc_mean": np.mean(delta_mfcc, axis=1),
+        "chroma": np.mean(chroma_frames, axis=1),
+        "rms": np.mean(rms),
+        "zcr": np.mean(zcr),
+    }
+
+
+def crema_vector(bundle: Dict[str, np.ndarray]) -> np.ndarray:
+    """CREMA model input: MFCC mean, delta-MFCC mean, chroma, RMS, ZCR (1 x 54)."""
+    features = np.hstack([bundle["mfcc_mean"], bundle["delta_mfcc_mean"], bundle["chroma"], bundle["rms"], bundle["zcr"]])
+    return features.reshape(1, -1)
+
+
+def ravdess_vector(bundle: Dict[str, np.ndarray]) -> np.ndarray:
+    """RAVDESS model input: MFCC mean and delta-MFCC mean (1 x 40)."""
+    features = np.hstack([bundle["mfcc_mean"], bundle["delta_mfcc_mean"]])
+    return features.reshape(1, -1)
@@ -0,0 +1,138 @@
+"""
+In-Memory Audio I/O
+Decodes uploaded audio straight from bytes into mono float32 arrays and
+converts arrays to PCM buffers, without touching the filesystem.
+
+Analysis runs on one canonical format, mono float32 at 16 kHz (the rate
+wav2vec2 was trained on). `normalize_audio` converts any input to it with a
+polyphase resampler whose anti-aliasing filter is designed once per rate pair.
+"""
+
+import hashlib
+import io
+import json
+import shutil
+import subprocess
+import time
+from functools import lru_cache
+from math import gcd
+from typing import Any, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+from scipy import signal
+
+import metrics
+
+CANONICAL_SAMPLE_RATE = 16000
+
+# Rate used when decoding through ffmpeg (formats libsndfile cannot read, e.g. WebM/AAC)
+FFMPEG_DECODE_RATE = CANONICAL_SAMPLE_RATE
+
+DECODE_SECONDS = metrics.histogram("audio_decode_duration_seconds", "Audio decode time", ["decoder"])
+DECODE_ERRORS = metrics.counter("audio_decode_errors_total", "Uploads that could not be decoded")
+
+
+class AudioDecodeError(Exception):
+    """Raised when uploaded audio bytes cannot be decoded."""
+
+
+def to_mono(y: np.ndarray) -> np.ndarray:
+    """Average channels of a (frames, channels) array, like librosa.to_mono."""
+    if y.ndim > 1:
+        y = np.mean(y, axis=1)
+    return np.ascontiguousarray(y, dtype=np.float32)
+
+
+@lru_cache(maxsize=32)
+def _polyphase_filter(up: int, down: int) -> np.ndarray:
+    """Low-pass FIR for resample_poly(up, down); same design as scipy's default, built once per pair."""
+    max_rate = max(up, down)
+    h = signal.firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=("kaiser", 5.0)).astype(np.float32)
+    h.setflags(write=False)
+    return h
+
+
+def resample(y: np.ndarray, orig_rate: int, target_rate: int = CANONICAL_SAMPLE_RATE) -> np.ndarray:
+    """Polyphase resampling of a mono float32 signal (no-op when the rates match)."""
+    y = np.ascontiguousarray(y, dtype=np.float32)
+    orig_rate, target_rate = int(orig_rate), int(target_rate)
+    if orig_rate == target_rate or len(y) == 0:
+        return y
+    g = gcd(orig_rate, target_rate)
+    up, down = target_rate // g, orig_rate // g
+    return signal.resample_poly(y, up, down, window=_polyphase_filter(up, down)).astype(np.float32, copy=False)
+
+
+def normalize_audio(y: np.ndarray, sample_rate: int,
+                    target_rate: int = CANONICAL_SAMPLE_RATE) -> Tuple[np.ndarray, int]:
+    """Convert any waveform (mono or (frames, channels)) to mono float32 at `target_rate`."""
+    y = np.asarray(y)
+    if y.ndim > 1:
+        # (frames, channels) as decoded; a (channels, frames) array has channels first
+        y = y.mean(axis=1) if y.shape[0] >= y.shape[1] else y.mean(axis=0)
+    return resample(y, sample_rate, target_rate), int(target_rate)
+
+
+def decode_audio_bytes(data: bytes, target_rate: Optional[int] = None) -> Tuple[np.ndarray, int]:
+    """
+    Decode an encoded audio file held in memory to (mono float32 samples, sample rate).
+    Uses libsndfile (WAV, FLAC, OGG, MP3 ...) and falls back to an ffmpeg pipe.
+    With `target_rate` the samples are resampled to that rate (see normalize_audio).
+    """
+    if not data:
+        DECODE_ERRORS.inc()
+        raise AudioDecodeError("Empty audio data")
+    start = time.perf_counter()
+    try:
+        y, sample_rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+        y, sample_rate = to_mono(y), int(sample_rate)
+        if target_rate:
+            y, sample_rate = normalize_audio(y, sample_rate, target_rate)
+        DECODE_SECONDS.observe(time.perf_counter() - start, decoder="soundfile")
+        return y, sample_rate
+    except Exception as e:
+        sndfile_error = e
+
+    if shutil.which("ffmpeg") is None:
+        DECODE_ERRORS.inc()
+        raise AudioDecodeError(f"Unsupported audio format: {sndfile_error}")
+    try:
+        result = _decode_with_ffmpeg(data, target_rate or FFMPEG_DECODE_RATE)
+    except AudioDecodeError:
+        DECODE_ERRORS.inc()
+        raise
+    DECODE_SECONDS.observe(time.perf_counter() - start, decoder="ffmpeg")
+    return result
+
+
+def _decode_with_ffmpeg(data: bytes, sample_rate: int = FFMPEG_DECODE_RATE) -> Tuple[np.ndarray, int]:
+    # stdin -> stdout pipes only, no temp files; ffmpeg downmixes and resamples
+    proc = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", "pipe:0", "-f", "f32le", "-ac", "1",
+         "-ar", str(sample_rate), "pipe:1"],
+        input=data,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if proc.returncode != 0:
+        raise AudioDecodeError(f"ffmpeg could not decode audio: {proc.stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(proc.stdout, dtype="<f4").astype(np.float32), sample_rate
+
+
+def audio_hash(y: np.ndarray, sample_rate: int, extra: Any = None) -> str:
+    """
+    SHA-256 content key of a mono clip: its float32 PCM and sample rate, plus
+    `extra` (e.g. model versions) as sorted JSON when given. The one audio hash
+    used by every cache (transcripts, analyses).
+    """
+    digest = hashlib.sha256(np.ascontiguousarray(y, dtype=np.float32).tobytes())
+    digest.update(str(int(sample_rate)).encode())
+    if extra is not None:
+        digest.update(json.dumps(extra, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def to_pcm16(y: np.ndarray) -> bytes:
+    """Little-endian 16-bit PCM bytes for a float waveform in [-1, 1]."""
+    return (np.clip(y, -1.0, 1.0) * 32767).astype("<i2").tobytes()
@@ -0,0 +1,210 @@
+"""
+Streaming Audio Ingestion
+Per-session ring buffer for raw PCM frames with sliding-window analysis.
+Only newly received bytes are decoded; each full window (at a configurable
+hop) is passed to an analyzer and its detection events are returned to the
+transport (chunked HTTP or WebSocket) that pushed the frames.
+"""
+
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# Supported raw PCM sample formats: dtype and scale to float32 in [-1, 1]
+SAMPLE_FORMATS = {
+    "int16": (np.dtype("<i2"), 1.0 / 32768.0),
+    "float32": (np.dtype("<f4"), 1.0),
+}
+
+
+class RingBuffer:
+    """Fixed-capacity float32 ring buffer that tracks the total samples written."""
+
+    def __init__(self, capacity: int):
+        self.capacity = int(capacity)
+        self._buffer = np.zeros(self.capacity, dtype=np.float32)
+        self.total_written = 0
+
+    def append(self, samples: np.ndarray):
+        n = len(samples)
+        if n == 0:
+            return
+        if n > self.capacity:
+            # Only the newest `capacity` samples can be kept
+            self.total_written += n - self.capacity
+            samples = samples[-self.capacity:]
+            n = self.capacity
+        start = self.total_written % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            self._buffer[start:end] = samples
+        else:
+            split = self.capacity - start
+            self._buffer[start:] = samples[:split]
+            self._buffer[:end - self.capacity] = samples[split:]
+        self.total_written += n
+
+    def window(self, end: int, length: int) -> np.ndarray:
+        """Copy of the `length` samples ending at absolute sample index `end`."""
+        if end > self.total_written or end - length < self.total_written - self.capacity or length > end:
+            raise ValueError("Requested window is not in the buffer")
+        start = (end - length) % self.capacity
+        if start + length <= self.capacity:
+            return self._buffer[start:start + length].copy()
+        split = self.capacity - start
+        return np.concatenate([self._buffer[start:], self._buffer[:length - split]])
+
+
+class StreamSession:
+    """
+    One streaming client. Frames are appended with `push`, which returns the
+    events produced by any windows completed by those frames.
+
+    Overlapping windows see the same audio several times, so a detection only
+    calls `alerter` (which creates an alert and returns its id) if its window
+    does not overlap the window that raised the session's last alert. Later
+    hits are reported as detections carrying that alert's id.
+    """
+
+    def __init__(self, analyzer: Callable[[np.ndarray, int], Dict], sample_rate: int = 16000,
+                 sample_format: str = "int16", window_seconds: float = 4.0, hop_seconds: float = 1.0,
+                 emit_all_windows: bool = False, session_id: Optional[str] = None,
+                 alerter: Optional[Callable[[Dict], str]] = None):
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"Unsupported sample format '{sample_format}'. Use one of: {', '.join(SAMPLE_FORMATS)}")
+        if window_seconds <= 0 or hop_seconds <= 0:
+            raise ValueError("window_seconds and hop_seconds must be positive")
+        if int(sample_rate) <= 0:
+            raise ValueError("sample_rate must be positive")
+
+        self.session_id = session_id or uuid.uuid4().hex
+        self.analyzer = analyzer
+        self.sample_rate = int(sample_rate)
+        self.sample_format = sample_format
+        self.window_samples = int(round(window_seconds * self.sample_rate))
+        self.hop_samples = max(1, int(round(hop_seconds * self.sample_rate)))
+        self.emit_all_windows = emit_all_windows
+        self.alerter = alerter
+        self.alert_id: Optional[str] = None
+        self._alert_window_end: Optional[int] = None
+        self._dtype, self._scale = SAMPLE_FORMATS[sample_format]
+        # window + hop lets every pending window survive until it is analyzed (see push)
+        self._ring = RingBuffer(self.window_samples + self.hop_samples)
+        self._leftover = b""
+        self._next_window_end = self.window_samples
+        self._window_index = 0
+        self._lock = threading.Lock()
+        self.created_at = time.time()
+        self.last_active = self.created_at
+        self.windows_analyzed = 0
+        self.detections = 0
+        self.alerts = 0
+
+    def _decode(self, data: bytes) -> np.ndarray:
+        # Carry a partial trailing sample over to the next chunk
+        data = self._leftover + data
+        usable = len(data) - (len(data) % self._dtype.itemsize)
+        self._leftover = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype=self._dtype).astype(np.float32)
+        if self._scale != 1.0:
+            samples *= self._scale
+        return samples
+
+    def push(self, data: bytes) -> List[Dict]:
+        """Decode and buffer new PCM bytes, analyze any completed windows, return events."""
+        with self._lock:
+            self.last_active = time.time()
+            samples = self._decode(data)
+            events = []
+            # Append at most one hop at a time so no window is overwritten before it is analyzed
+            for offset in range(0, len(samples), self.hop_samples):
+                self._ring.append(samples[offset:offset + self.hop_samples])
+                while self._ring.total_written >= self._next_window_end:
+                    event = self._analyze_window()
+                    if event is not None:
+                        events.append(event)
+            return events
+
+    def _analyze_window(self) -> Optional[Dict]:
+        end = self._next_window_end
+        window = self._ring.window(end, self.window_samples)
+        index = self._window_index
+        self._next_window_end += self.hop_samples
+        self._window_index += 1
+
+        result = self.analyzer(window, self.sample_rate)
+        self.windows_analyzed += 1
+        distress = bool(result.get("distress_detected", False))
+        if distress:
+            self.detections += 1
+            if self.alerter is not None:
+                result = {**result, **self._alert(result, end)}
+        elif not self.emit_all_windows:
+            return None
+
+        return {
+            "type": "detection" if distress else "window",
+            "session_id": self.session_id,
+            "window_index": index,
+            "start_seconds": round((end - self.window_samples) / self.sample_rate, 3),
+            "end_seconds": round(end / self.sample_rate, 3),
+            **result,
+        }
+
+    def _alert(self, result: Dict, end: int) -> Dict:
+        """Alert fields for a detection: a new alert, or the open one if the windows overlap."""
+        if self._alert_window_end is None or end - self._alert_window_end >= self.window_samples:
+            self.alert_id = self.alerter(result)
+            self._alert_window_end = end
+            self.alerts += 1
+            return {"alert_id": self.alert_id, "alert_triggered": True}
+        return {"alert_id": self.alert_id, "alert_triggered": False}
+
+    def status(self) -> Dict:
+        return {
+            "session_id": self.session_id,
+            "sample_rate": self.sample_rate,
+            "sample_format": self.sample_format,
+            "window_seconds": self.window_samples / self.sample_rate,
+            "hop_seconds": self.hop_samples / self.sample_rate,
+            "received_seconds": round(self._ring.total_written / self.sample_rate, 3),
+            "windows_analyzed": self.windows_analyzed,
+            "detections": self.detections,
+            "alerts": self.alerts,
+        }
+
+
+class StreamSessionManager:
+    """Thread-safe registry of open stream sessions with idle expiry."""
+
+    def __init__(self, idle_timeout_seconds: float = 300):
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self._sessions: Dict[str, StreamSession] = {}
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs) -> StreamSession:
+        session = StreamSession(**kwargs)
+        with self._lock:
+            self._expire_idle()
+            self._sessions[session.session_id] = session
+        return session
+
+    def get(self, session_id: str) -> Optional[StreamSession]:
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def close(self, session_id: str) -> Optional[StreamSession]:
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def _expire_idle(self):
+        cutoff = time.time() - self.idle_timeout_seconds
+        for session_id in [sid for sid, s in self._sessions.items() if s.last_active < cutoff]:
+            del self._sessions[session_id]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
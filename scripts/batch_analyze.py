@@ -0,0 +1,231 @@
+"""
+Batch Audio Analysis
+Scores a directory tree of recordings offline with the combined pipeline and
+streams one JSON line per file. Files are processed in chunks on a process
+pool; each worker loads the models once, and the clips of a chunk are
+analysed concurrently so their wav2vec2 calls share padded batches.
+
+The output file doubles as the checkpoint: re-running the same command skips
+files that already have a result, so an interrupted run resumes where it
+stopped.
+
+Modes:
+  - "full":    analyze_audio_from_data (VAD, ASR, keywords and all emotion models)
+  - "emotion": predict_emotion_combined only (no VAD, ASR or keywords)
+
+Usage:
+    python scripts/batch_analyze.py recordings/ --output results.jsonl
+    python scripts/batch_analyze.py recordings/ --output results.jsonl --workers 8 --asr static
+    python scripts/batch_analyze.py recordings/ --output emotions.jsonl --mode emotion
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Set
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+AUDIO_EXTENSIONS = {".wav", ".flac", ".ogg", ".mp3", ".m4a", ".webm", ".aac", ".opus"}
+TARGET_SAMPLE_RATE = 16000  # canonical analysis rate (audio_io.CANONICAL_SAMPLE_RATE)
+
+_worker = {}
+
+
+def find_audio_files(root: str) -> Iterator[str]:
+    """Audio files under `root`, relative to it, in a stable (sorted) order."""
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS:
+                yield os.path.relpath(os.path.join(directory, name), root)
+
+
+def load_completed(output_path: str, retry_errors: bool = False) -> Set[str]:
+    """
+    Paths that already have a result in the output file. Only an unterminated
+    last line (from an interrupted write) is cut off, so appends start on a clean
+    line; unreadable lines elsewhere are reported and left in place, and their
+    files are analysed again.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    bad_lines = []
+    with open(output_path, "rb+") as f:
+        offset = 0
+        for number, line in enumerate(f, 1):
+            start, offset = offset, offset + len(line)
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                path = record["path"]
+            except (ValueError, TypeError, KeyError):
+                if not line.endswith(b"\n"):
+                    f.truncate(start)
+                    print(f"⚠️  Dropped the partial last line of {output_path}")
+                else:
+                    bad_lines.append(number)
+                continue
+            if not line.endswith(b"\n"):
+                f.write(b"\n")
+            if not (retry_errors and record.get("error")):
+                done.add(path)
+    if bad_lines:
+        shown = ", ".join(map(str, bad_lines[:10])) + (" ..." if len(bad_lines) > 10 else "")
+        print(f"⚠️  Skipped {len(bad_lines)} unreadable line(s) in {output_path}: {shown}")
+    return done
+
+
+def chunked(items: List[str], size: int) -> Iterator[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _init_worker(root: str, mode: str, asr_backend: str, chunk_size: int):
+    """Process pool initializer: configure the pipeline, load every model once and warm up."""
+    import combined_pipeline as cp
+    from pipeline_config import pipeline_config
+
+    try:
+        import torch
+        # One intra-op thread per process: parallelism comes from the process pool
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+
+    pipeline_config["asr_backend"] = asr_backend
+    pipeline_config["cpu_pool_workers"] = chunk_size
+    pipeline_config["hf_batch_max_size"] = chunk_size
+    # Loads the models and runs the warmup inference, so JIT/first-call costs are paid here
+    cp.model_manager.start_background().join()
+
+    _worker.update(root=root, mode=mode, pipeline=cp, threads=ThreadPoolExecutor(max_workers=chunk_size))
+
+
+def _analyze_file(rel_path: str) -> Dict:
+    from audio_io import decode_audio_bytes, normalize_audio
+
+    cp = _worker["pipeline"]
+    start = time.perf_counter()
+    try:
+        with open(os.path.join(_worker["root"], rel_path), "rb") as f:
+            y, sample_rate = decode_audio_bytes(f.read())
+        duration = len(y) / sample_rate
+        y, _ = normalize_audio(y, sample_rate, TARGET_SAMPLE_RATE)
+
+        if _worker["mode"] == "emotion":
+            crema, ravdess, hf, final = cp.predict_emotion_combined(y, TARGET_SAMPLE_RATE)
+            record = {"emotions": {"crema": crema, "ravdess": ravdess, "huggingface": hf, "final": final}}
+        else:
+            result = cp.analyze_audio_from_data(y, TARGET_SAMPLE_RATE, short_circuit=False)
+            record = {k: result.get(k) for k in (
+                "transcript", "emotions", "distress_detected", "confidence", "reason",
+                "gated", "vad", "hf_timeline", "escalated", "transcription_error", "timings_ms")}
+            record["keywords"] = result.get("keywords", {}).get("matches", [])
+        record.update(path=rel_path, duration=round(duration, 3), sample_rate=sample_rate, error=None)
+    except Exception as e:
+        record = {"path": rel_path, "error": str(e)}
+    record["seconds"] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def analyze_chunk(paths: List[str]) -> List[Dict]:
+    """Analyse one chunk concurrently inside a worker (wav2vec2 calls get batched)."""
+    return list(_worker["threads"].map(_analyze_file, paths))
+
+
+def run_batch(root: str, output_path: str, workers: int, chunk_size: int, mode: str,
+              asr_backend: str, retry_errors: bool = False, limit: int = 0) -> Dict:
+    done = load_completed(output_path, retry_errors)
+    files = [p for p in find_audio_files(root) if p not in done]
+    if limit:
+        files = files[:limit]
+    print(f"📂 {len(files)} files to analyse ({len(done)} already done) with {workers} workers")
+    if not files:
+        return {"processed": 0, "skipped": len(done)}
+
+    chunks = chunked(files, chunk_size)
+    summary = Counter()
+    labels = Counter()
+    started = time.perf_counter()
+    audio_seconds = 0.0
+    max_in_flight = workers * 2
+
+    import multiprocessing
+    context = multiprocessing.get_context("spawn")
+    with open(output_path, "a") as out, ProcessPoolExecutor(
+        max_workers=workers, mp_context=context,
+        initializer=_init_worker, initargs=(root, mode, asr_backend, chunk_size)
+    ) as pool:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            # Keep a bounded number of chunks queued so huge trees do not pile up in memory
+            while not exhausted and len(pending) < max_in_flight:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                else:
+                    pending.add(pool.submit(analyze_chunk, chunk))
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                for record in future.result():
+                    out.write(json.dumps(record) + "\n")
+                    summary["processed"] += 1
+                    if record.get("error"):
+                        summary["errors"] += 1
+                        continue
+                    audio_seconds += record.get("duration", 0.0)
+                    labels[record["emotions"]["final"]] += 1
+                    summary["distress"] += 1 if record.get("distress_detected") else 0
+                    summary["gated"] += 1 if record.get("gated") else 0
+                out.flush()
+
+            elapsed = time.perf_counter() - started
+            rate = summary["processed"] / elapsed if elapsed else 0.0
+            remaining = (len(files) - summary["processed"]) / rate if rate else 0.0
+            print(f"   {summary['processed']}/{len(files)} files  {rate:.1f} files/s  ETA {remaining:.0f}s", end="\r")
+
+    elapsed = time.perf_counter() - started
+    print()
+    return {
+        **summary,
+        "skipped": len(done),
+        "labels": dict(labels),
+        "elapsed_seconds": round(elapsed, 2),
+        "files_per_second": round(summary["processed"] / elapsed, 2) if elapsed else None,
+        "audio_seconds_per_second": round(audio_seconds / elapsed, 2) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline batch analysis of an audio directory tree")
+    parser.add_argument("root", help="Directory to scan for audio files")
+    parser.add_argument("--output", required=True, help="JSONL results file (also the resume checkpoint)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=8, help="Files per task (and wav2vec2 batch size)")
+    parser.add_argument("--mode", choices=["full", "emotion"], default="full")
+    parser.add_argument("--asr", default="static", choices=["static", "google", "vosk"],
+                        help="Transcription backend for full mode (static = no network)")
+    parser.add_argument("--retry-errors", action="store_true", help="Re-run files whose previous result was an error")
+    parser.add_argument("--limit", type=int, default=0, help="Only process this many new files")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        parser.error(f"{args.root} is not a directory")
+
+    summary = run_batch(args.root, args.output, max(1, args.workers), max(1, args.chunk_size),
+                        args.mode, args.asr, args.retry_errors, args.limit)
+    print("\n" + "=" * 60)
+    print(json.dumps(summary, indent=2))
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
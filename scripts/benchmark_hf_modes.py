@@ -0,0 +1,180 @@
+"""
+wav2vec2 Inference Mode Benchmark
+Runs the emotion model in each inference mode (fp32, int8, onnx) over a clip
+set and reports load time, per-clip latency, memory and label agreement with
+the fp32 reference (plus accuracy when the clips are labelled).
+
+Clip set layout: either a flat directory of audio files, or one sub-directory
+per expected label (neutral/, positive/, distressed/).
+
+Usage:
+    python scripts/benchmark_hf_modes.py --clips path/to/clips --modes fp32 int8 onnx --output hf_modes.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg", ".mp3")
+TARGET_RATE = 16000
+
+
+def find_clips(root: Optional[str]) -> List[Tuple[str, Optional[str]]]:
+    """(path, label) pairs; label is the parent directory name for labelled sets."""
+    if not root:
+        return [(os.path.join(os.path.dirname(__file__), "..", "data", "sample.wav"), None)]
+    clips = []
+    for dirpath, _, filenames in os.walk(root):
+        label = None if os.path.abspath(dirpath) == os.path.abspath(root) else os.path.basename(dirpath)
+        for name in sorted(filenames):
+            if name.lower().endswith(AUDIO_EXTENSIONS):
+                clips.append((os.path.join(dirpath, name), label))
+    return sorted(clips)
+
+
+def _memory_mb() -> Dict[str, Optional[float]]:
+    try:
+        import psutil
+        rss = psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        rss = None
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KB on Linux, bytes on macOS
+        peak_mb = peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+    except ImportError:
+        peak_mb = None
+    return {"rss_mb": round(rss, 1) if rss is not None else None,
+            "peak_rss_mb": round(peak_mb, 1) if peak_mb is not None else None}
+
+
+def _run_mode(mode: str, clip_paths: List[str], repeat: int, model: Optional[str]) -> Dict:
+    """Benchmark one mode. Runs in its own process so memory figures are per mode."""
+    import torch
+    import combined_pipeline as cp
+    from audio_io import decode_audio_bytes, normalize_audio
+
+    if model:
+        cp.model_name = model
+
+    clips = []
+    for path in clip_paths:
+        with open(path, "rb") as f:
+            y, sample_rate = decode_audio_bytes(f.read())
+        # The same mono float32 16 kHz conversion the pipeline applies to uploads
+        y, _ = normalize_audio(y, sample_rate, TARGET_RATE)
+        clips.append(y)
+
+    before = _memory_mb()
+    start = time.perf_counter()
+    extractor, runner = cp.load_wav2vec2(mode)
+    load_seconds = time.perf_counter() - start
+    after_load = _memory_mb()
+
+    labels, latencies = [], []
+    for y in clips:
+        inputs = extractor(y, sampling_rate=TARGET_RATE, return_tensors="pt", padding=True)
+        logits = runner(inputs)  # untimed warm pass
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            logits = runner(inputs)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        labels.append(cp.hf_label_map.get(int(torch.argmax(logits, dim=-1)[0]), "neutral"))
+
+    return {
+        "mode": mode,
+        "load_seconds": round(load_seconds, 3),
+        "rss_mb_before_load": before["rss_mb"],
+        "rss_mb_after_load": after_load["rss_mb"],
+        "peak_rss_mb": _memory_mb()["peak_rss_mb"],
+        "latency_ms": {
+            "p50": round(float(np.percentile(latencies, 50)), 2),
+            "p95": round(float(np.percentile(latencies, 95)), 2),
+            "mean": round(float(np.mean(latencies)), 2),
+        },
+        "labels": labels,
+    }
+
+
+def run_benchmark(clips: List[Tuple[str, Optional[str]]], modes: List[str], repeat: int = 3,
+                  model: Optional[str] = None) -> Dict:
+    paths = [p for p, _ in clips]
+    expected = [label for _, label in clips]
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for mode in modes:
+        print(f"⏱️  Benchmarking mode '{mode}' on {len(paths)} clip(s)...")
+        with context.Pool(1) as pool:
+            try:
+                results[mode] = pool.apply(_run_mode, (mode, paths, repeat, model))
+            except Exception as e:
+                print(f"⚠️  Mode '{mode}' failed: {e}")
+                results[mode] = {"mode": mode, "error": str(e)}
+
+    reference = results.get("fp32", {}).get("labels")
+    labelled = all(label is not None for label in expected)
+    for result in results.values():
+        labels = result.get("labels")
+        if labels is None:
+            continue
+        if reference is not None:
+            result["agreement_with_fp32"] = round(float(np.mean([a == b for a, b in zip(labels, reference)])), 4)
+        if labelled:
+            result["accuracy"] = round(float(np.mean([a == b for a, b in zip(labels, expected)])), 4)
+
+    return {"clips": len(paths), "repeat": repeat, "labelled": labelled, "modes": results}
+
+
+def print_report(report: Dict):
+    print("\n" + "=" * 88)
+    print(f"{'mode':<6} {'load s':>8} {'p50 ms':>9} {'p95 ms':>9} {'RSS MB':>9} {'peak MB':>9} {'agree':>7} {'acc':>7}")
+    print("-" * 88)
+    for mode, r in report["modes"].items():
+        if "error" in r:
+            print(f"{mode:<6} error: {r['error']}")
+            continue
+
+        def fmt(value, spec):
+            return format(value, spec) if value is not None else "-"
+
+        print(f"{mode:<6} {r['load_seconds']:>8.2f} {r['latency_ms']['p50']:>9.1f} {r['latency_ms']['p95']:>9.1f} "
+              f"{fmt(r['rss_mb_after_load'], '>9.0f')} {fmt(r['peak_rss_mb'], '>9.0f')} "
+              f"{fmt(r.get('agreement_with_fp32'), '>7.2%')} {fmt(r.get('accuracy'), '>7.2%')}")
+    print("=" * 88)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare wav2vec2 inference modes")
+    parser.add_argument("--clips", help="Directory of clips (sub-directory name = label). Default: data/sample.wav")
+    parser.add_argument("--modes", nargs="+", default=["fp32", "int8", "onnx"])
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per clip")
+    parser.add_argument("--model", help="Override the HuggingFace model name or local checkpoint path")
+    parser.add_argument("--output", help="Write the full report as JSON")
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    clips = find_clips(args.clips)
+    if not clips:
+        print(f"No audio clips found in {args.clips}")
+        sys.exit(1)
+
+    report = run_benchmark(clips, args.modes, args.repeat, args.model)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
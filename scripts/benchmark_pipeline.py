@@ -0,0 +1,269 @@
+"""
+Audio Pipeline Latency Benchmark
+Times each stage of the audio analysis pipeline (decode, resample to 16 kHz,
+VAD, feature extraction, CREMA, RAVDESS, wav2vec2, keywords) and the end-to-end
+`analyze_audio_from_data` call on synthetic voiced clips and data/sample.wav,
+at several durations and sample rates. ASR uses the local StaticBackend so
+runs are deterministic and offline.
+
+Reports p50/p95/p99 latency, throughput and realtime factor per clip and
+stage, optionally as JSON. Compare mode exits non-zero when a stage got
+slower than the baseline by more than the threshold.
+
+Usage:
+    python scripts/benchmark_pipeline.py --durations 1 4 10 --rates 16000 44100 --output bench.json
+    python scripts/benchmark_pipeline.py --baseline bench_main.json --threshold 0.2
+    python scripts/benchmark_pipeline.py --compare bench_main.json bench_branch.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "sample.wav")
+STAGES = ("decode", "resample", "vad", "features", "crema", "ravdess", "wav2vec2", "keywords", "end_to_end")
+KEYWORD_TRANSCRIPT = "please help me I am stuck and there is a fire"
+STATIC_TRANSCRIPT = "I am walking home from the station now"
+
+
+def synthetic_voiced(duration: float, sample_rate: int, seed: int = 0) -> np.ndarray:
+    """Speech-like test signal: a gliding harmonic series with syllable-rate envelope and light noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 0.5
+    y = 0.3 * voiced * envelope + 0.003 * rng.standard_normal(len(t))
+    return (y / np.max(np.abs(y)) * 0.5).astype(np.float32)
+
+
+def _fit_duration(y: np.ndarray, sample_rate: int, duration: float) -> np.ndarray:
+    """Loop or cut a clip to exactly `duration` seconds."""
+    n = int(duration * sample_rate)
+    return np.resize(y, n) if len(y) < n else y[:n]
+
+
+def build_clips(durations: List[float], rates: List[int], include_sample: bool = True) -> List[Dict]:
+    """Clip specs with the audio as in-memory WAV bytes (what an upload looks like)."""
+    import librosa
+    import soundfile as sf
+
+    sources = [("synthetic", None)]
+    if include_sample and os.path.exists(SAMPLE_PATH):
+        y, sample_rate = sf.read(SAMPLE_PATH, dtype="float32", always_2d=True)
+        sources.append(("sample", (y.mean(axis=1), sample_rate)))
+
+    clips = []
+    for source, audio in sources:
+        for rate in rates:
+            if audio is None:
+                base = synthetic_voiced(max(durations), rate)
+            else:
+                y, sample_rate = audio
+                base = y if sample_rate == rate else librosa.resample(y, orig_sr=sample_rate, target_sr=rate)
+            for duration in durations:
+                y = _fit_duration(base, rate, duration)
+                buffer = io.BytesIO()
+                sf.write(buffer, y, rate, format="WAV", subtype="PCM_16")
+                clips.append({
+                    "name": f"{source}_{duration:g}s_{rate}",
+                    "duration": duration,
+                    "sample_rate": rate,
+                    "wav_bytes": buffer.getvalue(),
+                })
+    return clips
+
+
+def summarize(samples_ms: List[float], audio_seconds: float) -> Dict:
+    values = np.asarray(samples_ms)
+    mean = float(values.mean())
+    return {
+        "count": len(values),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "mean_ms": round(mean, 3),
+        "throughput_per_s": round(1000.0 / mean, 2) if mean > 0 else None,
+        "realtime_factor": round(audio_seconds * 1000.0 / mean, 2) if mean > 0 else None,
+    }
+
+
+def _time(fn: Callable, repeat: int, warmup: int = 1) -> List[float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run_benchmark(clips: List[Dict], stages: List[str], repeat: int) -> Dict:
+    import combined_pipeline as cp
+    from audio_features import compute_feature_bundle
+    from audio_io import decode_audio_bytes, normalize_audio
+    from pipeline_config import pipeline_config
+    from transcription import StaticBackend
+    from voice_activity import detect_voice_activity
+
+    cp.set_transcription_backend(StaticBackend(default=STATIC_TRANSCRIPT))
+
+    # Load only the models the selected stages need
+    needed = {"crema", "ravdess", "wav2vec2"} & set(stages)
+    if "end_to_end" in stages:
+        needed |= {"crema", "ravdess", "wav2vec2"}
+    load_seconds = {}
+    for name in sorted(needed):
+        start = time.perf_counter()
+        cp.model_manager.get(name)
+        load_seconds[name] = round(time.perf_counter() - start, 3)
+    models = {name: info["state"] for name, info in cp.model_manager.status()["models"].items()}
+
+    results: Dict[str, Dict] = {}
+    for clip in clips:
+        print(f"⏱️  {clip['name']} ...")
+        native, native_rate = decode_audio_bytes(clip["wav_bytes"])
+        # Model stages run on the canonical 16 kHz buffer, as in the pipeline
+        y, sample_rate = normalize_audio(native, native_rate)
+        bundle = compute_feature_bundle(y, sample_rate)
+        stage_fns: Dict[str, Callable] = {
+            "decode": lambda: decode_audio_bytes(clip["wav_bytes"]),
+            "resample": lambda: normalize_audio(native, native_rate),
+            "vad": lambda: detect_voice_activity(y, sample_rate, pipeline_config),
+            "features": lambda: compute_feature_bundle(y, sample_rate),
+            "keywords": lambda: cp.detect_keywords(KEYWORD_TRANSCRIPT),
+            "end_to_end": lambda: cp.analyze_audio_from_data(*decode_audio_bytes(clip["wav_bytes"], sample_rate)),
+        }
+        if models.get("crema") == "ready":
+            stage_fns["crema"] = lambda: cp.predict_crema(y, sample_rate, bundle)
+        if models.get("ravdess") == "ready":
+            stage_fns["ravdess"] = lambda: cp.predict_ravdess(y, sample_rate, bundle)
+        if models.get("wav2vec2") == "ready":
+            # Direct model call: the request-level micro-batcher would add its wait window
+            stage_fns["wav2vec2"] = lambda: cp._run_hf_batch([(y, sample_rate)])
+
+        clip_results = {}
+        for stage in stages:
+            if stage not in stage_fns:
+                clip_results[stage] = {"skipped": f"model {models.get(stage, 'unavailable')}"}
+                continue
+            clip_results[stage] = summarize(_time(stage_fns[stage], repeat), clip["duration"])
+        results[clip["name"]] = clip_results
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "repeat": repeat,
+            "models": models,
+            "model_load_seconds": load_seconds,
+            "hf_inference_mode": pipeline_config.get("hf_inference_mode"),
+            "vad_enabled": pipeline_config.get("vad_enabled"),
+        },
+        "results": results,
+    }
+
+
+def compare_reports(baseline: Dict, current: Dict, threshold: float, metric: str = "p95_ms") -> Tuple[List[Dict], List[Dict]]:
+    """
+    Compare `metric` for every (clip, stage) in both reports.
+    Returns (all rows, regressions) where a regression is current > baseline * (1 + threshold).
+    """
+    rows, regressions = [], []
+    for clip, stages in current["results"].items():
+        for stage, stats in stages.items():
+            old = baseline.get("results", {}).get(clip, {}).get(stage, {})
+            if metric not in stats or metric not in old or not old[metric]:
+                continue
+            change = stats[metric] / old[metric] - 1
+            row = {"clip": clip, "stage": stage, "baseline": old[metric], "current": stats[metric],
+                   "change": round(change, 4), "regressed": change > threshold}
+            rows.append(row)
+            if row["regressed"]:
+                regressions.append(row)
+    return rows, regressions
+
+
+def print_report(report: Dict, stages: List[str]):
+    print("\n" + "=" * 96)
+    print(f"{'clip':<24} {'stage':<11} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>9} {'x realtime':>11}")
+    print("-" * 96)
+    for clip, results in report["results"].items():
+        for stage in stages:
+            r = results.get(stage, {})
+            if "skipped" in r:
+                print(f"{clip:<24} {stage:<11} {r['skipped']}")
+            elif r:
+                print(f"{clip:<24} {stage:<11} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+                      f"{r['throughput_per_s']:>9.1f} {r['realtime_factor']:>11.1f}")
+    print("=" * 96)
+
+
+def print_comparison(rows: List[Dict], regressions: List[Dict], threshold: float, metric: str):
+    print(f"\nComparison on {metric} (threshold +{threshold:.0%}):")
+    for row in rows:
+        flag = "❌ REGRESSION" if row["regressed"] else ""
+        print(f"  {row['clip']:<24} {row['stage']:<11} {row['baseline']:>9.2f} -> {row['current']:>9.2f} "
+              f"({row['change']:+.1%}) {flag}")
+    if regressions:
+        print(f"\n❌ {len(regressions)} stage(s) regressed beyond {threshold:.0%}")
+    else:
+        print("\n✅ No regressions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage latency benchmark for the audio pipeline")
+    parser.add_argument("--durations", nargs="+", type=float, default=[1.0, 4.0, 10.0], help="Clip lengths in seconds")
+    parser.add_argument("--rates", nargs="+", type=int, default=[16000, 22050, 44100], help="Clip sample rates")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per clip and stage")
+    parser.add_argument("--no-sample", action="store_true", help="Synthetic clips only (skip data/sample.wav)")
+    parser.add_argument("--output", help="Write the report as JSON")
+    parser.add_argument("--baseline", help="Compare this run against a saved report")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="Compare two saved reports and exit")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before failing (0.2 = +20%%)")
+    parser.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"])
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        rows, regressions = compare_reports(baseline, current, args.threshold, args.metric)
+        print_comparison(rows, regressions, args.threshold, args.metric)
+        sys.exit(1 if regressions else 0)
+
+    clips = build_clips(args.durations, args.rates, include_sample=not args.no_sample)
+    report = run_benchmark(clips, args.stages, args.repeat)
+    print_report(report, args.stages)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows, regressions = compare_reports(baseline, report, args.threshold, args.metric)
+        print_comparison(rows, regressions, args.threshold, args.metric)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
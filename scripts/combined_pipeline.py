@@ -1,23 +1,26 @@
 import os
 import pickle
-import warnings
+import queue
+import threading
 import time
-import shutil
+import warnings
 import numpy as np
 import librosa
-import sounddevice as sd
-import torch
-import speech_recognition as sr
-from transformers import Wav2Vec2FeatureExtractor, Wav2Vec2ForSequenceClassification
-import soundfile as sf
-import tempfile
+import metrics
+from audio_features import compute_feature_bundle, crema_vector, ravdess_vector
+from audio_io import normalize_audio
+from compiled_forest import compiled_path_for, load_forest
+from inference_batcher import InferenceBatcher
+from keyword_engine import detect_distress_keywords
+from model_manager import ModelManager
+from pipeline_config import pipeline_config
+from stage_executor import IO, StageRun
+from transcription import create_transcriber
+from voice_activity import VadCounters, detect_voice_activity
 
 warnings.filterwarnings("ignore", category=UserWarning)
 
 model_name = "ehcalabres/wav2vec2-lg-xlsr-en-speech-emotion-recognition"
-extractor = Wav2Vec2FeatureExtractor.from_pretrained(model_name)
-hf_model = Wav2Vec2ForSequenceClassification.from_pretrained(model_name)
-hf_model.eval()
 
 hf_label_map = {
     0: "neutral",
@@ -29,32 +32,83 @@ hf_label_map = {
     6: "positive",
 }
 
+ANALYSIS_SECONDS = metrics.histogram(
+    "audio_analysis_duration_seconds", "End-to-end audio analysis time by outcome", ["outcome"])
+EMOTION_TIER_SECONDS = metrics.histogram(
+    "emotion_cascade_tier_duration_seconds", "Emotion cascade time per tier (sklearn, wav2vec2)", ["tier"])
+EMOTION_CASCADE = metrics.counter(
+    "emotion_cascade_clips_total", "Clips decided by the sklearn tier (accepted) or escalated to wav2vec2", ["outcome"])
+
 CREMA_PATH = os.path.join(os.path.dirname(__file__), "..", "models", "emotion_model.pkl")
 RAVDESS_PATH = os.path.join(os.path.dirname(__file__), "..", "models", "emotion_model_ravdess.pkl")
+WARMUP_SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "sample.wav")
 
-# Load models with error handling (graceful degradation)
-crema_model = None
-ravdess_model = None
 
-try:
-    if os.path.exists(CREMA_PATH):
-        crema_model = pickle.load(open(CREMA_PATH, "rb"))
-        print(f"✅ Loaded CREMA model from {CREMA_PATH}")
-    else:
-        print(f"⚠️  CREMA model not found at {CREMA_PATH}")
-except Exception as e:
-    print(f"⚠️  Could not load CREMA model: {e}")
-
-try:
-    if os.path.exists(RAVDESS_PATH):
-        ravdess_model = pickle.load(open(RAVDESS_PATH, "rb"))
-        print(f"✅ Loaded RAVDESS model from {RAVDESS_PATH}")
+def load_wav2vec2(mode=None):
+    """
+    Load the feature extractor and a runner for the configured inference mode
+    ("fp32", "int8" or "onnx", see hf_inference).
+    """
+    # torch/transformers are imported here so importing this module stays cheap
+    from transformers import Wav2Vec2FeatureExtractor, Wav2Vec2ForSequenceClassification
+    from hf_inference import create_runner
+
+    extractor = Wav2Vec2FeatureExtractor.from_pretrained(model_name)
+    hf_model = Wav2Vec2ForSequenceClassification.from_pretrained(model_name)
+    hf_model.eval()
+    runner = create_runner(
+        hf_model,
+        mode or pipeline_config.get("hf_inference_mode", "fp32"),
+        onnx_path=pipeline_config.get("hf_onnx_path", "")
+    )
+    return extractor, runner
+
+
+def _load_pickle_model(label, path):
+    # Missing sklearn models are optional (graceful degradation)
+    compiled = pipeline_config.get("sklearn_compiled_forest", True)
+    if not os.path.exists(path) and not (compiled and os.path.isdir(compiled_path_for(path))):
+        print(f"⚠️  {label} model not found at {path}")
+        return None
+    if compiled:
+        # Memory-mapped array form of the forest (compiled from the pickle on first load)
+        model = load_forest(path)
     else:
-        print(f"⚠️  RAVDESS model not found at {RAVDESS_PATH}")
-except Exception as e:
-    print(f"⚠️  Could not load RAVDESS model: {e}")
+        with open(path, "rb") as f:
+            model = pickle.load(f)
+    print(f"✅ Loaded {label} model from {path}")
+    return model
+
+
+# Cheap sklearn models are registered first so they are usable while wav2vec2 loads
+model_manager = ModelManager()
+model_manager.register("crema", lambda: _load_pickle_model("CREMA", CREMA_PATH), required=False)
+model_manager.register("ravdess", lambda: _load_pickle_model("RAVDESS", RAVDESS_PATH), required=False)
+model_manager.register("wav2vec2", load_wav2vec2)
+
+
+def warmup():
+    """Run one inference on the bundled sample clip so the first request is not cold."""
+    y, sample_rate = librosa.load(WARMUP_SAMPLE_PATH, sr=None)
+    return predict_emotion_combined(y, sample_rate)
+
+
+model_manager.set_warmup(warmup)
+
+
+def start_model_loading():
+    """Start loading all models (and the warmup inference) on a background thread."""
+    return model_manager.start_background()
+
 
 crema_label_map = {
+    # CREMA-D file codes (what the trained forest predicts)
+    "NEU": "neutral",
+    "HAP": "positive",
+    "SAD": "distressed",
+    "ANG": "distressed",
+    "FEA": "distressed",
+    "DIS": "distressed",
     "neutral": "neutral",
     "happy": "positive",
     "sad": "distressed",
@@ -75,98 +129,406 @@ ravdess_label_map = {
     "surprise": "positive",
 }
 
-DISTRESS_KEYWORDS = ["help", "fire", "stop", "danger", "emergency", "hurt", "attack"]
+def detect_keywords(transcript: str):
+    return detect_distress_keywords(transcript)
 
 
-def detect_keywords(transcript: str):
-    if not transcript:
-        return {"distress_detected": False, "reason": "no keyword"}
-    transcript_lower = transcript.lower()
-    for word in DISTRESS_KEYWORDS:
-        if word in transcript_lower:
-            return {"distress_detected": True, "reason": f"keyword: '{word}'"}
-    return {"distress_detected": False, "reason": "no keyword"}
 
+def extract_features_crema(y, sample_rate, bundle=None):
 
+    if bundle is None:
+        bundle = compute_feature_bundle(y, sample_rate)
+    return crema_vector(bundle)
 
-def extract_features_crema(y, sample_rate):
 
-    mfcc = librosa.feature.mfcc(y=y, sr=sample_rate, n_mfcc=20)
-    mfcc_mean = np.mean(mfcc, axis=1)
-    delta_mfcc = np.mean(librosa.feature.delta(mfcc), axis=1)
-    chroma = np.mean(librosa.feature.chroma_stft(S=np.abs(librosa.stft(y)), sr=sample_rate), axis=1)
-    rms = np.mean(librosa.feature.rms(y=y))
-    zcr = np.mean(librosa.feature.zero_crossing_rate(y))
-    features = np.hstack([mfcc_mean, delta_mfcc, chroma, rms, zcr])
-    return features.reshape(1, -1)
+def extract_features_ravdess(y, sample_rate, bundle=None):
 
+    if bundle is None:
+        bundle = compute_feature_bundle(y, sample_rate)
+    return ravdess_vector(bundle)
 
-def extract_features_ravdess(y, sample_rate):
+def _run_hf_batch(items):
+    """
+    Run wav2vec2 on a list of (waveform, sample_rate) items as padded batches
+    with attention masks. Returns one label per item, in order.
+    """
+    loaded = model_manager.get("wav2vec2")
+    if loaded is None:
+        return ["neutral"] * len(items)
+    extractor, runner = loaded
+    import torch
+
+    # The feature extractor takes a single sampling rate per call
+    by_rate = {}
+    for i, (_, rate) in enumerate(items):
+        by_rate.setdefault(rate, []).append(i)
+
+    labels = ["neutral"] * len(items)
+    for rate, indices in by_rate.items():
+        inputs = extractor(
+            [items[i][0] for i in indices],
+            sampling_rate=rate,
+            return_tensors="pt",
+            padding=True,
+            return_attention_mask=True,
+        )
+        logits = runner(inputs)
+        for i, pred_idx in zip(indices, torch.argmax(logits, dim=-1).tolist()):
+            labels[i] = hf_label_map.get(int(pred_idx), "neutral")
+    return labels
+
+
+vad_counters = VadCounters()
+
+_hf_batcher = None
+_hf_batcher_lock = threading.Lock()
+
+
+def get_hf_batcher():
+    """Return the shared wav2vec2 batcher, or None if batching is disabled."""
+    global _hf_batcher
+    if not pipeline_config.get("hf_batching_enabled", True):
+        return None
+    if _hf_batcher is None:
+        with _hf_batcher_lock:
+            if _hf_batcher is None:
+                _hf_batcher = InferenceBatcher(
+                    _run_hf_batch,
+                    max_batch_size=pipeline_config.get("hf_batch_max_size", 8),
+                    max_wait_ms=pipeline_config.get("hf_batch_max_wait_ms", 20),
+                    max_queue_size=pipeline_config.get("hf_batch_max_queue", 256),
+                    name="wav2vec2-batcher",
+                )
+    return _hf_batcher
+
+
+def current_hf_batcher():
+    """The shared wav2vec2 batcher if one has been started, without creating it (for stats and metrics)."""
+    return _hf_batcher
+
+
+def window_starts(n_samples, window, hop):
+    """Start offsets of fixed-length windows covering n_samples; the last window ends at the clip end."""
+    if n_samples <= window:
+        return [0]
+    starts = list(range(0, n_samples - window + 1, hop))
+    if starts[-1] + window < n_samples:
+        starts.append(n_samples - window)
+    return starts
+
+
+def _run_hf_windows(waveform, sample_rate):
+    """
+    Long-audio wav2vec2: the clip is split into overlapping windows of
+    hf_window_seconds that run hf_window_batch_size at a time, so peak memory
+    depends on the window, not on the clip length. The clip label is the
+    argmax of the per-window class probabilities averaged over all windows.
+    Returns (label, timeline) with one {start_seconds, end_seconds, label, confidence} per window.
+    """
+    loaded = model_manager.get("wav2vec2")
+    if loaded is None:
+        return "neutral", []
+    extractor, runner = loaded
+    import torch
+
+    window = int(pipeline_config.get("hf_window_seconds", 8.0) * sample_rate)
+    hop = max(1, window - int(pipeline_config.get("hf_window_overlap_seconds", 2.0) * sample_rate))
+    batch_size = max(1, int(pipeline_config.get("hf_window_batch_size", 4)))
+    starts = window_starts(len(waveform), window, hop)
+
+    prob_sum = None
+    timeline = []
+    for i in range(0, len(starts), batch_size):
+        batch_starts = starts[i:i + batch_size]
+        # Equal-length windows: no padding, and only this batch's activations are alive
+        inputs = extractor(
+            [waveform[start:start + window] for start in batch_starts],
+            sampling_rate=sample_rate,
+            return_tensors="pt",
+            padding=True,
+            return_attention_mask=True,
+        )
+        probs = torch.softmax(runner(inputs).float(), dim=-1)
+        batch_sum = probs.sum(dim=0)
+        prob_sum = batch_sum if prob_sum is None else prob_sum + batch_sum
+        for start, window_probs in zip(batch_starts, probs):
+            pred_idx = int(torch.argmax(window_probs))
+            timeline.append({
+                "start_seconds": round(start / sample_rate, 2),
+                "end_seconds": round(min(start + window, len(waveform)) / sample_rate, 2),
+                "label": hf_label_map.get(pred_idx, "neutral"),
+                "confidence": round(float(window_probs[pred_idx]), 4),
+            })
+    return hf_label_map.get(int(torch.argmax(prob_sum)), "neutral"), timeline
+
+
+def is_long_audio(waveform, sample_rate):
+    """True if the clip takes the windowed wav2vec2 path."""
+    if not pipeline_config.get("hf_long_audio_enabled", True):
+        return False
+    return len(waveform) > pipeline_config.get("hf_window_seconds", 8.0) * sample_rate
+
+
+def predict_hf_detailed(waveform, sample_rate):
+    """
+    wav2vec2 prediction as (label, timeline). Clips longer than one window are
+    run in windows (see _run_hf_windows); shorter clips go through the shared
+    micro-batcher and have no timeline (None).
+    """
+    if model_manager.get("wav2vec2") is None:
+        return "neutral", None
+    try:
+        if is_long_audio(waveform, sample_rate):
+            return _run_hf_windows(waveform, sample_rate)
+        batcher = get_hf_batcher()
+        if batcher is None:
+            return _run_hf_batch([(waveform, sample_rate)])[0], None
+        try:
+            return batcher.predict((waveform, sample_rate)), None
+        except queue.Full:
+            # Batcher is saturated; run this clip directly rather than drop it
+            return _run_hf_batch([(waveform, sample_rate)])[0], None
+    except Exception:
+        return "neutral", None
 
-    mfcc = librosa.feature.mfcc(y=y, sr=sample_rate, n_mfcc=20)
-    mfcc_mean = np.mean(mfcc, axis=1)
-    delta_mfcc = np.mean(librosa.feature.delta(mfcc), axis=1)
-    features = np.hstack([mfcc_mean, delta_mfcc])
-    return features.reshape(1, -1)
 
 def predict_hf(waveform, sample_rate):
+    return predict_hf_detailed(waveform, sample_rate)[0]
+
+def _predict_sklearn(model, features, label_map):
+    if features.shape[1] != getattr(model, "n_features_in_", features.shape[1]):
+        required = getattr(model, "n_features_in_", features.shape[1])
+        features = np.resize(features, (1, required))
+    pred_raw = model.predict(features)[0]
+    return label_map.get(pred_raw, "neutral")
 
+
+def predict_crema(y, sample_rate, bundle=None):
+    """CREMA model prediction ("neutral" if the model is unavailable or fails)."""
+    crema_model = model_manager.get("crema")
+    if crema_model is None:
+        return "neutral"
+    try:
+        return _predict_sklearn(crema_model, extract_features_crema(y, sample_rate, bundle), crema_label_map)
+    except Exception:
+        return "neutral"
+
+
+def predict_ravdess(y, sample_rate, bundle=None):
+    """RAVDESS model prediction ("neutral" if the model is unavailable or fails)."""
+    ravdess_model = model_manager.get("ravdess")
+    if ravdess_model is None:
+        return "neutral"
     try:
-        inputs = extractor(waveform, sampling_rate=sample_rate, return_tensors="pt", padding=True)
-        with torch.no_grad():
-            logits = hf_model(**inputs).logits
-            pred_idx = int(torch.argmax(logits, dim=-1).item())
-        return hf_label_map.get(pred_idx, "neutral")
+        return _predict_sklearn(ravdess_model, extract_features_ravdess(y, sample_rate, bundle), ravdess_label_map)
     except Exception:
         return "neutral"
 
+
+def _score_sklearn(model, features, label_map):
+    """(label, confidence): class probabilities summed per mapped label, then the top label."""
+    if features.shape[1] != getattr(model, "n_features_in_", features.shape[1]):
+        required = getattr(model, "n_features_in_", features.shape[1])
+        features = np.resize(features, (1, required))
+    if not hasattr(model, "predict_proba"):
+        # No probabilities: the label is known but never trusted on its own
+        return label_map.get(model.predict(features)[0], "neutral"), 0.0
+    scores = {}
+    for cls, prob in zip(model.classes_, model.predict_proba(features)[0]):
+        label = label_map.get(cls, "neutral")
+        scores[label] = scores.get(label, 0.0) + float(prob)
+    label = max(scores, key=scores.get)
+    return label, round(scores[label], 4)
+
+
+def score_crema(y, sample_rate, bundle=None):
+    """CREMA (label, confidence), or None if the model is unavailable or fails."""
+    crema_model = model_manager.get("crema")
+    if crema_model is None:
+        return None
+    try:
+        return _score_sklearn(crema_model, extract_features_crema(y, sample_rate, bundle), crema_label_map)
+    except Exception:
+        return None
+
+
+def score_ravdess(y, sample_rate, bundle=None):
+    """RAVDESS (label, confidence), or None if the model is unavailable or fails."""
+    ravdess_model = model_manager.get("ravdess")
+    if ravdess_model is None:
+        return None
+    try:
+        return _score_sklearn(ravdess_model, extract_features_ravdess(y, sample_rate, bundle), ravdess_label_map)
+    except Exception:
+        return None
+
+
+def cascade_decision(scores):
+    """
+    Tier-1 verdict of the emotion cascade: the shared label if every available
+    sklearn model predicts it with at least emotion_cascade_confidence, else
+    None (escalate to wav2vec2). Also None if no sklearn model is available.
+    """
+    scores = [s for s in scores if s is not None]
+    threshold = pipeline_config.get("emotion_cascade_confidence", 0.6)
+    if not scores or len({label for label, _ in scores}) != 1:
+        return None
+    if any(confidence < threshold for _, confidence in scores):
+        return None
+    return scores[0][0]
+
+
+def run_cascade(scores, tier1_seconds, run_wav2vec2):
+    """
+    The cascade step shared by predict_emotion_cascade and the analysis pipeline:
+    accept the sklearn verdict, or escalate by calling run_wav2vec2() (returns
+    (label, timeline)). Records the outcome and tier latencies.
+    Returns (accepted label or None, wav2vec2 (label, timeline) or ("skipped", None)).
+    """
+    accepted = cascade_decision(scores)
+    if accepted is not None:
+        cascade_counters.record(tier1_seconds)
+        return accepted, ("skipped", None)
+    start = time.perf_counter()
+    hf_detail = run_wav2vec2()
+    cascade_counters.record(tier1_seconds, time.perf_counter() - start)
+    return None, hf_detail
+
+
+def cascade_final(accepted, preds):
+    """Final label: the accepted sklearn verdict, else the vote over the predictions that ran."""
+    if accepted is not None:
+        return accepted
+    votes = [p for p in preds if p not in (None, "skipped")]
+    return combine_votes(votes) if votes else "neutral"
+
+
+def cascade_enabled():
+    return pipeline_config.get("emotion_mode", "vote") == "cascade"
+
+
+class CascadeCounters:
+    """Thread-safe escalation counts and per-tier latency of the emotion cascade."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clips = 0
+        self.escalated = 0
+        self.tier1_seconds = 0.0
+        self.tier2_seconds = 0.0
+
+    def record(self, tier1_seconds, tier2_seconds=None):
+        escalated = tier2_seconds is not None
+        with self._lock:
+            self.clips += 1
+            self.escalated += 1 if escalated else 0
+            self.tier1_seconds += tier1_seconds
+            self.tier2_seconds += tier2_seconds or 0.0
+        EMOTION_TIER_SECONDS.observe(tier1_seconds, tier="sklearn")
+        if escalated:
+            EMOTION_TIER_SECONDS.observe(tier2_seconds, tier="wav2vec2")
+        EMOTION_CASCADE.inc(outcome="escalated" if escalated else "accepted")
+
+    def stats(self):
+        with self._lock:
+            clips, escalated = self.clips, self.escalated
+            tier1, tier2 = self.tier1_seconds, self.tier2_seconds
+        tier1_ms = tier1 * 1000 / clips if clips else None
+        tier2_ms = tier2 * 1000 / escalated if escalated else None
+        stats = {
+            "mode": pipeline_config.get("emotion_mode", "vote"),
+            "confidence": pipeline_config.get("emotion_cascade_confidence", 0.6),
+            "clips": clips,
+            "escalated": escalated,
+            "escalation_rate": round(escalated / clips, 4) if clips else None,
+            "tier1_mean_ms": round(tier1_ms, 3) if tier1_ms is not None else None,
+            "tier2_mean_ms": round(tier2_ms, 3) if tier2_ms is not None else None,
+            "mean_cost_ms": round((tier1 + tier2) * 1000 / clips, 3) if clips else None,
+        }
+        # Cost relative to running every model on every clip
+        if tier1_ms is not None and tier2_ms is not None:
+            stats["estimated_speedup"] = round((tier1_ms + tier2_ms) / stats["mean_cost_ms"], 2)
+        return stats
+
+
+cascade_counters = CascadeCounters()
+
+
+def combine_votes(preds):
+    """Majority vote over model predictions."""
+    votes = [v for v in preds if v != "neutral" or len(preds) == 3]
+    if not votes:
+        votes = list(preds)
+
+    vote_counts = {k: votes.count(k) for k in set(votes)}
+    return max(vote_counts, key=vote_counts.get) if vote_counts else "neutral"
+
+
+def compute_shared_features(y, sample_rate):
+    """Feature bundle for the sklearn models, or None if neither model is loaded."""
+    if model_manager.get("crema") is None and model_manager.get("ravdess") is None:
+        return None
+    try:
+        return compute_feature_bundle(y, sample_rate)
+    except Exception:
+        return None
+
+
+POOLED_FEATURES = ("mfcc_mean", "delta_mfcc_mean", "chroma", "rms", "zcr")
+
+
+def pooled_features(bundle):
+    """The clip-level features of a bundle (drops the frame matrices), or None."""
+    if bundle is None:
+        return None
+    return {name: bundle[name] for name in POOLED_FEATURES}
+
+
 def predict_emotion_combined(y, sample_rate):
 
-    if isinstance(y, np.ndarray) and y.ndim > 1:
-        y = y.flatten()
-    
-    # CREMA model prediction
-    if crema_model is not None:
-        try:
-            feats_crema = extract_features_crema(y, sample_rate)
-            if feats_crema.shape[1] != getattr(crema_model, "n_features_in_", feats_crema.shape[1]):
-                required = getattr(crema_model, "n_features_in_", feats_crema.shape[1])
-                feats_crema = np.resize(feats_crema, (1, required))
-            crema_pred_raw = crema_model.predict(feats_crema)[0]
-            crema_pred = crema_label_map.get(crema_pred_raw, "neutral")
-        except Exception:
-            crema_pred = "neutral"
-    else:
-        crema_pred = "neutral"
+    # Canonical mono float32 16 kHz for every model (no-op if already canonical)
+    y, sample_rate = normalize_audio(y, sample_rate)
 
-    # RAVDESS model prediction
-    if ravdess_model is not None:
-        try:
-            feats_ravdess = extract_features_ravdess(y, sample_rate)
-            if feats_ravdess.shape[1] != getattr(ravdess_model, "n_features_in_", feats_ravdess.shape[1]):
-                required = getattr(ravdess_model, "n_features_in_", feats_ravdess.shape[1])
-                feats_ravdess = np.resize(feats_ravdess, (1, required))
-            ravdess_pred_raw = ravdess_model.predict(feats_ravdess)[0]
-            ravdess_pred = ravdess_label_map.get(ravdess_pred_raw, "neutral")
-        except Exception:
-            ravdess_pred = "neutral"
-    else:
-        ravdess_pred = "neutral"
+    if cascade_enabled():
+        return predict_emotion_cascade(y, sample_rate)
+
+    # One spectral front end pass shared by both sklearn models
+    bundle = compute_shared_features(y, sample_rate)
+
+    crema_pred = predict_crema(y, sample_rate, bundle)
+    ravdess_pred = predict_ravdess(y, sample_rate, bundle)
 
     # HuggingFace model prediction
     hf_pred = predict_hf(y, sample_rate)
 
     # Combine predictions via voting
-    votes = [v for v in [crema_pred, ravdess_pred, hf_pred] if v != "neutral" or len([crema_pred, ravdess_pred, hf_pred]) == 3]
-    if not votes:
-        votes = [crema_pred, ravdess_pred, hf_pred]
-    
-    vote_counts = {k: votes.count(k) for k in set(votes)}
-    final_pred = max(vote_counts, key=vote_counts.get) if vote_counts else "neutral"
+    final_pred = combine_votes([crema_pred, ravdess_pred, hf_pred])
     
     return crema_pred, ravdess_pred, hf_pred, final_pred
 
+def predict_emotion_cascade(y, sample_rate):
+    """
+    Confidence-gated variant of predict_emotion_combined: the sklearn models
+    decide on their own when cascade_decision accepts them, and wav2vec2 runs
+    (with a three-way vote) only for the clips they are unsure about.
+    wav2vec2 is reported as "skipped" when it did not run.
+    """
+    start = time.perf_counter()
+    bundle = compute_shared_features(y, sample_rate)
+    crema = score_crema(y, sample_rate, bundle)
+    ravdess = score_ravdess(y, sample_rate, bundle)
+    tier1_seconds = time.perf_counter() - start
+    crema_pred = crema[0] if crema else "neutral"
+    ravdess_pred = ravdess[0] if ravdess else "neutral"
+
+    accepted, hf_detail = run_cascade([crema, ravdess], tier1_seconds, lambda: predict_hf_detailed(y, sample_rate))
+    hf_pred = hf_detail[0]
+    return crema_pred, ravdess_pred, hf_pred, cascade_final(accepted, [crema_pred, ravdess_pred, hf_pred])
+
+
 def record_audio(duration=4, sample_rate=16000):
+    import sounddevice as sd
+
     try:
         print(f"Recording {duration}s of audio")
         y = sd.rec(int(duration * sample_rate), samplerate=sample_rate, channels=1, dtype="float32")
@@ -176,70 +538,56 @@ def record_audio(duration=4, sample_rate=16000):
     except Exception as e:
         raise RuntimeError(f"Audio recording failed: {e}")
 
-def transcribe_audio(y, sample_rate, max_retries=5, retry_delay=0.25):
-    """
-    Writes y to a temporary wav, transcribes using Google (speech_recognition),
-    and safely removes the temp file on Windows (with retries).
-    """
-    if isinstance(y, np.ndarray) and y.ndim > 1:
-        y = y.flatten()
+_transcriber = None
+_transcriber_lock = threading.Lock()
 
-    tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-    temp_path = tmp.name
-    tmp.close()
 
+def get_transcriber():
+    """Shared Transcriber for the backend configured by pipeline_config["asr_backend"]."""
+    global _transcriber
+    if _transcriber is None:
+        with _transcriber_lock:
+            if _transcriber is None:
+                _transcriber = create_transcriber(pipeline_config)
+    return _transcriber
+
+
+def set_transcription_backend(backend):
+    """Swap the ASR backend (e.g. a StaticBackend in tests). Starts with an empty cache."""
+    global _transcriber
+    with _transcriber_lock:
+        _transcriber = create_transcriber(pipeline_config, backend)
+    return _transcriber
+
+
+def transcribe_audio_result(y, sample_rate):
+    """Transcribe with the configured backend. Returns {"text", "error", "cached", "backend", "seconds"}."""
     try:
-        
-        sf.write(temp_path, y, sample_rate, format="WAV")
+        transcriber = get_transcriber()
     except Exception as e:
-     
-        try:
-            os.remove(temp_path)
-        except Exception:
-            pass
-        return ""
+        return {"text": "", "error": f"ASR backend unavailable: {e}", "cached": False,
+                "backend": pipeline_config.get("asr_backend"), "seconds": 0.0}
+    return transcriber.transcribe(y, sample_rate)
+
 
-    recognizer = sr.Recognizer()
-    text = ""
+def model_versions():
+    """What produced an analysis result: model load identities, inference mode and ASR backend."""
     try:
-        with sr.AudioFile(temp_path) as source:
-            audio_data = recognizer.record(source)
-            try:
-                text = recognizer.recognize_google(audio_data)
-            except sr.UnknownValueError:
-                text = ""
-            except sr.RequestError:
-                text = ""
+        asr_backend = get_transcriber().backend.name
     except Exception:
-        text = ""
-
-    for attempt in range(max_retries):
-        try:
-            if not os.path.exists(temp_path):
-                break
-            dummy = temp_path + ".deleteme"
-            try:
-                shutil.move(temp_path, dummy)
-                os.remove(dummy)
-                break
-            except (PermissionError, OSError):
-         
-                try:
-                    os.remove(temp_path)
-                    break
-                except (PermissionError, OSError):
-                    time.sleep(retry_delay)
-        except Exception:
-            time.sleep(retry_delay)
-    else:
+        asr_backend = None
+    return {
+        **model_manager.versions(),
+        "hf_inference_mode": pipeline_config.get("hf_inference_mode", "fp32"),
+        "emotion_mode": pipeline_config.get("emotion_mode", "vote"),
+        "emotion_cascade_confidence": pipeline_config.get("emotion_cascade_confidence", 0.6),
+        "asr_backend": asr_backend,
+    }
 
-        try:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-        except Exception:
-            pass
 
-    return text
+def transcribe_audio(y, sample_rate):
+    """Transcript text only ("" if there was no speech or the backend failed)."""
+    return transcribe_audio_result(y, sample_rate)["text"]
 
 def analyze_audio_pipeline(duration=4):
     y, sample_rate = record_audio(duration)
@@ -259,27 +607,119 @@ def analyze_audio_pipeline(duration=4):
     print(f"\nSUMMARY: [{final_pred.upper()}] \"{(transcript or '').strip()}\"")
 
 
-def analyze_audio_from_data(audio_data, sample_rate):
+def _cascade_stage(run, tier1_started, audio_data, sample_rate):
+    """
+    Cascade decision inside an analysis StageRun. Returns (accepted label, hf_detail):
+    the sklearn verdict and ("skipped", None), or None and the wav2vec2 result.
+    Tier 1 is wall-clock time from the features submit until both sklearn stages finished.
+    """
+    scores = [run.result("crema"), run.result("ravdess")]
+    tier1_seconds = run.finished_at("crema", "ravdess") - tier1_started
+    return run_cascade(scores, tier1_seconds,
+                       lambda: run.run_inline("wav2vec2", predict_hf_detailed, audio_data, sample_rate))
+
+
+def analyze_audio_from_data(audio_data, sample_rate, short_circuit=True, include_features=False):
     """
     Analyze audio from numpy array or file data.
-    Returns: dict with transcript, emotions, and distress detection.
+    Windows without speech are gated by voice activity detection and skip
+    every heavy stage; speech windows are trimmed to the detected region.
+    ASR (I/O-bound) and each emotion model (CPU-bound) run concurrently.
+    With short_circuit, a keyword hit in the transcript returns a distress
+    verdict immediately; models still running are reported as "pending".
+    With include_features, the pooled features the sklearn models read are
+    returned under "features" (numpy arrays, None if not computed).
+    Input at any rate is converted once to mono float32 16 kHz (a no-op for
+    canonical input, e.g. uploads decoded with target_rate).
+    Returns: dict with transcript, emotions, distress detection and per-stage timings.
     """
-    if isinstance(audio_data, np.ndarray) and audio_data.ndim > 1:
-        audio_data = audio_data.flatten()
-    
-    # Transcribe audio
-    transcript = transcribe_audio(audio_data, sample_rate)
-    
-    # Predict emotion using combined models
-    crema_pred, ravdess_pred, hf_pred, final_pred = predict_emotion_combined(audio_data, sample_rate)
-    
+    audio_data, sample_rate = normalize_audio(audio_data, sample_rate)
+
+    run = StageRun()
+
+    # Voice activity gate: skip ASR and every model for silent / noise-only windows
+    vad = None
+    if pipeline_config.get("vad_enabled", True):
+        vad = run.run_inline("vad", detect_voice_activity, audio_data, sample_rate, pipeline_config)
+        vad_counters.record(gated=not vad.is_speech)
+        if not vad.is_speech:
+            ANALYSIS_SECONDS.observe(time.perf_counter() - run.started, outcome="gated")
+            gated = {
+                "transcript": "[No speech]",
+                "keywords": {"distress_detected": False, "reason": "no keyword"},
+                "emotions": {
+                    "crema": "skipped",
+                    "ravdess": "skipped",
+                    "huggingface": "skipped",
+                    "final": "neutral"
+                },
+                "distress_detected": False,
+                "confidence": 0.2,
+                "reason": "no speech",
+                "gated": True,
+                "vad": vad.to_dict(sample_rate),
+                "hf_timeline": None,
+                "escalated": None,
+                "transcription_error": None,
+                "short_circuited": False,
+                "timings_ms": run.timings_ms()
+            }
+            if include_features:
+                gated["features"] = None
+            return gated
+        if pipeline_config.get("vad_trim", True):
+            audio_data = audio_data[vad.start:vad.end]
+
+    # Transcribe audio (network round trip) while the models run
+    run.submit("asr", transcribe_audio_result, audio_data, sample_rate, kind=IO)
+    cascade = cascade_enabled()
+    if not cascade:
+        run.submit("wav2vec2", predict_hf_detailed, audio_data, sample_rate)
+    tier1_started = time.perf_counter()
+    features = run.submit("features", compute_shared_features, audio_data, sample_rate)
+    if cascade:
+        run.submit("crema", lambda: score_crema(audio_data, sample_rate, features.result()))
+        run.submit("ravdess", lambda: score_ravdess(audio_data, sample_rate, features.result()))
+        # Submitted after the sklearn stages, so it only waits on work already ahead of it
+        run.submit("cascade", _cascade_stage, run, tier1_started, audio_data, sample_rate)
+    else:
+        run.submit("crema", lambda: predict_crema(audio_data, sample_rate, features.result()))
+        run.submit("ravdess", lambda: predict_ravdess(audio_data, sample_rate, features.result()))
+
+    model_stages = ("crema", "ravdess", "wav2vec2")
+    asr_result = run.result("asr", default={"text": "", "error": "transcription failed"})
+    transcript = asr_result["text"]
+
     # Detect keywords
-    keywords_result = detect_keywords(transcript)
+    keywords_result = run.run_inline("keywords", detect_keywords, transcript)
+
+    block = not (short_circuit and keywords_result.get("distress_detected", False))
+    if not block:
+        run.cancel_pending()
+    accepted = escalated = None
+    if cascade:
+        outcome = run.result("cascade", block=block)
+        if outcome is not None:
+            accepted, hf_detail = outcome
+            escalated = accepted is None
+        else:
+            hf_detail = ("neutral", None) if block else None
+        scores = {m: run.result(m, block=block) for m in model_stages[:2]}
+        preds = {m: score[0] if score else ("neutral" if block else None) for m, score in scores.items()}
+    else:
+        hf_detail = run.result("wav2vec2", default=("neutral", None) if block else None, block=block)
+        preds = {m: run.result(m, default="neutral" if block else None, block=block) for m in model_stages[:2]}
+    preds["wav2vec2"] = hf_detail[0] if hf_detail else None
+
+    # Predict emotion using combined models (or the cascade's sklearn verdict)
+    final_pred = cascade_final(accepted, preds.values())
+    crema_pred, ravdess_pred, hf_pred = (preds[m] or "pending" for m in model_stages)
     
     # Determine if distress detected
     distress_detected = keywords_result.get("distress_detected", False) or final_pred == "distressed"
+    ANALYSIS_SECONDS.observe(time.perf_counter() - run.started, outcome="distress" if distress_detected else "clear")
     
-    return {
+    result = {
         "transcript": transcript or "[Unrecognized speech]",
         "keywords": keywords_result,
         "emotions": {
@@ -290,8 +730,18 @@ def analyze_audio_from_data(audio_data, sample_rate):
         },
         "distress_detected": distress_detected,
         "confidence": 0.9 if keywords_result.get("distress_detected") else (0.7 if final_pred == "distressed" else 0.2),
-        "reason": keywords_result.get("reason", f"emotion: '{final_pred}'") if not keywords_result.get("distress_detected") else keywords_result.get("reason")
+        "reason": keywords_result.get("reason", f"emotion: '{final_pred}'") if not keywords_result.get("distress_detected") else keywords_result.get("reason"),
+        "gated": False,
+        "vad": vad.to_dict(sample_rate) if vad is not None else None,
+        "hf_timeline": hf_detail[1] if hf_detail else None,
+        "escalated": escalated,
+        "transcription_error": asr_result.get("error"),
+        "short_circuited": not block,
+        "timings_ms": run.timings_ms()
     }
+    if include_features:
+        result["features"] = pooled_features(run.result("features", block=False))
+    return result
 
 
 if __name__ == "__main__":
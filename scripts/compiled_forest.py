@@ -0,0 +1,334 @@
+"""
+Compiled Random Forest
+Flattens a trained sklearn forest classifier (RandomForest / ExtraTrees) into
+contiguous node arrays: split feature, threshold, left/right child and the
+normalised class distribution of each leaf. The arrays are saved as plain .npy
+files plus a meta.json (no pickle) and memory-mapped on load.
+
+Prediction walks every tree for every row at once with NumPy gathers, one
+level per step, dropping (tree, row) pairs as they reach a leaf. Results
+match sklearn exactly: rows are cast to float32 and compared against the
+float64 thresholds as the sklearn tree does (NaN follows the node's
+missing-value direction), and tree probabilities are accumulated in tree
+order and divided by the tree count as in RandomForestClassifier.predict_proba.
+Single rows and small batches (what the pipeline scores) skip sklearn's
+per-call validation and per-tree dispatch and are several times faster. From
+SKLEARN_MIN_ROWS rows on, sklearn's compiled traversal is faster, so such
+batches are handed to the source model, unpickled on first use; without the
+pickle they are walked here in chunks.
+
+`load_forest(pkl_path)` is the loader used by the pipeline: it reuses the
+compiled copy next to the pickle (`<name>.forest/`) while it matches the
+pickle, and otherwise compiles it once from the pickle.
+
+Usage:
+    python scripts/compiled_forest.py models/emotion_model.pkl
+    python scripts/compiled_forest.py models/emotion_model.pkl --check 5000
+"""
+
+import argparse
+import json
+import os
+import pickle
+import shutil
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+FORMAT_VERSION = 1
+ARRAYS = ("feature", "threshold", "children", "missing_left", "leaf_proba", "roots")
+# Rows evaluated per pass; keeps the (trees x rows) working set cache-sized
+CHUNK_ROWS = 512
+# Batch size from which sklearn's own traversal beats the NumPy walk (measured crossover 512-1024 rows)
+SKLEARN_MIN_ROWS = 640
+
+
+class CompiledForest:
+    """Array form of a forest classifier with the sklearn predict/predict_proba interface."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict):
+        self.feature = arrays["feature"]            # int64 split feature per node
+        self.threshold = arrays["threshold"]        # float64, compared as x <= threshold
+        self.children = arrays["children"]          # int64 (n_nodes * 2): left, right; leaves point to themselves
+        self.missing_left = arrays["missing_left"]  # bool, where NaN goes (sklearn missing_go_to_left)
+        self.leaf_proba = arrays["leaf_proba"]      # float64 (n_nodes, n_classes), normalised, 0 for splits
+        self.roots = arrays["roots"]                # int64 root node of each tree
+        self.meta = meta
+        self.classes_ = np.asarray(meta["classes"])
+        self.n_classes_ = len(self.classes_)
+        self.n_features_in_ = meta["n_features"]
+        self.max_depth = meta["max_depth"]
+        # Pickle the forest was compiled from; large batches are scored by it (see predict_proba)
+        self.source_path: Optional[str] = None
+        self._source_model = None
+        self._source_lock = threading.Lock()
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node of every (tree, row) for float32 rows X; shape (n_trees, n_rows)."""
+        n_rows = len(X)
+        flat = X.ravel()
+        offsets = np.tile(np.arange(n_rows, dtype=np.int64) * self.n_features_in_, self.n_trees)
+        leaves = np.repeat(self.roots, n_rows)
+        has_nan = bool(np.isnan(flat).any())
+        # Only (tree, row) pairs still on a split node are stepped
+        active = np.arange(len(leaves))
+        nodes = leaves.copy()
+        for _ in range(self.max_depth):
+            values = np.take(flat, np.take(offsets, active) + np.take(self.feature, nodes))
+            go_right = ~(values <= np.take(self.threshold, nodes))
+            if has_nan:
+                go_right = np.where(np.isnan(values), ~np.take(self.missing_left, nodes), go_right)
+            nxt = np.take(self.children, 2 * nodes + go_right)
+            moved = nxt != nodes
+            leaves[active] = nxt
+            active, nodes = active[moved], nxt[moved]
+            if not len(active):
+                break
+        return leaves.reshape(self.n_trees, n_rows)
+
+    def _proba_chunk(self, X: np.ndarray) -> np.ndarray:
+        proba = np.zeros((len(X), self.n_classes_))
+        # Tree by tree, in order, like sklearn's accumulator (bit-identical sums)
+        for leaves in self.apply(X):
+            proba += np.take(self.leaf_proba, leaves, axis=0)
+        proba /= self.n_trees
+        return proba
+
+    def source_model(self):
+        """The sklearn forest from source_path, loaded once; None if it is missing or no longer matches."""
+        with self._source_lock:
+            if self._source_model is None and self.source_path:
+                model = None
+                if source_signature(self.source_path) == self.meta.get("source"):
+                    with open(self.source_path, "rb") as f:
+                        model = pickle.load(f)
+                # False: looked once, keep using the compiled walk
+                self._source_model = model if model is not None else False
+                self.source_path = None
+            return self._source_model or None
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[-1]} features, but the forest expects {self.n_features_in_}")
+        if np.isinf(X).any():
+            raise ValueError("Input X contains infinity or a value too large for dtype('float32').")
+        if len(X) >= SKLEARN_MIN_ROWS:
+            model = self.source_model()
+            if model is not None:
+                return model.predict_proba(X)
+        return self.compiled_proba(X)
+
+    def compiled_proba(self, X: np.ndarray) -> np.ndarray:
+        """predict_proba of validated float32 rows by the array walk, whatever the batch size."""
+        if len(X) <= CHUNK_ROWS:
+            return self._proba_chunk(X)
+        return np.concatenate([self._proba_chunk(X[i:i + CHUNK_ROWS]) for i in range(0, len(X), CHUNK_ROWS)])
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def save(self, path: str):
+        """Write the arrays and meta.json to directory `path`, replacing it atomically."""
+        tmp_path = path + ".tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        try:
+            for name in ARRAYS:
+                np.save(os.path.join(tmp_path, f"{name}.npy"), getattr(self, name))
+            with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+                json.dump(self.meta, f, indent=2)
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "CompiledForest":
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled forest format {meta.get('format_version')}")
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+                  for name in ARRAYS}
+        return cls(arrays, meta)
+
+
+def compile_forest(model, source: Optional[Dict] = None) -> CompiledForest:
+    """Flatten a fitted single-output sklearn forest classifier. Raises TypeError for anything else."""
+    estimators = getattr(model, "estimators_", None)
+    if not estimators or not hasattr(model, "classes_") or getattr(model, "n_outputs_", 1) != 1:
+        raise TypeError(f"Cannot compile {type(model).__name__}: expected a fitted single-output forest classifier")
+
+    features, thresholds, children, missing_left, leaf_probas, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+        own = np.arange(offset, offset + n, dtype=np.int64)
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+        thresholds.append(np.where(is_leaf, 0.0, tree.threshold).astype(np.float64))
+        children.append(np.stack([
+            np.where(is_leaf, own, tree.children_left + offset),
+            np.where(is_leaf, own, tree.children_right + offset),
+        ], axis=1).astype(np.int64).ravel())
+        missing = getattr(tree, "missing_go_to_left", None)
+        missing_left.append(np.zeros(n, dtype=bool) if missing is None else np.asarray(missing, dtype=bool))
+        # Same normalisation as DecisionTreeClassifier.predict_proba, precomputed per leaf
+        value = np.array(tree.value[:, 0, :model.n_classes_], dtype=np.float64)
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        value /= normalizer
+        value[~is_leaf] = 0.0
+        leaf_probas.append(value)
+        roots.append(offset)
+        offset += n
+
+    arrays = {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "children": np.concatenate(children),
+        "missing_left": np.concatenate(missing_left),
+        "leaf_proba": np.ascontiguousarray(np.concatenate(leaf_probas)),
+        "roots": np.asarray(roots, dtype=np.int64),
+    }
+    try:
+        import sklearn
+        sklearn_version = sklearn.__version__
+    except ImportError:
+        sklearn_version = None
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "model_type": type(model).__name__,
+        "classes": model.classes_.tolist(),
+        "n_features": int(model.n_features_in_),
+        "n_trees": len(estimators),
+        "n_nodes": int(offset),
+        "max_depth": int(max(e.tree_.max_depth for e in estimators)),
+        "sklearn_version": sklearn_version,
+        "source": source,
+    }
+    return CompiledForest(arrays, meta)
+
+
+def compiled_path_for(pkl_path: str) -> str:
+    return os.path.splitext(pkl_path)[0] + ".forest"
+
+
+def source_signature(pkl_path: str) -> Optional[Dict]:
+    """Identity of the pickle a compiled forest was built from (size and mtime)."""
+    try:
+        st = os.stat(pkl_path)
+    except FileNotFoundError:
+        return None
+    return {"file": os.path.basename(pkl_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def load_forest(pkl_path: str):
+    """
+    Model for `pkl_path`: the memory-mapped compiled forest if it is up to date
+    (or the pickle is gone), else the pickle compiled and saved for next time.
+    Pickles that are not forest classifiers are returned as loaded.
+    """
+    compiled_path = compiled_path_for(pkl_path)
+    signature = source_signature(pkl_path)
+    if os.path.isdir(compiled_path):
+        try:
+            forest = CompiledForest.load(compiled_path)
+            if signature is None or forest.meta.get("source") == signature:
+                forest.source_path = pkl_path if signature else None
+                return forest
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  Ignoring compiled forest at {compiled_path}: {e}")
+
+    with open(pkl_path, "rb") as f:
+        model = pickle.load(f)
+    try:
+        forest = compile_forest(model, source=signature)
+    except TypeError:
+        return model
+    # Not kept in memory: reloaded only if a large batch needs it
+    forest.source_path = pkl_path
+    try:
+        forest.save(compiled_path)
+        print(f"📦 Compiled {os.path.basename(pkl_path)} to {compiled_path} ({forest.meta['n_nodes']} nodes)")
+    except OSError as e:
+        # Read-only model directory: use the in-memory copy, compile again next start
+        print(f"⚠️  Could not save compiled forest to {compiled_path}: {e}")
+    return forest
+
+
+def _check_rows(forest: CompiledForest, count: int, seed: int = 0) -> np.ndarray:
+    """Random rows spread over each feature's split range, with some values exactly on a threshold."""
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((count, forest.n_features_in_))
+    is_split = np.asarray(forest.children[0::2]) != np.arange(len(forest.threshold))
+    for j in range(forest.n_features_in_):
+        splits = np.asarray(forest.threshold[is_split & (forest.feature == j)])
+        if len(splits):
+            X[:, j] = rng.uniform(splits.min() - 1, splits.max() + 1, count)
+            on_split = rng.random(count) < 0.1
+            X[on_split, j] = rng.choice(splits, on_split.sum())
+    return X
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a pickled sklearn forest into memory-mappable arrays")
+    parser.add_argument("model", help="Pickled RandomForestClassifier / ExtraTreesClassifier")
+    parser.add_argument("--output", help="Output directory (default: <model>.forest next to the pickle)")
+    parser.add_argument("--check", type=int, default=2000, help="Rows to compare against sklearn (0 = skip)")
+    args = parser.parse_args()
+
+    output = args.output or compiled_path_for(args.model)
+    with open(args.model, "rb") as f:
+        model = pickle.load(f)
+    try:
+        forest = compile_forest(model, source=source_signature(args.model))
+    except TypeError as e:
+        parser.error(str(e))
+    forest.save(output)
+    print(f"📦 {forest.meta['n_trees']} trees, {forest.meta['n_nodes']} nodes, depth {forest.max_depth} -> {output}")
+
+    start = time.perf_counter()
+    loaded = CompiledForest.load(output)
+    print(f"   load: {(time.perf_counter() - start) * 1000:.2f} ms (memory-mapped)")
+    if not args.check:
+        return
+
+    X = _check_rows(loaded, args.check)
+    # The array walk itself, at every batch size (predict_proba would hand large batches to sklearn)
+    compiled = loaded.compiled_proba(X.astype(np.float32))
+    mismatches = int((loaded.classes_.take(np.argmax(compiled, axis=1)) != model.predict(X)).sum())
+    proba_equal = np.array_equal(compiled, model.predict_proba(X))
+    print(f"   check on {args.check} rows: {mismatches} label mismatches, probabilities identical: {proba_equal}")
+
+    loaded.source_path = args.model
+    for label, rows in (("single row", X[:1]), (f"batch of {len(X)}", X)):
+        timings = {}
+        for name, fn in (("sklearn", model.predict_proba), ("compiled", loaded.predict_proba)):
+            fn(rows)
+            start = time.perf_counter()
+            for _ in range(20):
+                fn(rows)
+            timings[name] = (time.perf_counter() - start) / 20 * 1000
+        if len(rows) >= SKLEARN_MIN_ROWS:
+            label += f" (>= {SKLEARN_MIN_ROWS} rows: sklearn path)"
+        print(f"   {label}: sklearn {timings['sklearn']:.3f} ms, compiled {timings['compiled']:.3f} ms "
+              f"({timings['sklearn'] / timings['compiled']:.1f}x)")
+    if mismatches or not proba_equal:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Config Service
+Serves a JSON config file from memory. Readers get the current snapshot
+without touching disk; the file is re-read only when its mtime/size changes
+(checked at most once per `check_interval_seconds`). Writes merge changes
+under a lock and replace the file atomically (temp file + rename), then notify
+subscribers with the new snapshot.
+"""
+
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+Changes = Union[Dict, Callable[[Dict], Dict]]
+
+
+class ConfigService:
+    def __init__(self, path: str, defaults: Optional[Dict] = None, check_interval_seconds: float = 1.0):
+        self.path = path
+        self.defaults = defaults or {}
+        self.check_interval_seconds = check_interval_seconds
+        self._lock = threading.RLock()
+        self._subscribers: List[Callable[[Dict], None]] = []
+        self._file_data: Dict = {}
+        self._snapshot: Dict = dict(self.defaults)
+        self._signature: Optional[Tuple[int, int]] = None
+        self._last_check = 0.0
+        self.reloads = 0
+        self._reload()
+
+    def _stat_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _reload(self) -> bool:
+        """Re-read the file if it changed. Returns True if the snapshot was replaced."""
+        signature = self._stat_signature()
+        self._last_check = time.monotonic()
+        if signature == self._signature:
+            return False
+        data = {}
+        if signature is not None:
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                # Keep serving the last good snapshot (e.g. a hand edit in progress)
+                print(f"Error loading config {os.path.basename(self.path)}: {e}")
+                self._signature = signature
+                return False
+        self._signature = signature
+        self._file_data = data
+        self._snapshot = {**self.defaults, **data}
+        self.reloads += 1
+        return True
+
+    def snapshot(self) -> Dict:
+        """
+        Current config (defaults overlaid with the file). Shared between readers:
+        treat it as read-only, or use `copy()` for a private mutable one.
+        """
+        if time.monotonic() - self._last_check >= self.check_interval_seconds:
+            with self._lock:
+                if time.monotonic() - self._last_check >= self.check_interval_seconds and self._reload():
+                    self._notify()
+        return self._snapshot
+
+    def copy(self) -> Dict:
+        return copy.deepcopy(self.snapshot())
+
+    def get(self, key: str, default=None):
+        return self.snapshot().get(key, default)
+
+    def update(self, changes: Changes) -> Dict:
+        """
+        Merge `changes` into the file atomically and return the new snapshot.
+        `changes` may be a dict or a function receiving a private copy of the current
+        config and returning the dict to merge (for read-modify-write, e.g. appending).
+        """
+        with self._lock:
+            self._reload()
+            if callable(changes):
+                changes = changes(copy.deepcopy(self._snapshot))
+            data = {**self._file_data, **changes}
+            self._write_atomic(data)
+            self._signature = self._stat_signature()
+            self._file_data = data
+            self._snapshot = {**self.defaults, **data}
+            self._notify()
+            return self._snapshot
+
+    def _write_atomic(self, data: Dict):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(self.path):
+                os.chmod(tmp_path, os.stat(self.path).st_mode & 0o777)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def subscribe(self, callback: Callable[[Dict], None]):
+        """Call `callback(snapshot)` whenever the config changes (write or file reload)."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def _notify(self):
+        snapshot = self._snapshot
+        for callback in list(self._subscribers):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"Error in config subscriber: {e}")
@@ -1,28 +1,34 @@
-import re
 import os
 import sys
 import pickle
+
+from compiled_forest import compiled_path_for, load_forest
+from keyword_engine import detect_distress_keywords
+from model_manager import ModelManager
+from pipeline_config import pipeline_config
+
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "../models/emotion_model.pkl")
 
-if os.path.exists(MODEL_PATH):
+
+def _load_emotion_model():
+    if not os.path.exists(MODEL_PATH) and not os.path.isdir(compiled_path_for(MODEL_PATH)):
+        return None
+    if pipeline_config.get("sklearn_compiled_forest", True):
+        return load_forest(MODEL_PATH)
     with open(MODEL_PATH, "rb") as f:
-        emotion_model = pickle.load(f)
-else:
-    emotion_model = None
-def detect_keywords(transcript: str):
-    distress_words = ["help", "fire", "stop", "danger", "emergency", "hurt", "attack"]
-    transcript = transcript.lower()
+        return pickle.load(f)
 
-    for word in distress_words:
-        if re.search(rf"\b{word}\b", transcript):
-            return {
-                "distress_detected": True,
-                "confidence": 0.9,
-                "reason": f"keyword: '{word}'"
-            }
 
-    return {"distress_detected": False, "confidence": 0.2, "reason": "no keyword"}
+# Loaded lazily so importing this module does not pay for sklearn + unpickling
+model_manager = ModelManager()
+model_manager.register("emotion_model", _load_emotion_model, required=False)
+def detect_keywords(transcript: str):
+    result = detect_distress_keywords(transcript)
+    result["confidence"] = 0.9 if result["distress_detected"] else 0.2
+    return result
 def detect_emotion(transcript: str, volume=None, pitch=None):
+    # Don't block text analysis while the model is still loading in the background
+    emotion_model = model_manager.get("emotion_model", wait=False)
     if emotion_model:
         try:
             prediction = emotion_model.predict([transcript])[0]
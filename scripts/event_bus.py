@@ -0,0 +1,120 @@
+"""
+Alert Event Bus
+In-process publish/subscribe for alert lifecycle events, served to browsers as
+Server-Sent Events. Every subscriber has its own bounded queue; a subscriber
+that falls behind is disconnected instead of blocking publishers, and resumes
+from its Last-Event-ID out of a ring buffer of recent events.
+
+The bus lives in one process: with several workers, subscribers only get the
+events published by the worker they are connected to (the alert store itself
+is shared).
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# Sentinel put on a subscriber queue to end its stream
+CLOSED = object()
+
+
+class Subscription:
+    """One connected client: replayed backlog plus a bounded queue of live events."""
+
+    def __init__(self, replay: List[Dict], max_queue_size: int):
+        self.replay = replay
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self.overflowed = False
+
+    def get(self, timeout: float):
+        """Next event, CLOSED when the stream should end, or None on timeout (send a heartbeat)."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBus:
+    def __init__(self, history_size: int = 1000, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._history: deque = deque(maxlen=history_size)
+        self._last_id = 0
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._published = 0
+        self._dropped_subscribers = 0
+
+    def publish(self, event_type: str, data: Dict) -> Dict:
+        with self._lock:
+            self._last_id += 1
+            event = {"id": self._last_id, "type": event_type, "data": data, "time": time.time()}
+            self._history.append(event)
+            self._published += 1
+            for sub in list(self._subscribers):
+                try:
+                    sub.queue.put_nowait(event)
+                except queue.Full:
+                    # Too slow: disconnect it; the client reconnects and replays from history
+                    sub.overflowed = True
+                    self._subscribers.remove(sub)
+                    self._dropped_subscribers += 1
+                    self._close(sub)
+        return event
+
+    @staticmethod
+    def _close(sub: Subscription):
+        while True:
+            try:
+                sub.queue.put_nowait(CLOSED)
+                return
+            except queue.Full:
+                try:
+                    sub.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Register a subscriber. With `last_event_id`, events published after it are
+        replayed first; if some of them have already left the ring buffer the replay
+        starts with a "resync" event telling the client to reload its state.
+        """
+        with self._lock:
+            replay = []
+            if last_event_id is not None:
+                missed = [e for e in self._history if e["id"] > last_event_id]
+                oldest = self._history[0]["id"] if self._history else self._last_id + 1
+                # Gap in the buffer, or an id from before a server restart
+                if last_event_id + 1 < oldest or last_event_id > self._last_id:
+                    replay.append({"id": None, "type": "resync", "data": {}, "time": time.time()})
+                replay.extend(missed)
+            sub = Subscription(replay, self.max_queue_size)
+            self._subscribers.append(sub)
+            return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self._published,
+                "buffered": len(self._history),
+                "dropped_subscribers": self._dropped_subscribers,
+                "max_queue_depth": max((s.queue.qsize() for s in self._subscribers), default=0),
+            }
+
+
+def format_sse(event: Dict) -> str:
+    """Encode an event in text/event-stream framing."""
+    lines = []
+    if event.get("id") is not None:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"data: {json.dumps({'type': event['type'], **event['data']})}")
+    return "\n".join(lines) + "\n\n"
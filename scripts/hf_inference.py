@@ -0,0 +1,104 @@
+"""
+wav2vec2 Inference Modes
+Wraps the HuggingFace emotion model in a runner selected by config:
+  - "fp32": eager PyTorch, full precision (reference)
+  - "int8": dynamic int8 quantization of the Linear layers (PyTorch, CPU)
+  - "onnx": exported graph executed by ONNX Runtime (requires `onnxruntime`)
+Every runner takes the feature extractor output and returns logits as a torch tensor.
+"""
+
+import os
+from typing import Dict
+
+import torch
+
+try:
+    import onnxruntime
+    HAS_ONNXRUNTIME = True
+except ImportError:
+    HAS_ONNXRUNTIME = False
+
+INFERENCE_MODES = ("fp32", "int8", "onnx")
+
+
+class EagerRunner:
+    """Runs a (possibly quantized) PyTorch module."""
+
+    def __init__(self, model, mode: str):
+        self.model = model
+        self.mode = mode
+
+    def __call__(self, inputs: Dict) -> torch.Tensor:
+        with torch.no_grad():
+            return self.model(**inputs).logits
+
+
+class OnnxRunner:
+    """Runs the exported graph with ONNX Runtime on CPU."""
+
+    mode = "onnx"
+
+    def __init__(self, onnx_path: str):
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def __call__(self, inputs: Dict) -> torch.Tensor:
+        feed = {name: inputs[name].numpy() for name in self.input_names}
+        if "attention_mask" in feed:
+            feed["attention_mask"] = feed["attention_mask"].astype("int64")
+        logits = self.session.run(["logits"], feed)[0]
+        return torch.from_numpy(logits)
+
+
+class _LogitsOnly(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_values, attention_mask):
+        return self.model(input_values=input_values, attention_mask=attention_mask).logits
+
+
+def export_onnx(hf_model, onnx_path: str, sample_rate: int = 16000):
+    """Export the model with dynamic batch and length axes."""
+    example = torch.zeros(1, sample_rate, dtype=torch.float32)
+    mask = torch.ones(1, sample_rate, dtype=torch.int64)
+    os.makedirs(os.path.dirname(os.path.abspath(onnx_path)), exist_ok=True)
+    tmp_path = onnx_path + ".tmp"
+    torch.onnx.export(
+        _LogitsOnly(hf_model).eval(),
+        (example, mask),
+        tmp_path,
+        input_names=["input_values", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_values": {0: "batch", 1: "samples"},
+            "attention_mask": {0: "batch", 1: "samples"},
+            "logits": {0: "batch"},
+        },
+        opset_version=17,
+        dynamo=False,
+    )
+    os.replace(tmp_path, onnx_path)
+
+
+def create_runner(hf_model, mode: str = "fp32", onnx_path: str = ""):
+    """
+    Build the runner for `mode`. The model must already be in eval mode.
+    The ONNX graph is exported to `onnx_path` on first use and reused afterwards.
+    """
+    if mode == "fp32":
+        return EagerRunner(hf_model, mode)
+    if mode == "int8":
+        quantized = torch.ao.quantization.quantize_dynamic(hf_model, {torch.nn.Linear}, dtype=torch.qint8)
+        return EagerRunner(quantized, mode)
+    if mode == "onnx":
+        if not HAS_ONNXRUNTIME:
+            raise RuntimeError("onnxruntime is not installed (pip install onnxruntime)")
+        if not os.path.exists(onnx_path):
+            print(f"📦 Exporting wav2vec2 to ONNX at {onnx_path} (one-time)...")
+            export_onnx(hf_model, onnx_path)
+        return OnnxRunner(onnx_path)
+    raise ValueError(f"Unknown wav2vec2 inference mode '{mode}'. Use one of: {', '.join(INFERENCE_MODES)}")
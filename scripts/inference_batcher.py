@@ -0,0 +1,150 @@
+"""
+Dynamic Micro-Batching for model inference
+Queues requests from concurrent callers and runs them through the model in
+batches, flushing when the batch is full or the oldest request has waited
+max_wait_ms. Each caller gets its own result back through a Future.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+import metrics
+
+BATCH_SIZE = metrics.histogram(
+    "inference_batch_size", "Items per model batch", ["batcher"], buckets=(1, 2, 4, 8, 16, 32, 64))
+BATCH_SECONDS = metrics.histogram("inference_batch_duration_seconds", "Model time per batch", ["batcher"])
+QUEUE_WAIT_SECONDS = metrics.histogram(
+    "inference_queue_wait_seconds", "Time items wait in the batch queue", ["batcher"])
+
+
+class _Request:
+    __slots__ = ("payload", "future", "enqueued_at")
+
+    def __init__(self, payload: Any):
+        self.payload = payload
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class InferenceBatcher:
+    """
+    Batches payloads for `run_batch`, which takes a list of payloads and must
+    return a list of results in the same order.
+    """
+
+    def __init__(self, run_batch: Callable[[List[Any]], List[Any]], max_batch_size: int = 8,
+                 max_wait_ms: float = 20, max_queue_size: int = 256, name: str = "batcher"):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self._queue: "queue.Queue[_Request]" = queue.Queue(maxsize=max_queue_size)
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._errors = 0
+        self._batch_size_counts: Dict[int, int] = {}
+        self._queue_waits = deque(maxlen=1000)
+        self._batch_seconds = deque(maxlen=1000)
+        self._thread = threading.Thread(target=self._worker, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, payload: Any) -> Future:
+        """Queue one payload. Raises queue.Full if the queue is at capacity."""
+        request = _Request(payload)
+        self._queue.put_nowait(request)
+        return request.future
+
+    def predict(self, payload: Any, timeout: Optional[float] = None) -> Any:
+        """Queue one payload and block until its result is ready."""
+        return self.submit(payload).result(timeout=timeout)
+
+    def _collect(self) -> List[_Request]:
+        first = self._queue.get()
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                # Still take whatever is already queued without waiting
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            waits = [started - r.enqueued_at for r in batch]
+            try:
+                results = self.run_batch([r.payload for r in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"run_batch returned {len(results)} results for {len(batch)} inputs")
+                for request, result in zip(batch, results):
+                    request.future.set_result(result)
+                failed = False
+            except Exception as e:
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                failed = True
+
+            elapsed = time.perf_counter() - started
+            BATCH_SIZE.observe(len(batch), batcher=self.name)
+            BATCH_SECONDS.observe(elapsed, batcher=self.name)
+            for wait in waits:
+                QUEUE_WAIT_SECONDS.observe(wait, batcher=self.name)
+            with self._stats_lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._errors += 1 if failed else 0
+                self._batch_size_counts[len(batch)] = self._batch_size_counts.get(len(batch), 0) + 1
+                self._queue_waits.extend(waits)
+                self._batch_seconds.append(elapsed)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict:
+        """Batch occupancy and queue wait metrics."""
+        with self._stats_lock:
+            waits = sorted(self._queue_waits)
+            batch_seconds = list(self._batch_seconds)
+            batches = self._batches
+            items = self._items
+            sizes = dict(sorted(self._batch_size_counts.items()))
+            errors = self._errors
+
+        def percentile(values, q):
+            if not values:
+                return None
+            return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 3)
+
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self.queue_depth(),
+            "batches": batches,
+            "items": items,
+            "errors": errors,
+            "mean_batch_size": round(items / batches, 3) if batches else None,
+            "mean_occupancy": round(items / (batches * self.max_batch_size), 3) if batches else None,
+            "batch_size_counts": sizes,
+            "queue_wait_ms": {
+                "p50": percentile(waits, 0.50),
+                "p95": percentile(waits, 0.95),
+                "max": round(waits[-1] * 1000, 3) if waits else None,
+            },
+            "mean_batch_ms": round(sum(batch_seconds) / len(batch_seconds) * 1000, 3) if batch_seconds else None,
+        }
@@ -1,16 +1,14 @@
 import speech_recognition as sr
 
-DISTRESS_KEYWORDS = ["help", "stuck", "save me", "please help", "emergency"]
-NEUTRAL_KEYWORDS = ["hello", "how are you", "good morning"]
-POSITIVE_KEYWORDS = ["thank you", "great", "awesome", "nice"]
+from keyword_engine import TEXT, get_keyword_engine
 
 def detect_emotion_from_text(text: str):
-    text_lower = text.lower()
-    if any(word in text_lower for word in DISTRESS_KEYWORDS):
+    categories = {m.category for m in get_keyword_engine(TEXT).scan(text)}
+    if "distress" in categories:
         return "distress"
-    elif any(word in text_lower for word in POSITIVE_KEYWORDS):
+    elif "positive" in categories:
         return "positive"
-    elif any(word in text_lower for word in NEUTRAL_KEYWORDS):
+    elif "neutral" in categories:
         return "neutral"
     else:
         return "neutral"
@@ -0,0 +1,118 @@
+"""
+Keyword Engine
+One compiled multi-pattern matcher for every keyword detector in the project.
+Keywords (single words or phrases) come from keyword_config.json, the only
+keyword list, with a category, a weight and the detectors that use them. Each
+detector keeps its own keyword set (the alerting pipeline does not treat the
+text classifier's "stuck" or "save me" as distress), and a transcript is
+scanned in a single pass with one alternation regex on word boundaries.
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+KEYWORD_CONFIG_FILE = os.path.join(os.path.dirname(__file__), "keyword_config.json")
+
+# Detectors with their own keyword set; an entry lists the detectors it belongs to
+# ("detectors", default: all of them)
+PIPELINE = "pipeline"   # combined_pipeline and detect_distress (distress alerts)
+TEXT = "text"           # keyword_detection.detect_emotion_from_text (distress/positive/neutral)
+DETECTORS = (PIPELINE, TEXT)
+
+
+class KeywordMatch(NamedTuple):
+    keyword: str
+    category: str
+    weight: float
+    start: int
+    end: int
+
+    def to_dict(self) -> Dict:
+        return self._asdict()
+
+
+def _normalize(phrase: str) -> str:
+    return " ".join(phrase.lower().split())
+
+
+class KeywordEngine:
+    """Single-pass matcher over a fixed keyword set."""
+
+    def __init__(self, keywords: List[Dict]):
+        self._entries: Dict[str, Dict] = {}
+        for entry in keywords:
+            phrase = _normalize(entry["phrase"])
+            if phrase:
+                self._entries[phrase] = {
+                    "category": entry.get("category", "distress"),
+                    "weight": float(entry.get("weight", 1.0)),
+                }
+
+        # Longest phrases first so "please help" wins over "help" at the same position;
+        # any run of whitespace inside a phrase matches.
+        alternatives = [
+            r"\s+".join(re.escape(word) for word in phrase.split())
+            for phrase in sorted(self._entries, key=len, reverse=True)
+        ]
+        self._pattern = re.compile(r"\b(?:" + "|".join(alternatives) + r")\b", re.IGNORECASE) if alternatives else None
+
+    def scan(self, text: str) -> List[KeywordMatch]:
+        """All non-overlapping keyword matches in `text`, in order of position."""
+        if not text or self._pattern is None:
+            return []
+        matches = []
+        for m in self._pattern.finditer(text):
+            keyword = _normalize(m.group(0))
+            entry = self._entries[keyword]
+            matches.append(KeywordMatch(keyword, entry["category"], entry["weight"], m.start(), m.end()))
+        return matches
+
+    def categories(self) -> List[str]:
+        return sorted({entry["category"] for entry in self._entries.values()})
+
+
+def load_keyword_config(detector: Optional[str] = None) -> List[Dict]:
+    """
+    Keyword entries from keyword_config.json, only those of `detector` if given.
+    A missing or unreadable file raises: there is no fallback keyword list.
+    """
+    with open(KEYWORD_CONFIG_FILE, "r") as f:
+        keywords = json.load(f)["keywords"]
+    if detector is None:
+        return keywords
+    return [entry for entry in keywords if detector in entry.get("detectors", DETECTORS)]
+
+
+_engines: Dict[str, KeywordEngine] = {}
+_engine_lock = threading.Lock()
+
+
+def get_keyword_engine(detector: str = PIPELINE) -> KeywordEngine:
+    """Shared engine for `detector`, compiled once from config on first use."""
+    engine = _engines.get(detector)
+    if engine is None:
+        if detector not in DETECTORS:
+            raise ValueError(f"Unknown keyword detector {detector!r}; expected one of {DETECTORS}")
+        with _engine_lock:
+            engine = _engines.get(detector)
+            if engine is None:
+                engine = _engines[detector] = KeywordEngine(load_keyword_config(detector))
+    return engine
+
+
+def detect_distress_keywords(transcript: str, detector: str = PIPELINE) -> Dict:
+    """
+    Distress keyword check of one detector (the alerting pipeline by default).
+    Returns {"distress_detected", "reason", "score", "matches"}.
+    """
+    matches = get_keyword_engine(detector).scan(transcript)
+    distress = [m for m in matches if m.category == "distress"]
+    return {
+        "distress_detected": bool(distress),
+        "reason": f"keyword: '{distress[0].keyword}'" if distress else "no keyword",
+        "score": round(sum(m.weight for m in distress), 3),
+        "matches": [m.to_dict() for m in matches],
+    }
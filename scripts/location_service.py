@@ -0,0 +1,215 @@
+"""
+Location Service
+Keeps the device location in a TTL cache so the emergency path reads it
+instantly. IP geolocation providers are queried concurrently and the first
+good answer wins; refreshes run in the background. A location reported by the
+client (browser geolocation) is preferred while it is fresh.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+try:
+    import requests
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+
+def unknown_location(address: str) -> Dict[str, str]:
+    return {"latitude": "Unknown", "longitude": "Unknown", "address": address}
+
+
+class LocationProvider(NamedTuple):
+    name: str
+    url: str
+    parse: Callable[[Dict], Dict[str, str]]
+
+
+def _parse_ip_api(data: Dict) -> Dict[str, str]:
+    if data.get("status") == "fail":
+        raise ValueError(data.get("message", "lookup failed"))
+    return {
+        "latitude": str(data.get("lat", "Unknown")),
+        "longitude": str(data.get("lon", "Unknown")),
+        "address": f"{data.get('city', '')}, {data.get('regionName', '')}, {data.get('country', '')}"
+    }
+
+
+def _parse_ipapi_co(data: Dict) -> Dict[str, str]:
+    if data.get("error"):
+        raise ValueError(data.get("reason", "lookup failed"))
+    return {
+        "latitude": str(data.get("latitude", "Unknown")),
+        "longitude": str(data.get("longitude", "Unknown")),
+        "address": f"{data.get('city', '')}, {data.get('region', '')}, {data.get('country_name', '')}"
+    }
+
+
+def _parse_ipinfo(data: Dict) -> Dict[str, str]:
+    loc = data.get("loc", "").split(",")
+    if len(loc) != 2:
+        raise ValueError("no coordinates")
+    return {
+        "latitude": loc[0],
+        "longitude": loc[1],
+        "address": data.get("city", "") + ", " + data.get("region", "") + ", " + data.get("country", "")
+    }
+
+
+DEFAULT_PROVIDERS = [
+    LocationProvider("ip-api.com", "http://ip-api.com/json/", _parse_ip_api),
+    LocationProvider("ipapi.co", "https://ipapi.co/json/", _parse_ipapi_co),
+    LocationProvider("ipinfo.io", "http://ipinfo.io/json", _parse_ipinfo),
+]
+
+
+class LocationService:
+    def __init__(self, providers: Optional[List[LocationProvider]] = None, ttl_seconds: float = 600,
+                 client_ttl_seconds: float = 300, timeout_seconds: float = 3.0):
+        self.providers = providers or DEFAULT_PROVIDERS
+        self.ttl_seconds = ttl_seconds
+        self.client_ttl_seconds = client_ttl_seconds
+        self.timeout_seconds = timeout_seconds
+        self._pool = ThreadPoolExecutor(max_workers=len(self.providers), thread_name_prefix="geo")
+        self._lock = threading.Lock()
+        self._ip_location: Optional[Dict] = None
+        self._ip_fetched = 0.0
+        self._client_location: Optional[Dict] = None
+        self._client_updated = 0.0
+        self._refreshing: Optional[threading.Event] = None
+        self._background: Optional[threading.Thread] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_refresh_ms: Optional[float] = None
+
+    def _query(self, provider: LocationProvider) -> Dict[str, str]:
+        response = requests.get(provider.url, timeout=self.timeout_seconds)
+        response.raise_for_status()
+        return {**provider.parse(response.json()), "source": provider.name}
+
+    def lookup(self) -> Optional[Dict[str, str]]:
+        """Query every provider at once; return the first good answer (None if all fail)."""
+        if not HAS_REQUESTS:
+            return None
+        pending = {self._pool.submit(self._query, p) for p in self.providers}
+        deadline = time.monotonic() + self.timeout_seconds + 0.5
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+        return None
+
+    def refresh(self) -> Optional[Dict[str, str]]:
+        """Refresh the IP location now; concurrent callers share one lookup."""
+        with self._lock:
+            running = self._refreshing
+            if running is None:
+                self._refreshing = threading.Event()
+        if running is not None:
+            running.wait(self.timeout_seconds + 1)
+            with self._lock:
+                return self._ip_location
+
+        start = time.perf_counter()
+        try:
+            location = self.lookup()
+        finally:
+            with self._lock:
+                self.refreshes += 1
+                self.last_refresh_ms = round((time.perf_counter() - start) * 1000, 1)
+                event, self._refreshing = self._refreshing, None
+        with self._lock:
+            if location is not None:
+                self._ip_location = location
+                self._ip_fetched = time.time()
+            else:
+                self.failures += 1
+        event.set()
+        return location
+
+    def refresh_async(self):
+        """Start a background refresh unless one is already running."""
+        with self._lock:
+            if self._refreshing is not None:
+                return
+        threading.Thread(target=self.refresh, name="geo-refresh", daemon=True).start()
+
+    def set_client_location(self, latitude: float, longitude: float, accuracy: Optional[float] = None,
+                            address: Optional[str] = None) -> Dict[str, str]:
+        """Store a location reported by the client (e.g. browser geolocation)."""
+        if accuracy is not None:
+            default_address = f"Device location (±{accuracy:.0f} m)"
+        else:
+            default_address = "Device location"
+        location = {
+            "latitude": f"{latitude:.6f}",
+            "longitude": f"{longitude:.6f}",
+            "address": address or default_address,
+            "source": "client",
+        }
+        with self._lock:
+            self._client_location = location
+            self._client_updated = time.time()
+        return location
+
+    def get(self, max_wait: float = 0.0) -> Dict[str, str]:
+        """
+        Best known location without blocking: a fresh client location, else the
+        cached IP location (a stale one triggers a background refresh). Only when
+        nothing is cached does it wait up to `max_wait` seconds for a lookup.
+        """
+        now = time.time()
+        with self._lock:
+            client, client_age = self._client_location, now - self._client_updated
+            cached, cached_age = self._ip_location, now - self._ip_fetched
+        if client is not None and client_age <= self.client_ttl_seconds:
+            return {**client, "age_seconds": round(client_age, 1)}
+        if cached is not None:
+            if cached_age > self.ttl_seconds:
+                self.refresh_async()
+            return {**cached, "age_seconds": round(cached_age, 1)}
+        if max_wait > 0:
+            result = {}
+            worker = threading.Thread(target=lambda: result.update(self.refresh() or {}), daemon=True)
+            worker.start()
+            worker.join(max_wait)
+            if result:
+                return {**result, "age_seconds": 0.0}
+        else:
+            self.refresh_async()
+        if client is not None:
+            return {**client, "age_seconds": round(client_age, 1)}
+        if not HAS_REQUESTS:
+            return unknown_location("Location service unavailable")
+        return unknown_location("Location unavailable (network error)")
+
+    def start_background(self):
+        """Keep the IP location warm: refresh now and again before the TTL expires."""
+        if self._background is not None:
+            return
+
+        def loop():
+            while True:
+                ok = self.refresh() is not None
+                # Retry sooner after a failed lookup
+                time.sleep(max(30.0, self.ttl_seconds * 0.8) if ok else 60.0)
+
+        self._background = threading.Thread(target=loop, name="geo-background", daemon=True)
+        self._background.start()
+
+    def stats(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            return {
+                "ip_location_age_seconds": round(now - self._ip_fetched, 1) if self._ip_location else None,
+                "client_location_age_seconds": round(now - self._client_updated, 1) if self._client_location else None,
+                "refreshes": self.refreshes,
+                "failures": self.failures,
+                "last_refresh_ms": self.last_refresh_ms,
+            }
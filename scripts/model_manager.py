@@ -0,0 +1,175 @@
+"""
+Model Lifecycle Manager
+Loads the emotion models lazily or on a background thread so the API can
+serve requests before the heavy model stack is in memory.
+Tracks per-model load state and timings for the readiness endpoint.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import metrics
+
+# Model load states
+STATE_PENDING = "pending"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_MISSING = "missing"  # loader returned None (e.g. optional model file absent)
+STATE_FAILED = "failed"
+
+_DONE_STATES = (STATE_READY, STATE_MISSING, STATE_FAILED)
+
+MODEL_LOAD_SECONDS = metrics.gauge("model_load_duration_seconds", "Time taken to load each model", ["model"])
+MODEL_LOADS = metrics.counter("model_loads_total", "Model load attempts by resulting state", ["model", "state"])
+
+
+class _ModelSlot:
+    """Holds one registered model and its load bookkeeping."""
+
+    def __init__(self, name: str, loader: Callable[[], Any], required: bool):
+        self.name = name
+        self.loader = loader
+        self.required = required
+        self.state = STATE_PENDING
+        self.model = None
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.loaded_at: Optional[float] = None
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+
+
+class ModelManager:
+    """
+    Registry of lazily loaded models.
+
+    Models are loaded either on first use (`get`) or all at once by
+    `start_background`, which also runs an optional warmup inference
+    once every model has finished loading.
+    """
+
+    def __init__(self):
+        self._slots: Dict[str, _ModelSlot] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._warmup: Optional[Callable[[], Any]] = None
+        self.warmup_state = STATE_PENDING
+        self.warmup_seconds: Optional[float] = None
+        self.warmup_error: Optional[str] = None
+        self.started_at = time.time()
+
+    def register(self, name: str, loader: Callable[[], Any], required: bool = True):
+        """Register a model loader. The loader may return None to mark the model missing."""
+        self._slots[name] = _ModelSlot(name, loader, required)
+
+    def set_warmup(self, warmup: Callable[[], Any]):
+        """Set a function to run once after all models have loaded."""
+        self._warmup = warmup
+
+    def _load(self, slot: _ModelSlot):
+        with slot.lock:
+            if slot.state in _DONE_STATES:
+                return
+            slot.state = STATE_LOADING
+            start = time.perf_counter()
+            try:
+                model = slot.loader()
+                slot.model = model
+                slot.state = STATE_READY if model is not None else STATE_MISSING
+            except Exception as e:
+                slot.error = str(e)
+                slot.state = STATE_FAILED
+                print(f"⚠️  Could not load model '{slot.name}': {e}")
+            finally:
+                slot.load_seconds = time.perf_counter() - start
+                slot.loaded_at = time.time()
+                slot.done.set()
+                MODEL_LOAD_SECONDS.set(slot.load_seconds, model=slot.name)
+                MODEL_LOADS.inc(model=slot.name, state=slot.state)
+
+        if slot.state == STATE_READY:
+            print(f"✅ Model '{slot.name}' loaded in {slot.load_seconds:.2f}s")
+
+    def get(self, name: str, wait: bool = True, timeout: Optional[float] = None):
+        """
+        Return a loaded model, or None if it is missing, failed or not yet loaded.
+
+        If no background load is running the model is loaded on the calling
+        thread. If a background load is in progress, waits up to `timeout`
+        seconds for it when `wait` is True.
+        """
+        slot = self._slots[name]
+        if slot.state not in _DONE_STATES:
+            if not self.is_loading():
+                self._load(slot)
+            elif wait:
+                slot.done.wait(timeout)
+        return slot.model if slot.state == STATE_READY else None
+
+    def is_loading(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start_background(self):
+        """Load every registered model on a daemon thread, then run the warmup."""
+        if self._thread is not None:
+            return self._thread
+
+        def run():
+            for slot in list(self._slots.values()):
+                self._load(slot)
+            self._run_warmup()
+
+        self._thread = threading.Thread(target=run, name="model-loader", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _run_warmup(self):
+        if self._warmup is None:
+            self.warmup_state = STATE_MISSING
+            return
+        self.warmup_state = STATE_LOADING
+        start = time.perf_counter()
+        try:
+            self._warmup()
+            self.warmup_state = STATE_READY
+            print(f"🔥 Warmup inference finished in {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            self.warmup_error = str(e)
+            self.warmup_state = STATE_FAILED
+            print(f"⚠️  Warmup inference failed: {e}")
+        finally:
+            self.warmup_seconds = time.perf_counter() - start
+
+    def is_ready(self) -> bool:
+        """True once every required model is loaded and the warmup has finished."""
+        for slot in self._slots.values():
+            if slot.state not in _DONE_STATES:
+                return False
+            if slot.required and slot.state != STATE_READY:
+                return False
+        return self.warmup_state in _DONE_STATES
+
+    def versions(self) -> Dict[str, str]:
+        """Identity of each model as currently served (state and load time); changes when a model (re)loads."""
+        return {name: f"{slot.state}@{slot.loaded_at}" for name, slot in self._slots.items()}
+
+    def status(self) -> Dict:
+        """Per-model load state and timings."""
+        models = {}
+        for name, slot in self._slots.items():
+            models[name] = {
+                "state": slot.state,
+                "required": slot.required,
+                "load_seconds": round(slot.load_seconds, 3) if slot.load_seconds is not None else None,
+                "error": slot.error,
+            }
+        return {
+            "ready": self.is_ready(),
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "models": models,
+            "warmup": {
+                "state": self.warmup_state,
+                "seconds": round(self.warmup_seconds, 3) if self.warmup_seconds is not None else None,
+                "error": self.warmup_error,
+            },
+        }
@@ -0,0 +1,273 @@
+"""
+Notification Dispatcher
+Sends one emergency email to many recipients over a pool of warm, already
+authenticated SMTP connections. The MIME message is built once; each recipient
+gets the shared body with its own To header, sent concurrently with
+per-recipient retry and exponential backoff. Every delivery is reported with
+its attempts and latency.
+
+STARTTLS and login are used only when the server offers STARTTLS and
+credentials are configured, so a plain local stand-in (scripts/smtp_sink.py)
+works for testing.
+"""
+
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Dict, List, NamedTuple, Optional
+
+import metrics
+
+# Errors worth retrying on a fresh connection
+TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError, OSError)
+
+
+DELIVERIES = metrics.counter("notification_deliveries_total", "Emergency emails by result", ["result"])
+DELIVERY_SECONDS = metrics.histogram(
+    "notification_delivery_duration_seconds", "Time from dispatch to accepted or failed delivery", ["result"])
+RETRIES = metrics.counter("notification_retries_total", "Delivery attempts retried after a transient error")
+SMTP_CONNECTS = metrics.counter("smtp_connections_opened_total", "SMTP sessions opened (handshake + login)")
+
+
+class SmtpSettings(NamedTuple):
+    host: str
+    port: int
+    username: str
+    password: str
+    sender: str
+    use_tls: bool = True
+    timeout: float = 10.0
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "SmtpSettings":
+        username = config.get("email_username", "").strip()
+        return cls(
+            host=config.get("email_smtp_server", "").strip(),
+            port=int(config.get("email_smtp_port", 587)),
+            username=username,
+            password=config.get("email_password", "").strip(),
+            sender=(config.get("email_from") or username).strip(),
+            use_tls=bool(config.get("email_use_tls", True)),
+            timeout=float(config.get("email_timeout_seconds", 10.0)),
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.host and self.sender and (self.password or not self.username))
+
+
+class DeliveryReport(NamedTuple):
+    recipient: str
+    success: bool
+    attempts: int
+    latency_ms: float   # from dispatch to accepted (or final failure)
+    error: Optional[str]
+
+    def to_dict(self) -> Dict:
+        return self._asdict()
+
+
+class SmtpConnectionPool:
+    """Bounded pool of open SMTP sessions. Idle sessions are checked with NOOP before reuse."""
+
+    def __init__(self, settings: SmtpSettings, size: int = 4, check_idle_seconds: float = 30.0):
+        self.settings = settings
+        self.size = size
+        self.check_idle_seconds = check_idle_seconds
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._warming = threading.Lock()
+        self.connects = 0
+        self.reuses = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        s = self.settings
+        conn = smtplib.SMTP(s.host, s.port, timeout=s.timeout)
+        conn.ehlo()
+        if s.use_tls and conn.has_extn("starttls"):
+            conn.starttls()
+            conn.ehlo()
+        if s.username:
+            conn.login(s.username, s.password)
+        with self._lock:
+            self.connects += 1
+        SMTP_CONNECTS.inc()
+        return conn
+
+    def acquire(self) -> smtplib.SMTP:
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    conn, idle_since = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+                if time.monotonic() - idle_since < self.check_idle_seconds or self._alive(conn):
+                    with self._lock:
+                        self.reuses += 1
+                    return conn
+                self._discard(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn: smtplib.SMTP, broken: bool = False):
+        if broken or self._idle.qsize() >= self.size:
+            self._discard(conn)
+        else:
+            self._idle.put((conn, time.monotonic()))
+        self._slots.release()
+
+    @staticmethod
+    def _alive(conn: smtplib.SMTP) -> bool:
+        try:
+            return conn.noop()[0] == 250
+        except Exception:
+            return False
+
+    @staticmethod
+    def _discard(conn: smtplib.SMTP):
+        try:
+            conn.quit()
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def warm(self, count: Optional[int] = None):
+        """Open connections ahead of time so the first send skips the handshake.
+
+        One warm runs at a time and it only takes free slots (never waits for
+        one), so overlapping warms and in-flight sends cannot leave each other
+        holding part of the pool.
+        """
+        if not self._warming.acquire(blocking=False):
+            return
+        count = min(count or self.size, self.size)
+        opened = []
+        try:
+            for _ in range(max(0, count - self._idle.qsize())):
+                if not self._slots.acquire(blocking=False):
+                    break
+                try:
+                    opened.append(self._connect())
+                except Exception:
+                    self._slots.release()
+                    raise
+        finally:
+            for conn in opened:
+                self.release(conn)
+            self._warming.release()
+
+    def close(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"size": self.size, "idle": self._idle.qsize(), "connects": self.connects, "reuses": self.reuses}
+
+
+def build_message(sender: str, subject: str, body: str) -> str:
+    """The message without a To header; the recipient's header is prepended per send."""
+    msg = MIMEMultipart()
+    msg["From"] = sender
+    msg["Subject"] = subject
+    msg.attach(MIMEText(body, "plain"))
+    return msg.as_string()
+
+
+class NotificationDispatcher:
+    def __init__(self, settings: SmtpSettings, pool_size: int = 4, max_attempts: int = 3,
+                 backoff_seconds: float = 0.5):
+        self.settings = settings
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.pool = SmtpConnectionPool(settings, size=pool_size)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="smtp-send")
+        self._lock = threading.Lock()
+        self._sent = 0
+        self._failed = 0
+        self._retries = 0
+
+    def warm_async(self):
+        """Warm the pool in the background (errors are reported on the next send)."""
+        def warm():
+            try:
+                self.pool.warm()
+            except Exception as e:
+                print(f"⚠️  Could not pre-connect to SMTP server: {e}")
+        self._executor.submit(warm)
+
+    def _deliver(self, recipient: str, base_message: str, started: float) -> DeliveryReport:
+        message = f"To: {recipient}\n{base_message}"
+        error = None
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                conn = self.pool.acquire()
+            except smtplib.SMTPAuthenticationError:
+                error = "authentication failed (for Gmail use an App Password)"
+                break
+            except TRANSIENT_ERRORS as e:
+                error = f"connect failed: {e}"
+            else:
+                try:
+                    conn.sendmail(self.settings.sender, [recipient], message)
+                    self.pool.release(conn)
+                    return self._report(recipient, True, attempt, started, None)
+                except smtplib.SMTPRecipientsRefused:
+                    self.pool.release(conn)
+                    error = "recipient refused"
+                    break
+                except smtplib.SMTPResponseException as e:
+                    # 4xx is temporary, 5xx permanent
+                    self.pool.release(conn, broken=e.smtp_code >= 500 or e.smtp_code == 421)
+                    error = f"{e.smtp_code} {e.smtp_error!r}"
+                    if e.smtp_code >= 500:
+                        break
+                except TRANSIENT_ERRORS as e:
+                    self.pool.release(conn, broken=True)
+                    error = f"connection lost: {e}"
+            if attempt < self.max_attempts:
+                with self._lock:
+                    self._retries += 1
+                RETRIES.inc()
+                time.sleep(self.backoff_seconds * 2 ** (attempt - 1))
+        return self._report(recipient, False, attempt, started, error)
+
+    def _report(self, recipient, success, attempts, started, error) -> DeliveryReport:
+        with self._lock:
+            if success:
+                self._sent += 1
+            else:
+                self._failed += 1
+        seconds = time.perf_counter() - started
+        result = "sent" if success else "failed"
+        DELIVERIES.inc(result=result)
+        DELIVERY_SECONDS.observe(seconds, result=result)
+        return DeliveryReport(recipient, success, attempts, round(seconds * 1000, 2), error)
+
+    def send(self, recipients: List[str], subject: str, body: str) -> List[DeliveryReport]:
+        """Send to all recipients concurrently; returns one report per recipient, in order."""
+        started = time.perf_counter()
+        base_message = build_message(self.settings.sender, subject, body)
+        futures = [self._executor.submit(self._deliver, r, base_message, started) for r in recipients]
+        return [f.result() for f in futures]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"sent": self._sent, "failed": self._failed, "retries": self._retries, "pool": self.pool.stats()}
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.pool.close()
@@ -0,0 +1,93 @@
+"""
+Pipeline Configuration
+Tunable settings for the audio analysis pipeline.
+Values in pipeline_config.json (if present) override the defaults below.
+"""
+
+import json
+import os
+from typing import Dict
+
+PIPELINE_CONFIG_FILE = os.path.join(os.path.dirname(__file__), "pipeline_config.json")
+
+
+def load_pipeline_config() -> Dict:
+    """Load pipeline configuration from file or return defaults."""
+    default_config = {
+        # wav2vec2 micro-batching across concurrent requests
+        "hf_batching_enabled": True,
+        "hf_batch_max_size": 8,
+        "hf_batch_max_wait_ms": 20,
+        "hf_batch_max_queue": 256,
+        # wav2vec2 inference mode: "fp32", "int8" (dynamic quantization) or "onnx" (ONNX Runtime)
+        "hf_inference_mode": "fp32",
+        "hf_onnx_path": os.path.join(os.path.dirname(__file__), "..", "models", "wav2vec2_emotion.onnx"),
+        # Load the sklearn forests as compiled, memory-mapped arrays (models/<name>.forest/)
+        "sklearn_compiled_forest": True,
+        # Emotion models: "vote" runs all three; "cascade" runs wav2vec2 only when
+        # the sklearn models disagree or are below emotion_cascade_confidence
+        "emotion_mode": "vote",
+        "emotion_cascade_confidence": 0.6,
+        # Long audio: wav2vec2 runs on overlapping windows, a few at a time (bounded memory)
+        "hf_long_audio_enabled": True,
+        "hf_window_seconds": 8.0,
+        "hf_window_overlap_seconds": 2.0,
+        "hf_window_batch_size": 4,
+        # Longest upload accepted by /api/analyze-audio
+        "max_audio_seconds": 300,
+        # Voice activity gate in front of the pipeline
+        "vad_enabled": True,
+        "vad_trim": True,
+        "vad_min_energy_db": -50.0,
+        "vad_energy_margin_db": 10.0,
+        "vad_energy_cap_db": -30.0,
+        "vad_max_zcr": 0.4,
+        "vad_max_flatness": 0.45,
+        "vad_onset_frames": 3,
+        "vad_hangover_frames": 20,
+        "vad_min_speech_seconds": 0.25,
+        "vad_padding_seconds": 0.1,
+        # Streaming ingestion sliding windows
+        "stream_window_seconds": 4.0,
+        "stream_hop_seconds": 1.0,
+        "stream_idle_timeout_seconds": 300,
+        # Concurrent stage executor pools (cpu_pool_workers: null = os.cpu_count())
+        "io_pool_workers": 16,
+        "cpu_pool_workers": None,
+        # Transcription: "google" (network), "vosk" (offline) or "static" (test stand-in)
+        "asr_backend": "google",
+        "asr_timeout_seconds": 10.0,
+        "asr_max_concurrency": 4,
+        "asr_cache_size": 256,
+        "asr_vosk_model_path": os.path.join(os.path.dirname(__file__), "..", "models", "vosk-model-small-en-us-0.15"),
+        "asr_static_transcript": "",
+        # Analysis results cached by decoded-audio hash + model versions (retried uploads are served once)
+        "analysis_cache_enabled": True,
+        "analysis_cache_size": 256,
+        "analysis_cache_ttl_seconds": 600,
+        # Identical audio re-raises no alert within this window, cached result or not
+        "alert_dedupe_ttl_seconds": 600,
+        # Persistent alert store (SQLite); resolved alerts older than the retention are compacted away
+        "alert_db_path": os.path.join(os.path.dirname(__file__), "..", "data", "alerts.db"),
+        "alert_retention_days": 90,
+        "alert_cache_size": 256,
+        "alert_cache_ttl_seconds": 2.0,
+        # Concurrent emergency responses (alarm + location + notifications)
+        "alert_response_workers": 4,
+        # Alert event stream: events kept for Last-Event-ID resume, and per-subscriber queue bound
+        "alert_event_history": 1000,
+        "alert_event_queue_size": 100,
+    }
+
+    if os.path.exists(PIPELINE_CONFIG_FILE):
+        try:
+            with open(PIPELINE_CONFIG_FILE, "r") as f:
+                config = json.load(f)
+                return {**default_config, **config}
+        except Exception as e:
+            print(f"Error loading pipeline config: {e}")
+
+    return default_config
+
+
+pipeline_config = load_pipeline_config()
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import sounddevice as sd
 import torch
 import torch.nn.functional as F
@@ -15,9 +17,15 @@ def record_audio(duration=4, fs=16000):
     print("Done recording!")
     return torch.tensor(audio.T)
 
+@lru_cache(maxsize=8)
+def get_resampler(rate):
+    """Resample transform to 16 kHz, built once per input rate (its sinc kernel is precomputed)."""
+    return Resample(orig_freq=rate, new_freq=16000)
+
+
 def predict_emotion(y, rate=16000):
     if rate != 16000:
-        y = Resample(orig_freq=rate, new_freq=16000)(y)
+        y = get_resampler(rate)(y)
 
     inputs = extractor(y.squeeze().numpy(), sampling_rate=16000, return_tensors="pt", padding=True)
     with torch.no_grad():
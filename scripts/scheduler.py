@@ -0,0 +1,153 @@
+"""
+Timer Scheduler
+One thread keeps every pending deadline (alert countdowns) in a heap and hands
+due callbacks to a bounded executor. Cancelling a timer is O(1): the entry is
+dropped from the key index and its heap slot is skipped when it surfaces.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+
+def _percentile(ordered: Sequence[float], q: float) -> float:
+    """q-th percentile of sorted values, interpolated linearly (as numpy.percentile)."""
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+class _Timer:
+    __slots__ = ("deadline", "seq", "key", "fn", "args", "cancelled")
+
+    def __init__(self, deadline: float, seq: int, key: Hashable, fn: Callable, args: tuple):
+        self.deadline = deadline
+        self.seq = seq
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.cancelled = False
+
+    def __lt__(self, other: "_Timer") -> bool:
+        return (self.deadline, self.seq) < (other.deadline, other.seq)
+
+
+class TimerScheduler:
+    """
+    Heap-based timer service. `schedule` registers a callback under a key
+    (re-scheduling a key replaces its timer), `cancel` removes it. Due callbacks
+    run on `executor`; lateness is measured from the deadline to callback start.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None, max_workers: int = 4,
+                 name: str = "scheduler", lateness_window: int = 1024):
+        self.name = name
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self._heap: List[_Timer] = []
+        self._timers: Dict[Hashable, _Timer] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._lateness_ms = deque(maxlen=lateness_window)
+        self._scheduled = 0
+        self._fired = 0
+        self._cancelled = 0
+        self._errors = 0
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def schedule(self, delay_seconds: float, fn: Callable[..., Any], *args, key: Optional[Hashable] = None) -> Hashable:
+        """Run fn(*args) after `delay_seconds`. Returns the key that cancels it."""
+        with self._cond:
+            seq = next(self._seq)
+            key = seq if key is None else key
+            previous = self._timers.get(key)
+            if previous is not None:
+                previous.cancelled = True
+            timer = _Timer(time.monotonic() + delay_seconds, seq, key, fn, args)
+            self._timers[key] = timer
+            heapq.heappush(self._heap, timer)
+            self._scheduled += 1
+            # Only wake the thread if the new timer is now the earliest
+            if self._heap[0] is timer:
+                self._cond.notify()
+        return key
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancel a pending timer. Returns False if it already fired or never existed."""
+        with self._cond:
+            timer = self._timers.pop(key, None)
+            if timer is None:
+                return False
+            timer.cancelled = True
+            self._cancelled += 1
+            # Rebuild once cancelled entries dominate so the heap stays bounded
+            if len(self._heap) > 64 and len(self._heap) > 2 * len(self._timers):
+                self._heap = [t for t in self._heap if not t.cancelled]
+                heapq.heapify(self._heap)
+            return True
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._timers)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    while self._heap and self._heap[0].cancelled:
+                        heapq.heappop(self._heap)
+                    if self._heap:
+                        wait = self._heap[0].deadline - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                if self._stopped:
+                    return
+                timer = heapq.heappop(self._heap)
+                if self._timers.get(timer.key) is timer:
+                    del self._timers[timer.key]
+            self.executor.submit(self._fire, timer)
+
+    def _fire(self, timer: _Timer):
+        lateness = (time.monotonic() - timer.deadline) * 1000
+        with self._cond:
+            self._lateness_ms.append(lateness)
+            self._fired += 1
+        try:
+            timer.fn(*timer.args)
+        except Exception as e:
+            with self._cond:
+                self._errors += 1
+            print(f"Error in scheduled callback {timer.key!r}: {e}")
+
+    def stats(self) -> Dict:
+        with self._cond:
+            lateness = sorted(self._lateness_ms)
+            return {
+                "pending": len(self._timers),
+                "heap_size": len(self._heap),
+                "scheduled": self._scheduled,
+                "fired": self._fired,
+                "cancelled": self._cancelled,
+                "errors": self._errors,
+                "lateness_ms": {
+                    "p50": round(_percentile(lateness, 50), 2),
+                    "p95": round(_percentile(lateness, 95), 2),
+                    "max": round(lateness[-1], 2),
+                } if lateness else None,
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,116 @@
+"""
+SMTP Sink
+Minimal local SMTP stand-in for testing notifications without a real mail
+server. Accepts every message (no TLS, no auth) and prints or stores it.
+
+Point alert_config.json at it:
+    "email_smtp_server": "localhost", "email_smtp_port": 1025,
+    "email_username": "", "email_from": "alerts@localhost"
+
+Usage:
+    python scripts/smtp_sink.py --port 1025 [--delay-ms 200]
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+from typing import Dict, List
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        sink: "SmtpSink" = self.server.sink
+        self.reply("220 smtp-sink ready")
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip()
+            verb = command[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 smtp-sink")
+            elif verb == "MAIL":
+                sender, recipients = command.split(":", 1)[1].strip(), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[1].strip().strip("<>"))
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data[1:] if data.startswith(b"..") else data)
+                if sink.delay_ms:
+                    time.sleep(sink.delay_ms / 1000)
+                sink.record({"from": sender, "to": recipients, "data": b"".join(lines).decode(errors="replace")})
+                self.reply("250 OK queued")
+            elif verb == "RSET":
+                sender, recipients = None, []
+                self.reply("250 OK")
+            elif verb == "NOOP":
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SmtpSink:
+    """Threaded SMTP server that keeps received messages in `messages`."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 1025, delay_ms: float = 0, verbose: bool = False):
+        self.delay_ms = delay_ms
+        self.verbose = verbose
+        self.messages: List[Dict] = []
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _SmtpHandler)
+        self._server.sink = self
+        self.port = self._server.server_address[1]
+
+    def record(self, message: Dict):
+        with self._lock:
+            self.messages.append(message)
+        if self.verbose:
+            print(f"📨 {message['from']} -> {', '.join(message['to'])} ({len(message['data'])} bytes)")
+
+    def start(self) -> "SmtpSink":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local SMTP stand-in for notification testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--delay-ms", type=float, default=0, help="Simulated per-message server latency")
+    args = parser.parse_args()
+
+    sink = SmtpSink(args.host, args.port, args.delay_ms, verbose=True).start()
+    print(f"SMTP sink listening on {args.host}:{sink.port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        sink.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Concurrent Stage Executor
+Runs independent pipeline stages in parallel on shared pools: a large pool for
+I/O-bound stages (ASR network calls) and a CPU-sized pool for model stages.
+Records per-stage wall-clock timings (also exported as metrics).
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+import metrics
+from pipeline_config import pipeline_config
+
+IO = "io"
+CPU = "cpu"
+
+STAGE_SECONDS = metrics.histogram(
+    "pipeline_stage_duration_seconds", "Time spent running each pipeline stage", ["stage"])
+STAGES_IN_FLIGHT = metrics.gauge(
+    "pipeline_stages_in_flight", "Pipeline stages queued or running on each pool", ["pool"])
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(kind: str) -> ThreadPoolExecutor:
+    """Shared executor for I/O-bound (`IO`) or CPU-bound (`CPU`) stages."""
+    with _pools_lock:
+        if kind not in _pools:
+            if kind == IO:
+                workers = pipeline_config.get("io_pool_workers", 16)
+            else:
+                workers = pipeline_config.get("cpu_pool_workers") or os.cpu_count() or 4
+            _pools[kind] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{kind}-stage")
+        return _pools[kind]
+
+
+class StageRun:
+    """
+    One set of concurrently running stages. `submit` starts a stage and returns
+    its Future; the time each stage spends running is recorded in `timings`.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.futures: Dict[str, Future] = {}
+        self.timings: Dict[str, float] = {}
+        # perf_counter() at which each stage finished
+        self.finished: Dict[str, float] = {}
+        # Stages record from pool threads while the request thread may be reading
+        self._timings_lock = threading.Lock()
+
+    def submit(self, name: str, fn: Callable[..., Any], *args, kind: str = CPU, **kwargs) -> Future:
+        def run():
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._record(name, time.perf_counter() - start)
+
+        STAGES_IN_FLIGHT.inc(pool=kind)
+        future = get_pool(kind).submit(run)
+        future.add_done_callback(lambda _: STAGES_IN_FLIGHT.dec(pool=kind))
+        self.futures[name] = future
+        return future
+
+    def run_inline(self, name: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a stage inline on the calling thread and record its timing."""
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._record(name, time.perf_counter() - start)
+
+    def _record(self, name: str, seconds: float):
+        with self._timings_lock:
+            self.timings[name] = seconds
+            self.finished[name] = time.perf_counter()
+        STAGE_SECONDS.observe(seconds, stage=name)
+
+    def result(self, name: str, default: Any = None, block: bool = True) -> Any:
+        """Result of a stage; `default` if it raised, or if not finished and block is False."""
+        future = self.futures.get(name)
+        if future is None or (not block and not future.done()):
+            return default
+        try:
+            return future.result()
+        except Exception:
+            return default
+
+    def finished_at(self, *names: str) -> float:
+        """When the last of `names` finished (perf_counter), or now if one has not recorded yet."""
+        with self._timings_lock:
+            times = [self.finished.get(name) for name in names]
+        return max(times) if None not in times else time.perf_counter()
+
+    def cancel_pending(self):
+        """Cancel stages that have not started yet (running stages finish in the background)."""
+        for future in self.futures.values():
+            future.cancel()
+
+    def timings_ms(self) -> Dict[str, float]:
+        with self._timings_lock:
+            timings = dict(self.timings)
+        timings = {name: round(seconds * 1000, 2) for name, seconds in timings.items()}
+        timings["total"] = round((time.perf_counter() - self.started) * 1000, 2)
+        return timings
@@ -0,0 +1,218 @@
+"""
+Transcription Backends
+Pluggable speech-to-text for the analysis pipeline:
+  - "google": Google Web Speech API via speech_recognition (network)
+  - "vosk":   offline, in-process Vosk engine (requires the `vosk` package and a model)
+  - "static": deterministic local stand-in for tests and benchmarks
+
+All backends are called through a Transcriber, which adds per-call deadlines,
+a bounded worker pool and an LRU cache keyed by the audio content hash.
+"""
+
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Optional
+
+import numpy as np
+
+import metrics
+from audio_io import audio_hash, to_pcm16
+
+try:
+    import speech_recognition as sr
+    HAS_SPEECH_RECOGNITION = True
+except ImportError:
+    HAS_SPEECH_RECOGNITION = False
+
+try:
+    import vosk
+    HAS_VOSK = True
+except ImportError:
+    HAS_VOSK = False
+
+
+ASR_SECONDS = metrics.histogram(
+    "asr_duration_seconds", "Transcription time by backend and outcome", ["backend", "outcome"])
+
+
+class TranscriptionError(Exception):
+    """Raised by a backend when the transcript could not be obtained (as opposed to no speech)."""
+
+
+class TranscriptionBackend(ABC):
+    """Base class. `transcribe` returns the transcript, "" for no recognizable speech."""
+
+    name = "base"
+
+    @abstractmethod
+    def transcribe(self, y: np.ndarray, sample_rate: int) -> str:
+        """Transcript of a mono float32 clip; raises TranscriptionError if it cannot be obtained."""
+
+
+class GoogleBackend(TranscriptionBackend):
+    """Google Web Speech API through speech_recognition."""
+
+    name = "google"
+
+    def __init__(self):
+        if not HAS_SPEECH_RECOGNITION:
+            raise TranscriptionError("speech_recognition is not installed")
+
+    def transcribe(self, y: np.ndarray, sample_rate: int) -> str:
+        # 16-bit PCM handed to speech_recognition in memory, no temp WAV
+        audio_data = sr.AudioData(to_pcm16(y), int(sample_rate), 2)
+        try:
+            return sr.Recognizer().recognize_google(audio_data)
+        except sr.UnknownValueError:
+            return ""
+        except sr.RequestError as e:
+            raise TranscriptionError(f"Google speech request failed: {e}")
+
+
+class VoskBackend(TranscriptionBackend):
+    """Offline in-process recognition with Vosk. The model is loaded once."""
+
+    name = "vosk"
+
+    def __init__(self, model_path: str):
+        if not HAS_VOSK:
+            raise TranscriptionError("vosk is not installed (pip install vosk)")
+        if not os.path.isdir(model_path):
+            raise TranscriptionError(f"Vosk model not found at {model_path}")
+        vosk.SetLogLevel(-1)
+        self.model = vosk.Model(model_path)
+
+    def transcribe(self, y: np.ndarray, sample_rate: int) -> str:
+        recognizer = vosk.KaldiRecognizer(self.model, sample_rate)
+        recognizer.AcceptWaveform(to_pcm16(y))
+        return json.loads(recognizer.FinalResult()).get("text", "")
+
+
+class StaticBackend(TranscriptionBackend):
+    """
+    Deterministic stand-in: returns the transcript registered for the clip's
+    content hash, or `default` for unknown clips. No network or model needed.
+    """
+
+    name = "static"
+
+    def __init__(self, default: str = "", transcripts: Optional[Dict[str, str]] = None):
+        self.default = default
+        self.transcripts = dict(transcripts or {})
+
+    def register(self, y: np.ndarray, sample_rate: int, transcript: str):
+        self.transcripts[audio_hash(y, sample_rate)] = transcript
+
+    def transcribe(self, y: np.ndarray, sample_rate: int) -> str:
+        return self.transcripts.get(audio_hash(y, sample_rate), self.default)
+
+
+class Transcriber:
+    """
+    Runs a backend with a per-call deadline on a bounded pool and caches
+    successful transcripts in an LRU keyed by audio hash.
+    """
+
+    def __init__(self, backend: TranscriptionBackend, timeout_seconds: float = 10.0,
+                 max_concurrency: int = 4, cache_size: int = 256):
+        self.backend = backend
+        self.timeout_seconds = timeout_seconds
+        self.cache_size = cache_size
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"asr-{backend.name}")
+        # Running + queued calls are capped so a slow backend cannot pile up work
+        self._slots = threading.BoundedSemaphore(max_concurrency * 2)
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"calls": 0, "cache_hits": 0, "errors": 0, "timeouts": 0}
+
+    def transcribe(self, y: np.ndarray, sample_rate: int) -> Dict:
+        """
+        Returns {"text", "error", "cached", "backend", "seconds"}.
+        `error` is None on success (including "no speech", which gives text "").
+        """
+        start = time.perf_counter()
+        if isinstance(y, np.ndarray) and y.ndim > 1:
+            y = y.flatten()
+        key = f"{self.backend.name}:{audio_hash(y, sample_rate)}"
+        self._count("calls")
+
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._count("cache_hits")
+                return self._result(self._cache[key], None, True, start)
+
+        deadline = start + self.timeout_seconds
+        if not self._slots.acquire(timeout=self.timeout_seconds):
+            self._count("timeouts")
+            return self._result("", "transcription backend busy", False, start)
+
+        future = self._pool.submit(self.backend.transcribe, y, sample_rate)
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            text = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+        except FutureTimeoutError:
+            self._count("timeouts")
+            return self._result("", f"transcription timed out after {self.timeout_seconds}s", False, start)
+        except Exception as e:
+            self._count("errors")
+            return self._result("", str(e), False, start)
+
+        text = text or ""
+        with self._cache_lock:
+            self._cache[key] = text
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return self._result(text, None, False, start)
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._cache_lock:
+            stats["cache_entries"] = len(self._cache)
+        stats["backend"] = self.backend.name
+        return stats
+
+    def _result(self, text: str, error: Optional[str], cached: bool, start: float) -> Dict:
+        seconds = time.perf_counter() - start
+        outcome = "cached" if cached else ("error" if error else "ok")
+        ASR_SECONDS.observe(seconds, backend=self.backend.name, outcome=outcome)
+        return {
+            "text": text,
+            "error": error,
+            "cached": cached,
+            "backend": self.backend.name,
+            "seconds": round(seconds, 4),
+        }
+
+
+def create_backend(config: Dict) -> TranscriptionBackend:
+    """Build the backend named by config["asr_backend"]."""
+    name = config.get("asr_backend", "google")
+    if name == "google":
+        return GoogleBackend()
+    if name == "vosk":
+        return VoskBackend(config.get("asr_vosk_model_path", ""))
+    if name == "static":
+        return StaticBackend(default=config.get("asr_static_transcript", ""))
+    raise ValueError(f"Unknown ASR backend '{name}'")
+
+
+def create_transcriber(config: Dict, backend: Optional[TranscriptionBackend] = None) -> Transcriber:
+    return Transcriber(
+        backend or create_backend(config),
+        timeout_seconds=config.get("asr_timeout_seconds", 10.0),
+        max_concurrency=config.get("asr_max_concurrency", 4),
+        cache_size=config.get("asr_cache_size", 256),
+    )
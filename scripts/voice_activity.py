@@ -0,0 +1,127 @@
+"""
+Voice Activity Detection
+Cheap frame-level speech detector used to gate the analysis pipeline.
+Each frame is scored on energy (relative to the clip's noise floor), zero
+crossing rate and spectral flatness; a hysteresis state machine turns frame
+decisions into speech regions so short clicks and gaps don't flip the state.
+"""
+
+import threading
+from typing import Dict, NamedTuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+_EPS = 1e-10
+
+
+class VadResult(NamedTuple):
+    is_speech: bool
+    start: int            # first sample of detected speech (after padding)
+    end: int              # one past the last sample of detected speech
+    speech_seconds: float
+    speech_ratio: float
+    noise_floor_db: float
+
+    def to_dict(self, sample_rate: int) -> Dict:
+        return {
+            "is_speech": self.is_speech,
+            "start_seconds": round(self.start / sample_rate, 3),
+            "end_seconds": round(self.end / sample_rate, 3),
+            "speech_seconds": round(self.speech_seconds, 3),
+            "speech_ratio": round(self.speech_ratio, 3),
+            "noise_floor_db": round(self.noise_floor_db, 1),
+        }
+
+
+def frame_features(y: np.ndarray, sample_rate: int, frame_ms: float = 25.0, hop_ms: float = 10.0):
+    """Per-frame energy (dBFS), zero crossing rate and spectral flatness."""
+    frame_length = max(16, int(sample_rate * frame_ms / 1000))
+    hop_length = max(1, int(sample_rate * hop_ms / 1000))
+    if len(y) < frame_length:
+        y = np.pad(y, (0, frame_length - len(y)))
+    frames = sliding_window_view(y, frame_length)[::hop_length]
+
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + _EPS)
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+    power = np.abs(np.fft.rfft(frames * np.hanning(frame_length), axis=1)) ** 2 + _EPS
+    flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    return energy_db, zcr, flatness, frame_length, hop_length
+
+
+def detect_voice_activity(y: np.ndarray, sample_rate: int, config: Dict) -> VadResult:
+    """Find speech in a mono clip. Thresholds come from pipeline_config "vad_*" keys."""
+    y = np.asarray(y, dtype=np.float32).flatten()
+    if len(y) == 0:
+        return VadResult(False, 0, 0, 0.0, 0.0, -100.0)
+
+    energy_db, zcr, flatness, frame_length, hop_length = frame_features(y, sample_rate)
+
+    # Energy must clear both an absolute floor and the clip's own noise floor,
+    # capped so a clip that is speech from start to end is not rejected.
+    noise_floor_db = float(np.percentile(energy_db, 10))
+    threshold_db = min(
+        max(config.get("vad_min_energy_db", -50.0), noise_floor_db + config.get("vad_energy_margin_db", 10.0)),
+        config.get("vad_energy_cap_db", -30.0),
+    )
+    candidate = (
+        (energy_db > threshold_db)
+        & (zcr < config.get("vad_max_zcr", 0.4))
+        & (flatness < config.get("vad_max_flatness", 0.45))
+    )
+
+    # Hysteresis: enter after `onset` consecutive speech frames, leave after `hangover` silent frames
+    onset = config.get("vad_onset_frames", 3)
+    hangover = config.get("vad_hangover_frames", 20)
+    speech = np.zeros(len(candidate), dtype=bool)
+    in_speech = False
+    run = 0
+    for i, is_candidate in enumerate(candidate):
+        if in_speech:
+            run = 0 if is_candidate else run + 1
+            if run >= hangover:
+                in_speech = False
+                run = 0
+        else:
+            run = run + 1 if is_candidate else 0
+            if run >= onset:
+                in_speech = True
+                speech[i - run + 1:i + 1] = True
+                run = 0
+                continue
+        speech[i] = in_speech
+
+    speech_frames = np.flatnonzero(speech)
+    speech_seconds = len(speech_frames) * hop_length / sample_rate
+    is_speech = speech_seconds >= config.get("vad_min_speech_seconds", 0.25)
+    if not is_speech:
+        return VadResult(False, 0, 0, speech_seconds, len(speech_frames) / len(speech), noise_floor_db)
+
+    padding = int(config.get("vad_padding_seconds", 0.1) * sample_rate)
+    start = max(0, int(speech_frames[0]) * hop_length - padding)
+    end = min(len(y), int(speech_frames[-1]) * hop_length + frame_length + padding)
+    return VadResult(True, start, end, speech_seconds, len(speech_frames) / len(speech), noise_floor_db)
+
+
+class VadCounters:
+    """Thread-safe counts of analysed vs gated windows."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.windows = 0
+        self.gated = 0
+
+    def record(self, gated: bool):
+        with self._lock:
+            self.windows += 1
+            self.gated += 1 if gated else 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "windows": self.windows,
+                "gated": self.gated,
+                "skip_rate": round(self.gated / self.windows, 4) if self.windows else None,
+            }
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The pipeline modules are flat files in scripts/ (as app.py imports them)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
@@ -0,0 +1,37 @@
+import threading
+import time
+import types
+
+import pytest
+
+import alert_system
+from config_service import ConfigService
+
+
+@pytest.fixture
+def alarm(tmp_path, monkeypatch):
+    # Never read or write the real alert_config.json
+    monkeypatch.setattr(alert_system, "_config_service",
+                        ConfigService(str(tmp_path / "alert_config.json"), alert_system.DEFAULT_CONFIG))
+    monkeypatch.setattr(alert_system, "_alarm_preloaded", True)
+    monkeypatch.setattr(alert_system, "_alarm_file", str(tmp_path / "alarm.mp3"))
+    monkeypatch.setattr(alert_system, "_alarm_sound", None)
+    monkeypatch.setattr(alert_system, "_alarm_music_loaded", False)
+    playing = threading.Event()
+    finish = threading.Event()
+
+    def playsound(path, block=True):
+        playing.set()
+        finish.wait(5)
+
+    monkeypatch.setattr(alert_system, "HAS_PLAYSOUND", True)
+    monkeypatch.setattr(alert_system, "playsound", types.SimpleNamespace(playsound=playsound), raising=False)
+    yield playing
+    finish.set()
+
+
+def test_playsound_fallback_does_not_block_the_alarm_thread(alarm):
+    start = time.perf_counter()
+    alert_system.play_alarm_sound()
+    assert time.perf_counter() - start < 0.2
+    assert alarm.wait(2)
@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+from alert_store import AlertStore, new_alert_id
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "alerts.db")
+
+
+def test_transition_only_from_the_expected_status(db_path):
+    store = AlertStore(db_path)
+    alert_id = new_alert_id()
+    store.create({"id": alert_id, "status": "pending_confirmation"})
+
+    assert store.transition(alert_id, ("pending_confirmation",), status="confirmed")["status"] == "confirmed"
+    assert store.transition(alert_id, ("pending", "pending_confirmation", "confirmed"), status="cancelled")
+    # The response finishing after the cancel does not overwrite it
+    assert store.transition(alert_id, ("confirmed",), status="responded") is None
+    assert store.get(alert_id, fresh=True)["status"] == "cancelled"
+    assert store.transition("missing", None, note="x") is None
+
+
+def test_update_merges_fields_but_not_status(db_path):
+    store = AlertStore(db_path)
+    alert_id = new_alert_id()
+    store.create({"id": alert_id})
+
+    assert store.update(alert_id, note="checked")["note"] == "checked"
+    with pytest.raises(ValueError):
+        store.update(alert_id, status="responded")
+
+
+def test_cached_reads_see_other_workers_after_the_ttl(db_path):
+    worker_a = AlertStore(db_path, cache_ttl_seconds=0.2)
+    worker_b = AlertStore(db_path, cache_ttl_seconds=0.2)
+    alert_id = new_alert_id()
+    worker_a.create({"id": alert_id})
+    assert worker_a.get(alert_id)["status"] == "pending_confirmation"
+
+    worker_b.transition(alert_id, None, status="cancelled")
+    # Writes in this process refresh the cache at once
+    assert worker_b.get(alert_id)["status"] == "cancelled"
+    # Another process's write: visible at once with fresh, and after the TTL otherwise
+    assert worker_a.get(alert_id, fresh=True)["status"] == "cancelled"
+    worker_a.transition(alert_id, ("cancelled",), status="pending")
+    worker_b.transition(alert_id, None, status="responded")
+    assert worker_a.get(alert_id)["status"] == "pending"
+    time.sleep(0.25)
+    assert worker_a.get(alert_id)["status"] == "responded"
@@ -0,0 +1,171 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import analysis_cache
+from analysis_cache import COALESCED, HIT, MISS, AnalysisCache, analysis_key
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = AnalysisCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"alert_id": "alert_1"}
+
+    results = {}
+    leader = threading.Thread(target=lambda: results.setdefault("leader", cache.get_or_compute("k", compute)))
+    leader.start()
+    assert started.wait(5)
+    waiter = threading.Thread(target=lambda: results.setdefault("waiter", cache.get_or_compute("k", compute)))
+    waiter.start()
+    # The waiter has joined the in-flight computation before it finishes
+    _wait_until(lambda: cache.stats()[COALESCED] == 1)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert len(calls) == 1
+    assert results["leader"] == ({"alert_id": "alert_1"}, MISS)
+    assert results["waiter"] == ({"alert_id": "alert_1"}, COALESCED)
+    assert cache.get_or_compute("k", compute) == ({"alert_id": "alert_1"}, HIT)
+    assert len(calls) == 1
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    cache = AnalysisCache()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("model crashed")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_compute("k", failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert started.wait(5)
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    _wait_until(lambda: cache.stats()[COALESCED] == 1)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert errors == ["model crashed", "model crashed"]
+    assert cache.get("k") is None
+    assert cache.stats()["in_flight"] == 0
+    # The next request computes again
+    assert cache.get_or_compute("k", lambda: "ok") == ("ok", MISS)
+
+
+def test_uncacheable_values_are_returned_but_not_stored():
+    cache = AnalysisCache()
+    assert cache.get_or_compute("k", lambda: "degraded", cacheable=lambda v: False) == ("degraded", MISS)
+    assert cache.get("k") is None
+    assert cache.get_or_compute("k", lambda: "complete", cacheable=lambda v: True) == ("complete", MISS)
+    assert cache.get_or_compute("k", lambda: "other") == ("complete", HIT)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(analysis_cache.time, "monotonic", lambda: now[0])
+    cache = AnalysisCache(ttl_seconds=10)
+    cache.put("k", "v")
+    now[0] += 9
+    assert cache.get("k") == "v"
+    now[0] += 2
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = AnalysisCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+@pytest.mark.parametrize("change", ["audio", "rate", "versions"])
+def test_key_depends_on_audio_rate_and_versions(change):
+    y = np.linspace(-1, 1, 1600, dtype=np.float32)
+    base = analysis_key(y, 16000, {"crema": 1})
+    other = {
+        "audio": lambda: analysis_key(y * 0.5, 16000, {"crema": 1}),
+        "rate": lambda: analysis_key(y, 8000, {"crema": 1}),
+        "versions": lambda: analysis_key(y, 16000, {"crema": 2}),
+    }[change]()
+    assert base != other
+    assert analysis_key(y.astype(np.float64), 16000, {"crema": 1}) == base
+
+
+def _keyword_distress():
+    # A keyword short-circuit: not cacheable while the emotion models are pending
+    return {"distress_detected": True, "reason": "keyword: 'help'",
+            "emotions": {"crema": "pending", "ravdess": "pending", "hf": "pending", "final": "neutral"}}
+
+
+def _complete(result):
+    return "pending" not in result.get("emotions", {}).values()
+
+
+@pytest.mark.parametrize("cached", [True, False])
+def test_retried_keyword_distress_raises_one_alert(cached):
+    results = AnalysisCache() if cached else None
+    alert_ids = AnalysisCache()
+    analyses, alerts = [], []
+
+    def analyze():
+        analyses.append(1)
+        return _keyword_distress()
+
+    def raise_alert(result):
+        alerts.append(result)
+        return f"alert_{len(alerts)}"
+
+    key = analysis_key(np.ones(1600, dtype=np.float32), 16000)
+    first, _ = analysis_cache.analyze_with_alert(key, analyze, raise_alert, alert_ids, results, cacheable=_complete)
+    retry, status = analysis_cache.analyze_with_alert(key, analyze, raise_alert, alert_ids, results,
+                                                      cacheable=_complete)
+
+    # Re-analysed (the short-circuited result is not cached) but the alert is reused
+    assert len(analyses) == 2
+    assert status == (MISS if cached else None)
+    assert len(alerts) == 1
+    assert first["alert_id"] == retry["alert_id"] == "alert_1"
+
+    other = analysis_key(np.zeros(1600, dtype=np.float32), 16000)
+    assert analysis_cache.analyze_with_alert(other, analyze, raise_alert, alert_ids, results)[0]["alert_id"] == "alert_2"
+
+
+def test_no_alert_without_distress():
+    alert_ids = AnalysisCache()
+    result, status = analysis_cache.analyze_with_alert(
+        "k", lambda: {"distress_detected": False}, lambda r: pytest.fail("alert raised"), alert_ids, AnalysisCache())
+    assert "alert_id" not in result and status == MISS
+    assert alert_ids.stats()["entries"] == 0
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from audio_stream import RingBuffer, StreamSession
+
+SR = 100  # small rate keeps the sample arithmetic readable: window 4 s = 400 samples, hop 1 s = 100
+
+
+def test_ring_buffer_windows_across_the_wrap():
+    ring = RingBuffer(10)
+    ring.append(np.arange(7, dtype=np.float32))
+    ring.append(np.arange(7, 13, dtype=np.float32))
+    assert ring.total_written == 13
+    np.testing.assert_array_equal(ring.window(13, 10), np.arange(3, 13))
+    np.testing.assert_array_equal(ring.window(9, 4), np.arange(5, 9))
+    with pytest.raises(ValueError):
+        ring.window(13, 11)   # longer than the buffer
+    with pytest.raises(ValueError):
+        ring.window(14, 2)    # not written yet
+    with pytest.raises(ValueError):
+        ring.window(5, 3)     # already overwritten
+
+    # An append larger than the buffer keeps only the newest samples
+    ring.append(np.arange(100, 125, dtype=np.float32))
+    assert ring.total_written == 38
+    np.testing.assert_array_equal(ring.window(38, 10), np.arange(115, 125))
+
+
+def _pcm16(samples):
+    return (np.asarray(samples) * 32767).astype("<i2").tobytes()
+
+
+def test_windows_are_cut_at_every_hop_from_odd_sized_chunks():
+    seen = []
+
+    def analyzer(window, sample_rate):
+        seen.append(window.copy())
+        return {"distress_detected": False}
+
+    session = StreamSession(analyzer, sample_rate=SR, window_seconds=4, hop_seconds=1, emit_all_windows=True)
+    ramp = (np.arange(700) % 200) / 400.0
+    data = _pcm16(ramp)
+    events = []
+    # 333-byte chunks split int16 samples in half; the odd byte carries over
+    for i in range(0, len(data), 333):
+        events += session.push(data[i:i + 333])
+
+    assert [e["end_seconds"] for e in events] == [4, 5, 6, 7]
+    assert [e["type"] for e in events] == ["window"] * 4
+    decoded = np.frombuffer(data, dtype="<i2") / 32768.0
+    for i, window in enumerate(seen):
+        np.testing.assert_allclose(window, decoded[i * 100:i * 100 + 400], rtol=1e-6)
+    assert session.status()["windows_analyzed"] == 4
+
+
+def test_overlapping_detections_raise_one_alert():
+    # Distress is heard in every window containing the shout (samples 300-400) or the second one (1300-1400)
+    shout = np.zeros(1800)
+    shout[300:400] = 0.5
+    shout[1300:1400] = 0.5
+    alerts = []
+
+    def analyzer(window, sample_rate):
+        return {"distress_detected": bool(window.max() > 0.25)}
+
+    def alerter(result):
+        alerts.append(result)
+        return f"alert_{len(alerts)}"
+
+    session = StreamSession(analyzer, sample_rate=SR, sample_format="float32",
+                            window_seconds=4, hop_seconds=1, alerter=alerter)
+    events = session.push(shout.astype("<f4").tobytes())
+
+    detections = [(e["end_seconds"], e["alert_id"], e["alert_triggered"]) for e in events]
+    assert detections == [
+        (4, "alert_1", True), (5, "alert_1", False), (6, "alert_1", False), (7, "alert_1", False),
+        (14, "alert_2", True), (15, "alert_2", False), (16, "alert_2", False), (17, "alert_2", False),
+    ]
+    assert len(alerts) == 2
+    assert session.status()["alerts"] == 2 and session.status()["detections"] == 8
+
+
+@pytest.mark.parametrize("kwargs", [{"sample_rate": 0}, {"sample_format": "int8"}, {"hop_seconds": 0}])
+def test_invalid_session_options(kwargs):
+    with pytest.raises(ValueError):
+        StreamSession(lambda w, sr: {}, **kwargs)
@@ -0,0 +1,21 @@
+from batch_analyze import load_completed
+
+
+def test_only_an_unterminated_last_line_is_dropped(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_bytes(b'{"path": "a.wav"}\n{corrupt\n\n{"path": "b.wav", "error": "boom"}\n'
+                       b'{"path": "c.wav"}\n{"path": "d.w')
+
+    assert load_completed(str(output)) == {"a.wav", "b.wav", "c.wav"}
+    # The corrupt middle line and every result after it are kept
+    assert output.read_bytes() == (b'{"path": "a.wav"}\n{corrupt\n\n{"path": "b.wav", "error": "boom"}\n'
+                                   b'{"path": "c.wav"}\n')
+    assert load_completed(str(output), retry_errors=True) == {"a.wav", "c.wav"}
+
+
+def test_complete_last_line_without_newline_is_kept(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_bytes(b'{"path": "a.wav"}\n{"path": "b.wav"}')
+
+    assert load_completed(str(output)) == {"a.wav", "b.wav"}
+    assert output.read_bytes().endswith(b'{"path": "b.wav"}\n')
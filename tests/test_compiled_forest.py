@@ -0,0 +1,52 @@
+import pickle
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+from sklearn.ensemble import RandomForestClassifier
+
+from compiled_forest import SKLEARN_MIN_ROWS, CompiledForest, load_forest
+
+
+@pytest.fixture
+def pickled_forest(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((300, 6))
+    y = np.where(X[:, 0] + X[:, 1] > 0, "angry", np.where(X[:, 2] > 0, "sad", "neutral"))
+    model = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0).fit(X, y)
+    path = tmp_path / "forest.pkl"
+    path.write_bytes(pickle.dumps(model))
+    return str(path), model, rng.standard_normal((SKLEARN_MIN_ROWS + 10, 6))
+
+
+def test_matches_sklearn_and_round_trips(pickled_forest):
+    path, model, X = pickled_forest
+    forest = load_forest(path)
+    assert isinstance(forest, CompiledForest)
+    np.testing.assert_array_equal(forest.predict_proba(X[:50]), model.predict_proba(X[:50]))
+    np.testing.assert_array_equal(forest.compiled_proba(X.astype(np.float32)), model.predict_proba(X))
+    assert list(forest.predict(X[:50])) == list(model.predict(X[:50]))
+
+    reloaded = load_forest(path)
+    assert reloaded.meta == forest.meta
+    np.testing.assert_array_equal(reloaded.predict_proba(X[:5]), model.predict_proba(X[:5]))
+
+
+def test_large_batches_use_the_source_model(pickled_forest):
+    path, model, X = pickled_forest
+    forest = load_forest(path)
+
+    forest.predict_proba(X[:SKLEARN_MIN_ROWS - 1])
+    assert forest._source_model is None
+    np.testing.assert_array_equal(forest.predict_proba(X), model.predict_proba(X))
+    assert isinstance(forest._source_model, RandomForestClassifier)
+
+
+def test_large_batches_stay_compiled_without_a_matching_pickle(pickled_forest, tmp_path):
+    path, model, X = pickled_forest
+    forest = load_forest(path)
+    (tmp_path / "forest.pkl").write_bytes(b"changed since compiling")
+
+    np.testing.assert_array_equal(forest.predict_proba(X), model.predict_proba(X))
+    assert forest._source_model is False
@@ -0,0 +1,69 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from config_service import ConfigService
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "alert_config.json"
+    path.write_text(json.dumps({"emergency_contacts": [], "use_location": True}))
+    os.chmod(path, 0o600)
+    return path
+
+
+def test_update_replaces_the_file_atomically(config_path):
+    service = ConfigService(str(config_path), defaults={"email_smtp_port": 587})
+    notified = []
+    service.subscribe(notified.append)
+
+    snapshot = service.update({"use_location": False})
+    assert snapshot == {"email_smtp_port": 587, "emergency_contacts": [], "use_location": False}
+    # Defaults are not written to the file, and its permissions are kept
+    assert json.loads(config_path.read_text()) == {"emergency_contacts": [], "use_location": False}
+    assert os.stat(config_path).st_mode & 0o777 == 0o600
+    assert notified == [snapshot]
+
+
+def test_failed_write_leaves_the_old_file_and_no_temp_file(config_path):
+    service = ConfigService(str(config_path))
+    before = config_path.read_text()
+
+    with pytest.raises(TypeError):
+        service.update({"use_location": False, "bad": object()})   # not JSON serialisable mid-write
+    assert config_path.read_text() == before
+    assert os.listdir(config_path.parent) == [config_path.name]
+    assert service.get("use_location") is True
+
+
+def test_concurrent_read_modify_write_loses_no_update(config_path):
+    service = ConfigService(str(config_path))
+
+    def add_contact(i):
+        service.update(lambda config: {"emergency_contacts": config["emergency_contacts"] + [f"c{i}@example.com"]})
+
+    threads = [threading.Thread(target=add_contact, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(json.loads(config_path.read_text())["emergency_contacts"]) == 20
+
+
+def test_external_edits_are_reloaded_and_bad_edits_ignored(config_path):
+    service = ConfigService(str(config_path), check_interval_seconds=0.05)
+    assert service.get("use_location") is True
+
+    config_path.write_text(json.dumps({"emergency_contacts": ["a@example.com"]}))
+    time.sleep(0.06)
+    assert service.get("emergency_contacts") == ["a@example.com"]
+    reloads = service.reloads
+
+    config_path.write_text('{"emergency_contacts": [')   # a hand edit in progress
+    time.sleep(0.06)
+    assert service.get("emergency_contacts") == ["a@example.com"]
+    assert service.reloads == reloads
@@ -0,0 +1,56 @@
+import json
+
+from event_bus import CLOSED, EventBus, format_sse
+
+
+def test_subscribers_receive_published_events_in_order():
+    bus = EventBus()
+    first, second = bus.subscribe(), bus.subscribe()
+    bus.publish("created", {"alert": {"id": "a1"}})
+    bus.publish("cancelled", {"alert": {"id": "a1"}})
+
+    for sub in (first, second):
+        assert [sub.get(timeout=1)["type"] for _ in range(2)] == ["created", "cancelled"]
+        assert sub.get(timeout=0.01) is None
+
+    bus.unsubscribe(first)
+    bus.publish("confirmed", {})
+    assert first.get(timeout=0.01) is None
+    assert second.get(timeout=1)["id"] == 3
+
+
+def test_resume_replays_missed_events_from_history():
+    bus = EventBus(history_size=3)
+    for i in range(5):
+        bus.publish("created", {"n": i})
+
+    # Events 4 and 5 are still buffered: replayed without a resync
+    assert [e["id"] for e in bus.subscribe(last_event_id=3).replay] == [4, 5]
+    # Event 2 has left the ring buffer: the client is told to reload first
+    replay = bus.subscribe(last_event_id=1).replay
+    assert replay[0]["type"] == "resync" and [e["id"] for e in replay[1:]] == [3, 4, 5]
+    # An id from before a restart also resyncs
+    assert bus.subscribe(last_event_id=99).replay[0]["type"] == "resync"
+    assert bus.subscribe().replay == []
+
+
+def test_slow_subscriber_is_disconnected_without_blocking_publishers():
+    bus = EventBus(max_queue_size=2)
+    slow, live = bus.subscribe(), bus.subscribe()
+    for i in range(2):
+        bus.publish("created", {"n": i})
+        live.get(timeout=1)
+    bus.publish("created", {"n": 2})
+
+    assert slow.overflowed
+    drained = [slow.get(timeout=1) for _ in range(2)]
+    assert drained[-1] is CLOSED
+    assert live.get(timeout=1)["data"] == {"n": 2}
+    assert bus.stats()["subscribers"] == 1 and bus.stats()["dropped_subscribers"] == 1
+
+
+def test_format_sse():
+    text = format_sse({"id": 7, "type": "created", "data": {"alert": {"id": "a1"}}})
+    assert text.startswith("id: 7\ndata: ") and text.endswith("\n\n")
+    assert json.loads(text.split("data: ", 1)[1]) == {"type": "created", "alert": {"id": "a1"}}
+    assert format_sse({"id": None, "type": "resync", "data": {}}) == 'data: {"type": "resync"}\n\n'
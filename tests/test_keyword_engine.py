@@ -0,0 +1,36 @@
+import pytest
+
+import keyword_engine
+from keyword_engine import PIPELINE, TEXT, detect_distress_keywords, get_keyword_engine
+
+
+def test_pipeline_keeps_its_own_distress_words():
+    for text in ("help me", "there is a fire", "STOP it", "they attack"):
+        assert detect_distress_keywords(text)["distress_detected"], text
+    # Text-classifier keywords do not raise pipeline alerts
+    for text in ("I am stuck", "save me", "thank you"):
+        assert not detect_distress_keywords(text)["distress_detected"], text
+    assert not detect_distress_keywords("my stopwatch")["distress_detected"]
+
+
+def test_text_detector_uses_its_own_set():
+    result = detect_distress_keywords("please help, I am stuck", detector=TEXT)
+    assert result["reason"] == "keyword: 'please help'"
+    assert [m["keyword"] for m in result["matches"]] == ["please help", "stuck"]
+    assert not detect_distress_keywords("there is a fire", detector=TEXT)["distress_detected"]
+    assert {m.category for m in get_keyword_engine(TEXT).scan("hello, thank you")} == {"neutral", "positive"}
+
+
+def test_keywords_come_only_from_the_config_file(tmp_path, monkeypatch):
+    config = tmp_path / "keyword_config.json"
+    config.write_text('{"keywords": [{"phrase": "mayday", "category": "distress", "detectors": ["pipeline"]},'
+                      ' {"phrase": "fine", "category": "positive"}]}')
+    monkeypatch.setattr(keyword_engine, "KEYWORD_CONFIG_FILE", str(config))
+    assert [e["phrase"] for e in keyword_engine.load_keyword_config(PIPELINE)] == ["mayday", "fine"]
+    assert [e["phrase"] for e in keyword_engine.load_keyword_config(TEXT)] == ["fine"]
+
+    monkeypatch.setattr(keyword_engine, "KEYWORD_CONFIG_FILE", str(tmp_path / "missing.json"))
+    with pytest.raises(FileNotFoundError):
+        keyword_engine.load_keyword_config()
+    with pytest.raises(ValueError):
+        get_keyword_engine("unknown")
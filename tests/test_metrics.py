@@ -0,0 +1,33 @@
+import pytest
+
+from metrics import Counter, MetricsRegistry, _Metric
+
+
+def test_metric_types_must_implement_samples():
+    with pytest.raises(TypeError):
+        _Metric("base", "no samples")
+
+
+def test_render_in_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ["status"])
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    depth = registry.gauge("queue_depth", "Depth", ["queue"])
+    requests.inc(status="200")
+    requests.inc(2, status="500")
+    latency.observe(0.05)
+    latency.observe(5)
+    depth.set_function(lambda: 3, queue="a")
+    depth.set_function(lambda: 1 / 0, queue="broken")
+
+    text = registry.render()
+    assert '# TYPE requests_total counter\nrequests_total{status="200"} 1\nrequests_total{status="500"} 2' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1\nlatency_seconds_bucket{le="1.0"} 1\nlatency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_count 2" in text
+    # A failing scrape-time callback drops only its own sample
+    assert 'queue_depth{queue="a"} 3' in text and "broken" not in text
+    assert registry.counter("requests_total", "Requests", ["status"]) is requests
+    with pytest.raises(ValueError):
+        registry.gauge("requests_total", "Requests", ["status"])
+    with pytest.raises(ValueError):
+        Counter("c", "c").inc(-1)
@@ -0,0 +1,69 @@
+import threading
+import time
+
+from notification_dispatcher import NotificationDispatcher, SmtpSettings
+
+SETTINGS = SmtpSettings(host="smtp.invalid", port=25, username="", password="", sender="alerts@example.com")
+
+
+class FakeConnection:
+    def __init__(self):
+        self.sent = []
+
+    def sendmail(self, sender, recipients, message):
+        self.sent.append((sender, recipients))
+
+    def noop(self):
+        return (250, b"OK")
+
+    def quit(self):
+        pass
+
+
+def _slow_connect(pool, delay):
+    def connect():
+        time.sleep(delay)
+        with pool._lock:
+            pool.connects += 1
+        return FakeConnection()
+    return connect
+
+
+def test_overlapping_warms_do_not_deadlock_the_pool():
+    dispatcher = NotificationDispatcher(SETTINGS, pool_size=4)
+    pool = dispatcher.pool
+    pool._connect = _slow_connect(pool, 0.05)
+    try:
+        warms = [threading.Thread(target=pool.warm) for _ in range(3)]
+        for t in warms:
+            t.start()
+        for t in warms:
+            t.join(5)
+        assert not any(t.is_alive() for t in warms)
+        assert pool.stats()["idle"] <= pool.size
+
+        dispatcher.warm_async()
+        dispatcher.warm_async()
+        done = []
+        sender = threading.Thread(target=lambda: done.append(dispatcher.send(["a@example.com", "b@example.com"],
+                                                                            "subject", "body")))
+        sender.start()
+        sender.join(5)
+        assert done, "send hung behind overlapping warms"
+        assert [r.success for r in done[0]] == [True, True]
+    finally:
+        dispatcher.close()
+
+
+def test_warm_fills_only_free_slots():
+    dispatcher = NotificationDispatcher(SETTINGS, pool_size=2)
+    pool = dispatcher.pool
+    pool._connect = _slow_connect(pool, 0)
+    try:
+        held = pool.acquire()
+        pool.warm()
+        assert pool.stats()["idle"] == 1
+        pool.release(held)
+        assert pool.stats()["idle"] == 2
+    finally:
+        dispatcher.close()
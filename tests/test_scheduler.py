@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from scheduler import TimerScheduler
+
+
+@pytest.fixture
+def scheduler():
+    # One worker so callbacks run in the order the timer thread hands them over
+    scheduler = TimerScheduler(max_workers=1, name="test-timers")
+    yield scheduler
+    scheduler.shutdown()
+
+
+def _collector(expected):
+    fired, done = [], threading.Event()
+
+    def record(name):
+        fired.append(name)
+        if len(fired) == expected:
+            done.set()
+    return fired, done, record
+
+
+def test_timers_fire_in_deadline_order(scheduler):
+    fired, done, record = _collector(3)
+    scheduler.schedule(0.15, record, "c")
+    scheduler.schedule(0.05, record, "a")
+    scheduler.schedule(0.10, record, "b")
+    assert done.wait(2)
+    assert fired == ["a", "b", "c"]
+    stats = scheduler.stats()
+    assert stats["fired"] == 3 and stats["pending"] == 0
+    assert stats["lateness_ms"]["max"] >= stats["lateness_ms"]["p95"] >= stats["lateness_ms"]["p50"]
+
+
+def test_cancel_by_key_skips_the_heap_entry_lazily(scheduler):
+    fired, done, record = _collector(1)
+    scheduler.schedule(0.05, record, "cancelled", key="alert_1")
+    scheduler.schedule(0.10, record, "kept", key="alert_2")
+
+    assert scheduler.cancel("alert_1") is True
+    assert scheduler.cancel("alert_1") is False
+    # Removed from the key index at once; its heap slot is dropped when it surfaces
+    assert scheduler.pending() == 1 and scheduler.stats()["heap_size"] == 2
+    assert done.wait(2)
+    time.sleep(0.05)
+    assert fired == ["kept"]
+    assert scheduler.stats()["heap_size"] == 0
+    assert scheduler.cancel("alert_2") is False
+
+
+def test_rescheduling_a_key_replaces_its_timer(scheduler):
+    fired, done, record = _collector(1)
+    scheduler.schedule(0.05, record, "first", key="alert_1")
+    scheduler.schedule(0.15, record, "second", key="alert_1")
+    assert scheduler.pending() == 1
+
+    assert done.wait(2)
+    time.sleep(0.1)
+    assert fired == ["second"]
+
+
+def test_callback_errors_are_counted(scheduler):
+    done = threading.Event()
+
+    def boom():
+        done.set()
+        raise RuntimeError("callback failed")
+
+    scheduler.schedule(0, boom)
+    assert done.wait(2)
+    time.sleep(0.05)
+    assert scheduler.stats()["errors"] == 1
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from analysis_cache import analysis_key
+from audio_io import audio_hash
+from transcription import StaticBackend, Transcriber, TranscriptionBackend
+
+
+def test_backends_must_implement_transcribe():
+    with pytest.raises(TypeError):
+        TranscriptionBackend()
+
+    class Incomplete(TranscriptionBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_one_content_hash_for_transcripts_and_analyses():
+    y = np.linspace(-1, 1, 1600, dtype=np.float32)
+    assert analysis_key(y, 16000, {"crema": 1}) == audio_hash(y, 16000, {"crema": 1})
+    assert audio_hash(y, 16000) != audio_hash(y, 8000)
+
+    backend = StaticBackend(default="")
+    backend.register(y, 16000, "help me")
+    transcriber = Transcriber(backend)
+    assert transcriber.transcribe(y, 16000)["text"] == "help me"
+    assert transcriber.transcribe(y.astype(np.float64), 16000)["cached"] is True
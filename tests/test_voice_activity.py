@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from voice_activity import VadCounters, detect_voice_activity
+
+SR = 16000
+CONFIG = {
+    "vad_min_energy_db": -50.0, "vad_energy_margin_db": 10.0, "vad_energy_cap_db": -30.0,
+    "vad_max_zcr": 0.4, "vad_max_flatness": 0.45, "vad_onset_frames": 3, "vad_hangover_frames": 20,
+    "vad_min_speech_seconds": 0.25, "vad_padding_seconds": 0.1,
+}
+
+
+def _voiced(seconds):
+    """Harmonic tone with a wobbling pitch, a stand-in for a voiced vowel."""
+    t = np.arange(int(seconds * SR)) / SR
+    phase = 2 * np.pi * np.cumsum(140 + 20 * np.sin(2 * np.pi * 3 * t)) / SR
+    return (0.3 * sum(np.sin(k * phase) / k for k in range(1, 8))).astype(np.float32)
+
+
+def _silence(seconds, rng):
+    return (rng.standard_normal(int(seconds * SR)) * 1e-4).astype(np.float32)
+
+
+def test_finds_speech_between_silences():
+    rng = np.random.default_rng(0)
+    clip = np.concatenate([_silence(1, rng), _voiced(1), _silence(1, rng)])
+    result = detect_voice_activity(clip, SR, CONFIG)
+
+    assert result.is_speech
+    padding = int(CONFIG["vad_padding_seconds"] * SR)
+    # Speech starts at 1 s and ends at 2 s; the bounds add padding and the hangover
+    assert 1 * SR - padding - 400 <= result.start <= 1 * SR
+    hangover = CONFIG["vad_hangover_frames"] * SR // 100
+    assert 2 * SR <= result.end <= 2 * SR + hangover + 400 + padding
+    assert result.to_dict(SR)["start_seconds"] == pytest.approx(result.start / SR, abs=1e-3)
+
+
+@pytest.mark.parametrize("kind", ["empty", "silence", "noise", "click"])
+def test_rejects_non_speech(kind):
+    rng = np.random.default_rng(1)
+    if kind == "empty":
+        clip = np.zeros(0, dtype=np.float32)
+    elif kind == "silence":
+        clip = _silence(2, rng)
+    elif kind == "noise":
+        clip = (rng.standard_normal(2 * SR) * 0.3).astype(np.float32)
+    else:
+        clip = _silence(2, rng)
+        clip[SR:SR + 160] = 0.8
+    result = detect_voice_activity(clip, SR, CONFIG)
+    assert not result.is_speech and result.start == result.end == 0
+
+
+def test_counters():
+    counters = VadCounters()
+    assert counters.stats()["skip_rate"] is None
+    for gated in (True, False, False, True):
+        counters.record(gated)
+    assert counters.stats() == {"windows": 4, "gated": 2, "skip_rate": 0.5}